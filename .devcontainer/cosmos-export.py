@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Export Cosmos DB containers to compressed JSON Lines and import them back.
+
+``export`` reads each container's partition key ranges and pages through a
+query feed for every range in parallel, following ``x-ms-continuation`` tokens.
+Each page is written straight to ``<output>/<container>/pkrange-<id>.jsonl.gz``
+as soon as it arrives, so memory stays bounded by ``--page-size``. After every
+page the gzip member is closed and the file offset and continuation token are
+saved to ``export-state.json``; re-running the same export after an
+interruption truncates any partial page and carries on from the saved token.
+
+``import`` streams those files back with a bounded number of upserts in flight,
+taking each document's partition key value from the target container's
+partition key path. Upserts are idempotent, so an interrupted import can simply
+be re-run.
+
+Uses the shared :mod:`cosmos_rest` client and the same environment variables
+as ``provision-cosmos.py`` (overridable with flags):
+
+- ``COSMOS_ENDPOINT`` — gateway URL (e.g. ``https://127.0.0.1:8081``)
+- ``COSMOS_KEY`` — master key (base64)
+- ``COSMOS_DATABASE`` — database id (default ``DocumentOcrDb``)
+- ``COSMOS_CONTAINERS`` — ``name:/partitionKey`` specs; the names are the
+  default container list
+
+Examples::
+
+    python3 .devcontainer/cosmos-export.py export -o backup/
+    python3 .devcontainer/cosmos-export.py import -i backup/ --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cosmos_rest
+
+DEFAULT_CONTAINERS = ("ProcessedDocuments", "Operations")
+DEFAULT_QUERY = "SELECT * FROM c"
+STATE_FILE = "export-state.json"
+# Server-generated properties that must not be sent back on import.
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "_ts")
+
+
+class CosmosError(Exception):
+    """Raised when Cosmos returns an unexpected status."""
+
+
+def _check(response: cosmos_rest.Response, action: str) -> dict:
+    if response.status != 200:
+        raise CosmosError(f"{action}: HTTP {response.status} {response.body[:300]!r}")
+    return json.loads(response.body)
+
+
+def partition_key_ranges(database: str, container: str) -> list[str]:
+    """Return the ids of the container's partition key ranges."""
+    link = f"dbs/{database}/colls/{container}"
+    response = cosmos_rest.send("GET", f"/{link}/pkranges", "pkranges", link)
+    body = _check(response, f"listing partition key ranges of '{container}'")
+    return [entry["id"] for entry in body["PartitionKeyRanges"]]
+
+
+def partition_key_path(database: str, container: str) -> list[str]:
+    """Return the container's partition key path split into property names."""
+    link = f"dbs/{database}/colls/{container}"
+    body = _check(cosmos_rest.send("GET", f"/{link}", "colls", link), f"reading '{container}'")
+    return [part for part in body["partitionKey"]["paths"][0].split("/") if part]
+
+
+class _ExportState:
+    """Per-range continuation tokens and file offsets, saved after every page."""
+
+    def __init__(self, path: Path, query: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.ranges: dict[str, dict] = {}
+        if path.exists():
+            saved = json.loads(path.read_text())
+            if saved.get("query") != query:
+                raise ValueError(
+                    f"{path} was written for query {saved.get('query')!r}; "
+                    "delete it or use the same --query to resume"
+                )
+            self.ranges = saved["ranges"]
+        self.query = query
+
+    def get(self, range_id: str) -> dict:
+        with self._lock:
+            return dict(
+                self.ranges.setdefault(
+                    range_id, {"continuation": None, "offset": 0, "documents": 0, "done": False}
+                )
+            )
+
+    def update(self, range_id: str, **values) -> None:
+        with self._lock:
+            self.ranges[range_id].update(values)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"query": self.query, "ranges": self.ranges}, indent=2))
+            os.replace(tmp, self.path)
+
+
+def _export_range(
+    database: str,
+    container: str,
+    range_id: str,
+    query: str,
+    page_size: int,
+    output_dir: Path,
+    state: _ExportState,
+) -> int:
+    """Export one partition key range; returns the number of documents written."""
+    progress = state.get(range_id)
+    if progress["done"]:
+        return 0
+    link = f"dbs/{database}/colls/{container}"
+    body = {"query": query, "parameters": []}
+    headers = {
+        "Content-Type": "application/query+json",
+        "x-ms-documentdb-isquery": "True",
+        "x-ms-documentdb-partitionkeyrangeid": range_id,
+        "x-ms-max-item-count": str(page_size),
+    }
+    written = 0
+    with open(output_dir / f"pkrange-{range_id}.jsonl.gz", "ab") as raw:
+        # Drop anything written after the last checkpoint (a partially written page).
+        raw.truncate(progress["offset"])
+        raw.seek(progress["offset"])
+        continuation = progress["continuation"]
+        while True:
+            if continuation:
+                headers["x-ms-continuation"] = continuation
+            response = cosmos_rest.send("POST", f"/{link}/docs", "docs", link, body, headers)
+            page = _check(response, f"querying '{container}' range {range_id}")
+            # One gzip member per page, so every checkpoint is a complete gzip stream.
+            with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as member:
+                for doc in page["Documents"]:
+                    member.write(json.dumps(doc, separators=(",", ":")).encode("utf-8"))
+                    member.write(b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+            written += len(page["Documents"])
+            continuation = response.headers.get("x-ms-continuation")
+            state.update(
+                range_id,
+                continuation=continuation,
+                offset=raw.tell(),
+                documents=progress["documents"] + written,
+                done=not continuation,
+            )
+            if not continuation:
+                return written
+
+
+def export_container(
+    database: str,
+    container: str,
+    output_root: Path,
+    query: str,
+    page_size: int,
+    workers: int,
+) -> int:
+    output_dir = output_root / container
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state = _ExportState(output_dir / STATE_FILE, query)
+    range_ids = partition_key_ranges(database, container)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(range_ids)))) as executor:
+        futures = [
+            executor.submit(
+                _export_range, database, container, range_id, query, page_size, output_dir, state
+            )
+            for range_id in range_ids
+        ]
+        written = sum(future.result() for future in futures)
+    elapsed = time.perf_counter() - started
+    total = sum(progress["documents"] for progress in state.ranges.values())
+    print(
+        f"  {container}: {written:,} documents exported from {len(range_ids)} partition key "
+        f"range(s) in {elapsed:.2f}s ({written / elapsed if elapsed else 0:,.0f} docs/s); "
+        f"{total:,} in {output_dir}"
+    )
+    return written
+
+
+def iter_export_documents(container_dir: Path):
+    """Yield documents from every ``*.jsonl.gz`` file in an export directory."""
+    for path in sorted(container_dir.glob("*.jsonl.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _upsert(database: str, container: str, key_path: list[str], doc: dict) -> int:
+    for name in SYSTEM_PROPERTIES:
+        doc.pop(name, None)
+    value = doc
+    for part in key_path:
+        value = value.get(part) if isinstance(value, dict) else None
+    link = f"dbs/{database}/colls/{container}"
+    response = cosmos_rest.send(
+        "POST",
+        f"/{link}/docs",
+        "docs",
+        link,
+        doc,
+        extra_headers={
+            "x-ms-documentdb-partitionkey": json.dumps([value]),
+            "x-ms-documentdb-is-upsert": "True",
+        },
+    )
+    return response.status
+
+
+def import_container(database: str, container: str, input_root: Path, concurrency: int) -> int:
+    container_dir = input_root / container
+    if not container_dir.is_dir():
+        raise FileNotFoundError(f"No export found for '{container}' in {input_root}")
+    key_path = partition_key_path(database, container)
+    imported = failed = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight: deque = deque()
+
+        def collect() -> None:
+            nonlocal imported, failed
+            if in_flight.popleft().result() in (200, 201):
+                imported += 1
+            else:
+                failed += 1
+
+        for doc in iter_export_documents(container_dir):
+            if len(in_flight) >= concurrency * 2:
+                collect()
+            in_flight.append(executor.submit(_upsert, database, container, key_path, doc))
+        while in_flight:
+            collect()
+    elapsed = time.perf_counter() - started
+    print(
+        f"  {container}: {imported:,} documents imported in {elapsed:.2f}s "
+        f"({imported / elapsed if elapsed else 0:,.0f} docs/s), {failed:,} failed"
+    )
+    return failed
+
+
+def main() -> int:
+    env_containers = [spec.split(":", 1)[0] for spec in os.environ.get("COSMOS_CONTAINERS", "").split()]
+    # Connection options live on each subcommand so --containers cannot swallow it.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--endpoint", default=os.environ.get("COSMOS_ENDPOINT"),
+                        help="Cosmos gateway URL (default: $COSMOS_ENDPOINT)")
+    common.add_argument("--key", default=os.environ.get("COSMOS_KEY"),
+                        help="Cosmos master key (default: $COSMOS_KEY)")
+    common.add_argument("--database", default=os.environ.get("COSMOS_DATABASE", "DocumentOcrDb"),
+                        help="Database id (default: $COSMOS_DATABASE or DocumentOcrDb)")
+    common.add_argument("--containers", nargs="+", default=env_containers or list(DEFAULT_CONTAINERS),
+                        help="Containers to transfer (default: names from $COSMOS_CONTAINERS)")
+
+    parser = argparse.ArgumentParser(
+        description="Export Cosmos containers to gzipped JSON Lines or import them back."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser(
+        "export", parents=[common], help="Export containers to a directory"
+    )
+    export_parser.add_argument("-o", "--output", type=Path, required=True,
+                               help="Output directory (re-use it to resume)")
+    export_parser.add_argument("--query", default=DEFAULT_QUERY,
+                               help=f"Query to export (default: {DEFAULT_QUERY!r})")
+    export_parser.add_argument("--page-size", type=int, default=1000,
+                               help="Documents per page (x-ms-max-item-count, default: 1000)")
+    export_parser.add_argument("-w", "--workers", type=int, default=8,
+                               help="Partition key ranges read in parallel (default: 8)")
+
+    import_parser = commands.add_parser(
+        "import", parents=[common], help="Upsert an export back into containers"
+    )
+    import_parser.add_argument("-i", "--input", type=Path, required=True,
+                               help="Directory written by 'export'")
+    import_parser.add_argument("-c", "--concurrency", type=int, default=16,
+                               help="Maximum upserts in flight (default: 16)")
+    args = parser.parse_args()
+
+    if not args.endpoint or not args.key:
+        parser.error("--endpoint/--key (or COSMOS_ENDPOINT/COSMOS_KEY) are required")
+    cosmos_rest.configure(endpoint=args.endpoint, key=args.key)
+
+    try:
+        if args.command == "export":
+            if args.page_size < 1 or args.workers < 1:
+                parser.error("--page-size and --workers must be >= 1")
+            print(f"Exporting {', '.join(args.containers)} from '{args.database}' to {args.output}")
+            for container in args.containers:
+                export_container(
+                    args.database, container, args.output, args.query, args.page_size, args.workers
+                )
+            return 0
+
+        if args.concurrency < 1:
+            parser.error("--concurrency must be >= 1")
+        print(f"Importing {', '.join(args.containers)} into '{args.database}' from {args.input}")
+        failed = sum(
+            import_container(args.database, container, args.input, args.concurrency)
+            for container in args.containers
+        )
+        return 1 if failed else 0
+    except (CosmosError, ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
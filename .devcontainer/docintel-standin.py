@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Azure AI Document Intelligence analyze API.
+
+Implements the long-running analyze protocol that ``DocumentIntelligenceService``
+drives through ``DocumentAnalysisClient``:
+
+- ``POST /formrecognizer/documentModels/{modelId}:analyze`` accepts a page
+  image and answers ``202 Accepted`` with an ``Operation-Location`` header;
+- ``GET  /formrecognizer/documentModels/{modelId}/analyzeResults/{resultId}``
+  reports ``running`` until the simulated analysis latency has elapsed, then
+  ``succeeded`` with an ``analyzeResult`` whose first document carries the
+  DocumentOcr schema fields plus the configured identifier field.
+
+The ``/documentintelligence/...`` routes of the newer API are accepted too.
+
+Results are deterministic: field values and confidences are derived from a
+hash of the submitted bytes, so the same page always yields the same fields
+and a re-run of the pipeline produces the same documents. Submits and polls
+draw from separate token buckets (``--submit-rate``/``--poll-rate``, like the
+service's per-resource limits) and answer ``429`` with ``Retry-After`` when
+empty. ``--error-rate``, ``--fail-rate`` and ``--reset-rate`` inject submit
+errors, failed analyses and dropped connections.
+
+Request counters are printed every ``--report-interval`` seconds and served as
+JSON from ``GET /_standin/stats``.
+
+The Processor authenticates with ``DefaultAzureCredential``, whose bearer-token
+policy refuses plain HTTP, so serve TLS with ``--certfile``/``--keyfile`` (a
+certificate the Functions host trusts) when pointing
+``DocumentIntelligence:Endpoint`` at this server. Tokens are not validated.
+
+Example::
+
+    python3 .devcontainer/docintel-standin.py --port 5050 --latency 3 \\
+        --submit-rate 15 --fail-rate 0.01 --certfile dev.crt --keyfile dev.key
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import math
+import random
+import re
+import ssl
+import sys
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_API_VERSION = "2023-07-31"
+STRING_FIELDS = (
+    "criminalCodeForm",
+    "policeFileNumber",
+    "agency",
+    "accusedSex",
+    "accusedName",
+    "mainCharge",
+    "additionalCharges",
+)
+DATE_FIELDS = ("accusedDateOfBirth", "signedOn", "endorsementSignedOn")
+SIGNATURE_FIELDS = ("judgeSignature", "endorsementSignature")
+
+AGENCIES = ("RCMP", "Vancouver PD", "Surrey PD", "Victoria PD", "Kelowna RCMP", "Burnaby RCMP")
+NAMES = ("SMITH, Alex", "NGUYEN, Jordan", "SINGH, Sam", "BROWN, Taylor", "TREMBLAY, Morgan")
+CHARGES = ("Theft under $5000", "Mischief", "Assault", "Impaired operation", "Uttering threats")
+
+_ANALYZE = re.compile(r"^/(?:formrecognizer|documentintelligence)/documentModels/([^/:]+):analyze$")
+_RESULT = re.compile(
+    r"^/(?:formrecognizer|documentintelligence)/documentModels/([^/]+)/analyzeResults/([^/]+)$"
+)
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            429: "Too Many Requests", 500: "Internal Server Error"}
+
+
+def _iso(moment: float) -> str:
+    return datetime.datetime.fromtimestamp(moment, datetime.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class TokenBucket:
+    """Requests-per-second limiter; ``rate <= 0`` disables it."""
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+class PayloadFactory:
+    """Deterministic synthetic ``analyzeResult`` bodies."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.identifier_field = args.identifier_field
+        self.identifiers = max(1, args.identifiers)
+        self.missing_identifier_rate = args.missing_identifier_rate
+        self.min_confidence = args.min_confidence
+        self.max_confidence = args.max_confidence
+
+    def _field(self, rng: random.Random, field_type: str, content: str, **value) -> dict:
+        field = {
+            "type": field_type,
+            "content": content,
+            "confidence": round(rng.uniform(self.min_confidence, self.max_confidence), 3),
+            "spans": [],
+        }
+        field.update(value)
+        return field
+
+    def fields(self, digest: bytes) -> dict:
+        rng = random.Random(digest)
+        fields = {}
+        if rng.random() >= self.missing_identifier_rate:
+            # Consecutive identical pages share an identifier, distinct pages spread over the pool
+            identifier = f"TK-{int.from_bytes(digest[:8], 'big') % self.identifiers:07d}"
+            fields[self.identifier_field] = self._field(rng, "string", identifier, valueString=identifier)
+        for name in STRING_FIELDS:
+            if name == "policeFileNumber":
+                value = f"{rng.randint(2015, 2026)}-{rng.randint(1, 999999):06d}"
+            elif name == "criminalCodeForm":
+                value = f"Form {rng.randint(1, 12)}"
+            elif name == "agency":
+                value = rng.choice(AGENCIES)
+            elif name == "accusedSex":
+                value = rng.choice(("M", "F"))
+            elif name == "accusedName":
+                value = rng.choice(NAMES)
+            elif name == "mainCharge":
+                value = rng.choice(CHARGES)
+            else:
+                value = "\n".join(rng.sample(CHARGES, rng.randint(1, 3)))
+            fields[name] = self._field(rng, "string", value, valueString=value)
+        for name in DATE_FIELDS:
+            day = datetime.date(1960, 1, 1) + datetime.timedelta(days=rng.randrange(24000))
+            fields[name] = self._field(rng, "date", day.strftime("%B %d, %Y"), valueDate=day.isoformat())
+        for name in SIGNATURE_FIELDS:
+            signed = "signed" if rng.random() < 0.8 else "unsigned"
+            fields[name] = self._field(rng, "signature", "", valueSignature=signed)
+        return fields
+
+    def analyze_result(self, model_id: str, api_version: str, digest: bytes) -> dict:
+        fields = self.fields(digest)
+        content = "\n".join(field["content"] for field in fields.values() if field["content"])
+        return {
+            "apiVersion": api_version,
+            "modelId": model_id,
+            "stringIndexType": "textElements",
+            "content": content,
+            "pages": [
+                {
+                    "pageNumber": 1,
+                    "angle": 0,
+                    "width": 8.5,
+                    "height": 11,
+                    "unit": "inch",
+                    "spans": [{"offset": 0, "length": len(content)}],
+                    "words": [],
+                    "lines": [],
+                    "selectionMarks": [],
+                }
+            ],
+            "tables": [],
+            "keyValuePairs": [],
+            "styles": [],
+            "paragraphs": [],
+            "documents": [
+                {
+                    "docType": model_id,
+                    "boundingRegions": [],
+                    "fields": fields,
+                    "confidence": 1.0,
+                    "spans": [{"offset": 0, "length": len(content)}],
+                }
+            ],
+        }
+
+
+class StandIn:
+    """Request handling and in-memory operation state."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.payloads = PayloadFactory(args)
+        self.submit_bucket = TokenBucket(args.submit_rate)
+        self.poll_bucket = TokenBucket(args.poll_rate)
+        # resultId -> operation state; pruned after --result-ttl
+        self.operations: dict[str, dict] = {}
+        self.counters: Counter[str] = Counter()
+        self.started = time.time()
+
+    # --- protocol ------------------------------------------------------------
+
+    def _latency(self, size: int) -> float:
+        base = self.args.latency + self.args.latency_per_mb * size / (1024 * 1024)
+        return max(0.0, base * (1 + self.rng.uniform(-self.args.jitter, self.args.jitter)))
+
+    @staticmethod
+    def _error(status: int, code: str, message: str, headers: dict | None = None):
+        return status, {"error": {"code": code, "message": message}}, headers or {}
+
+    def submit(self, model_id: str, query: dict, base_url: str, body: bytes):
+        self.counters["submits"] += 1
+        wait = self.submit_bucket.take()
+        if wait:
+            self.counters["submit429"] += 1
+            return self._error(
+                429, "429", "Requests to the analyze operation have exceeded the rate limit.",
+                {"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        if not body:
+            return self._error(400, "InvalidRequest", "The request body is empty.")
+        if self.rng.random() < self.args.error_rate:
+            self.counters["submitErrors"] += 1
+            return self._error(500, "InternalServerError", "Injected submit failure.")
+
+        api_version = query.get("api-version", [DEFAULT_API_VERSION])[0]
+        result_id = str(uuid.uuid4())
+        now = time.time()
+        self.operations[result_id] = {
+            "modelId": model_id,
+            "apiVersion": api_version,
+            "digest": hashlib.sha256(body).digest(),
+            "created": now,
+            "ready": now + self._latency(len(body)),
+            "failed": self.rng.random() < self.args.fail_rate,
+        }
+        self.counters["accepted"] += 1
+        self.counters["bytes"] += len(body)
+        location = (
+            f"{base_url}/documentModels/{model_id}/analyzeResults/{result_id}"
+            f"?api-version={api_version}"
+        )
+        return 202, None, {"Operation-Location": location}
+
+    def poll(self, result_id: str):
+        self.counters["polls"] += 1
+        wait = self.poll_bucket.take()
+        if wait:
+            self.counters["poll429"] += 1
+            return self._error(
+                429, "429", "Requests to the get result operation have exceeded the rate limit.",
+                {"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        operation = self.operations.get(result_id)
+        if operation is None:
+            return self._error(404, "NotFound", f"Analyze result '{result_id}' was not found.")
+
+        now = time.time()
+        body = {"createdDateTime": _iso(operation["created"]), "lastUpdatedDateTime": _iso(now)}
+        if now < operation["ready"]:
+            body["status"] = "running"
+            # Pollers honour Retry-After; keep it short so latency stays measurable
+            return 200, body, {"Retry-After": "1"}
+        body["lastUpdatedDateTime"] = _iso(operation["ready"])
+        if operation["failed"]:
+            if not operation.get("counted"):
+                self.counters["failedAnalyses"] += 1
+                operation["counted"] = True
+            body["status"] = "failed"
+            body["error"] = {"code": "InternalServerError", "message": "Injected analysis failure."}
+            return 200, body, {}
+        if not operation.get("counted"):
+            self.counters["succeededAnalyses"] += 1
+            operation["counted"] = True
+        body["status"] = "succeeded"
+        body["analyzeResult"] = self.payloads.analyze_result(
+            operation["modelId"], operation["apiVersion"], operation["digest"]
+        )
+        return 200, body, {}
+
+    def stats(self) -> dict:
+        elapsed = max(1e-9, time.time() - self.started)
+        now = time.time()
+        return {
+            "uptimeSeconds": round(elapsed, 1),
+            "counters": dict(self.counters),
+            "submitsPerSecond": round(self.counters["submits"] / elapsed, 2),
+            "running": sum(1 for op in self.operations.values() if op["ready"] > now),
+            "retained": len(self.operations),
+        }
+
+    def prune(self) -> None:
+        cutoff = time.time() - self.args.result_ttl
+        for result_id in [rid for rid, op in self.operations.items() if op["ready"] < cutoff]:
+            del self.operations[result_id]
+
+    def route(self, method: str, target: str, headers: dict, body: bytes):
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        if method == "GET" and parts.path == "/_standin/stats":
+            return 200, self.stats(), {}
+        match = _ANALYZE.match(parts.path)
+        if match and method == "POST":
+            # Results are served under the same API prefix the submit used
+            scheme = "https" if self.args.certfile else "http"
+            host = headers.get("host", f"127.0.0.1:{self.args.port}")
+            prefix = parts.path.split("/")[1]
+            return self.submit(match.group(1), query, f"{scheme}://{host}/{prefix}", body)
+        match = _RESULT.match(parts.path)
+        if match and method == "GET":
+            return self.poll(match.group(2))
+        return self._error(404, "NotFound", f"No route for {method} {parts.path}")
+
+    # --- HTTP/1.1 ----------------------------------------------------------------
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: dict) -> bytes:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    await reader.readline()
+                    return b"".join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+        length = int(headers.get("content-length") or 0)
+        return await reader.readexactly(length) if length else b""
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await self._read_body(reader, headers)
+
+                if self.args.reset_rate and self.rng.random() < self.args.reset_rate:
+                    self.counters["resets"] += 1
+                    writer.transport.abort()
+                    return
+
+                status, payload, extra = self.route(method, target, headers, body)
+                data = json.dumps(payload, separators=(",", ":")).encode() if payload is not None else b""
+                keep_alive = headers.get("connection", "").lower() != "close"
+                head = [
+                    f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}",
+                    f"Content-Length: {len(data)}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"apim-request-id: {uuid.uuid4()}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                head.extend(f"{name}: {value}" for name, value in extra.items())
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def report(self) -> None:
+        while True:
+            await asyncio.sleep(self.args.report_interval)
+            self.prune()
+            if not self.args.quiet:
+                print(json.dumps(self.stats()), flush=True)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    standin = StandIn(args)
+    ssl_context = None
+    if args.certfile:
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(args.certfile, args.keyfile)
+    server = await asyncio.start_server(
+        standin.handle, args.host, args.port, ssl=ssl_context, backlog=1024
+    )
+    scheme = "https" if ssl_context else "http"
+    print(
+        f"Document Intelligence stand-in listening on {scheme}://{args.host}:{args.port} "
+        f"(latency {args.latency}s ±{args.jitter:.0%}, submit {args.submit_rate or 'unlimited'}/s, "
+        f"poll {args.poll_rate or 'unlimited'}/s)",
+        flush=True,
+    )
+    reporter = asyncio.create_task(standin.report())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reporter.cancel()
+        print(json.dumps(standin.stats()), flush=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Serve a local stand-in for the Document Intelligence analyze API."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=5050, help="Port (default: 5050)")
+    parser.add_argument("--certfile", help="PEM certificate to serve HTTPS with")
+    parser.add_argument("--keyfile", help="PEM private key for --certfile")
+    parser.add_argument("--latency", type=float, default=2.0,
+                        help="Mean seconds from submit to result (default: 2.0)")
+    parser.add_argument("--latency-per-mb", type=float, default=0.0,
+                        help="Extra seconds per MB submitted (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.25,
+                        help="Uniform latency jitter as a fraction of the mean (default: 0.25)")
+    parser.add_argument("--submit-rate", type=float, default=15.0,
+                        help="Analyze requests per second before 429s; 0 disables (default: 15)")
+    parser.add_argument("--poll-rate", type=float, default=50.0,
+                        help="Result polls per second before 429s; 0 disables (default: 50)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of submits answered with HTTP 500 (default: 0)")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                        help="Share of analyses that end with status 'failed' (default: 0)")
+    parser.add_argument("--reset-rate", type=float, default=0.0,
+                        help="Share of requests whose connection is dropped (default: 0)")
+    parser.add_argument("--identifier-field", default="identifier",
+                        help="Field name carrying the identifier (default: identifier, "
+                             "matching DocumentProcessing:IdentifierFieldName)")
+    parser.add_argument("--identifiers", type=int, default=1000,
+                        help="Number of distinct identifier values (default: 1000)")
+    parser.add_argument("--missing-identifier-rate", type=float, default=0.1,
+                        help="Share of pages without an identifier field (default: 0.1)")
+    parser.add_argument("--min-confidence", type=float, default=0.6)
+    parser.add_argument("--max-confidence", type=float, default=0.99)
+    parser.add_argument("--result-ttl", type=float, default=600.0,
+                        help="Seconds a finished result stays retrievable (default: 600)")
+    parser.add_argument("--report-interval", type=float, default=10.0,
+                        help="Seconds between stats lines (default: 10)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final stats")
+    parser.add_argument("--seed", type=int, help="Random seed for latency and failure injection")
+    args = parser.parse_args()
+
+    if bool(args.certfile) != bool(args.keyfile):
+        parser.error("--certfile and --keyfile must be given together")
+    for name in ("error_rate", "fail_rate", "reset_rate", "missing_identifier_rate"):
+        if not 0 <= getattr(args, name) <= 1:
+            parser.error(f"--{name.replace('_', '-')} must be between 0 and 1")
+    if not 0 <= args.min_confidence <= args.max_confidence <= 1:
+        parser.error("--min-confidence/--max-confidence must satisfy 0 <= min <= max <= 1")
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""Load-test the Operations API of a running DocumentOcr Functions host.
+
+Submits ``POST /api/operations`` at a target rate (open loop: arrivals do not
+wait for earlier requests), follows each ``Location`` header with
+``GET /api/operations/{id}`` until the operation is ``Succeeded``, ``Failed``
+or ``Cancelled``, and issues ``GET /api/operations`` at a lower background
+rate. Polls honour the host's ``Retry-After`` and otherwise back off
+exponentially with jitter, like a well-behaved client.
+
+Recorded per endpoint: request latency percentiles (p50/p95/p99), a
+log-bucketed latency histogram and status counts. Per operation: the time from
+submission to the first poll that saw ``Succeeded``, and the host-reported
+``createdAt``→``completedAt`` time. ``--json`` writes everything as a stable,
+machine-readable summary to diff between releases.
+
+The blobs named by ``--blob`` must already exist in ``--container`` (upload
+them through the WebApp or Azurite first); operations for missing blobs fail
+in the worker but still exercise the API.
+
+Example (Functions host from ``scripts/run-functions.sh`` with the emulators)::
+
+    python3 .devcontainer/load-operations.py --blob sample.pdf --rate 5 \\
+        --duration 120 --json results/load-$(git rev-parse --short HEAD).json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import random
+import ssl
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+TERMINAL_STATUSES = {"Succeeded", "Failed", "Cancelled"}
+ENDPOINTS = ("StartOperation", "GetOperation", "ListOperations")
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class HttpError(Exception):
+    """Connection-level failure (refused, reset, timed out)."""
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, method: str, target: str, host: str, body: bytes | None):
+        head = [f"{method} {target} HTTP/1.1", f"Host: {host}", "Accept: application/json"]
+        if body is not None:
+            head += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        self.writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            data = b"".join(chunks)
+        else:
+            data = await self.reader.readexactly(int(headers.get("content-length") or 0))
+        return status, headers, data, headers.get("connection", "").lower() != "close"
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class HttpPool:
+    """Bounded pool of keep-alive connections to one host."""
+
+    def __init__(self, base_url: str, size: int, timeout: float, insecure: bool) -> None:
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.host_header = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.ssl = None
+        if parts.scheme == "https":
+            self.ssl = ssl.create_default_context()
+            if insecure:
+                self.ssl.check_hostname = False
+                self.ssl.verify_mode = ssl.CERT_NONE
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[_Connection] = []
+
+    async def request(self, method: str, target: str, body: bytes | None = None):
+        """Return ``(status, headers, body)``; raises :class:`HttpError` on connection failure."""
+        async with self._slots:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                connection = self._idle.pop() if reused else None
+                try:
+                    if connection is None:
+                        reader, writer = await asyncio.wait_for(
+                            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+                        )
+                        connection = _Connection(reader, writer)
+                    status, headers, data, keep_alive = await asyncio.wait_for(
+                        connection.request(method, self.prefix + target, self.host_header, body),
+                        self.timeout,
+                    )
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+                    if connection is not None:
+                        connection.close()
+                    # An idle keep-alive connection may have been closed by the server; retry once
+                    if reused and attempt == 0 and not isinstance(e, asyncio.TimeoutError):
+                        continue
+                    raise HttpError(f"{type(e).__name__}: {e}") from e
+                if keep_alive:
+                    self._idle.append(connection)
+                else:
+                    connection.close()
+                return status, headers, data
+        raise HttpError("unreachable")
+
+    def close(self) -> None:
+        for connection in self._idle:
+            connection.close()
+        self._idle.clear()
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _distribution(values: list[float]) -> dict:
+    """Summary statistics and histogram of durations given in seconds, reported in ms."""
+    ordered = sorted(value * 1000 for value in values)
+    buckets = Counter()
+    for value in ordered:
+        bound = next((b for b in HISTOGRAM_BOUNDS_MS if value <= b), None)
+        buckets["+Inf" if bound is None else str(bound)] += 1
+    return {
+        "count": len(ordered),
+        "meanMs": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50Ms": round(_percentile(ordered, 0.50), 3),
+        "p95Ms": round(_percentile(ordered, 0.95), 3),
+        "p99Ms": round(_percentile(ordered, 0.99), 3),
+        "maxMs": round(ordered[-1], 3) if ordered else 0.0,
+        "histogramMs": {
+            label: buckets[label]
+            for label in [str(b) for b in HISTOGRAM_BOUNDS_MS] + ["+Inf"]
+            if buckets[label]
+        },
+    }
+
+
+def _parse_time(value: str | None) -> datetime.datetime | None:
+    if not value:
+        return None
+    value = value.replace("Z", "+00:00")
+    # .NET emits 7 fractional digits; fromisoformat accepts at most 6 before 3.11
+    if "." in value:
+        whole, _, rest = value.partition(".")
+        digits = len(rest) - len(rest.lstrip("0123456789"))
+        value = f"{whole}.{rest[:min(digits, 6)]}{rest[digits:]}"
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class LoadTest:
+    """Open-loop submitter, pollers and background lister sharing one pool."""
+
+    def __init__(self, args: argparse.Namespace, pool: HttpPool) -> None:
+        self.args = args
+        self.pool = pool
+        self.rng = random.Random(args.seed)
+        self.latencies: dict[str, list[float]] = {name: [] for name in ENDPOINTS}
+        self.statuses: dict[str, Counter[str]] = {name: Counter() for name in ENDPOINTS}
+        self.outcomes: Counter[str] = Counter()
+        self.queue_to_succeeded: list[float] = []
+        self.server_created_to_completed: list[float] = []
+        self.polls_per_operation: list[int] = []
+        self.submitted = 0
+        self._code = urlencode({"code": args.code}) if args.code else ""
+
+    async def _call(self, endpoint: str, method: str, path: str, body: bytes | None = None):
+        target = path
+        if self._code:
+            target += ("&" if "?" in path else "?") + self._code
+        started = time.perf_counter()
+        try:
+            status, headers, data = await self.pool.request(method, target, body)
+        except HttpError as e:
+            self.latencies[endpoint].append(time.perf_counter() - started)
+            self.statuses[endpoint][e.args[0].split(":")[0]] += 1
+            return None, {}, b""
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        self.statuses[endpoint][str(status)] += 1
+        return status, headers, data
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        args = self.args
+        if retry_after and not args.ignore_retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = args.poll_interval
+        else:
+            delay = args.poll_interval * (2 ** attempt)
+        delay = min(args.max_poll_interval, max(args.poll_interval, delay))
+        return delay * self.rng.uniform(0.8, 1.2)
+
+    async def _run_operation(self, blob: str) -> None:
+        body = {"blobName": blob, "containerName": self.args.container}
+        if self.args.page_range:
+            body["pageRange"] = self.args.page_range
+        queued = time.perf_counter()
+        status, headers, _ = await self._call(
+            "StartOperation", "POST", "/api/operations", json.dumps(body).encode()
+        )
+        if status != 202 or "location" not in headers:
+            self.outcomes["startFailed"] += 1
+            return
+
+        location = urlsplit(headers["location"])
+        path = location.path[len(self.pool.prefix):] if self.pool.prefix else location.path
+        deadline = queued + self.args.operation_timeout
+        polls = 0
+        retry_after = None
+        while True:
+            await asyncio.sleep(self._backoff(polls, retry_after))
+            if time.perf_counter() > deadline:
+                self.outcomes["timedOut"] += 1
+                break
+            status, headers, data = await self._call("GetOperation", "GET", path)
+            polls += 1
+            retry_after = headers.get("retry-after")
+            if status is None or status == 404 or not data:
+                continue
+            try:
+                operation = json.loads(data)
+            except ValueError:
+                continue
+            state = operation.get("status")
+            if state in TERMINAL_STATUSES:
+                self.outcomes[state.lower()] += 1
+                if state == "Succeeded":
+                    self.queue_to_succeeded.append(time.perf_counter() - queued)
+                    created = _parse_time(operation.get("createdAt"))
+                    completed = _parse_time(operation.get("completedAt"))
+                    if created and completed:
+                        self.server_created_to_completed.append((completed - created).total_seconds())
+                break
+        self.polls_per_operation.append(polls)
+
+    async def _list_loop(self, stop: asyncio.Event) -> None:
+        if self.args.list_rate <= 0:
+            return
+        path = f"/api/operations?{urlencode({'maxItems': self.args.list_max_items})}"
+        while not stop.is_set():
+            await self._call("ListOperations", "GET", path)
+            try:
+                await asyncio.wait_for(stop.wait(), 1 / self.args.list_rate)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> float:
+        args = self.args
+        total = args.operations if args.operations else math.inf
+        stop_listing = asyncio.Event()
+        lister = asyncio.create_task(self._list_loop(stop_listing))
+        tasks = []
+        started = time.perf_counter()
+        next_arrival = started
+        while self.submitted < total and time.perf_counter() - started < args.duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            blob = args.blob[self.submitted % len(args.blob)]
+            tasks.append(asyncio.create_task(self._run_operation(blob)))
+            self.submitted += 1
+            gap = 1 / args.rate
+            next_arrival += self.rng.expovariate(args.rate) if args.arrival == "poisson" else gap
+        submit_elapsed = time.perf_counter() - started
+        if tasks:
+            await asyncio.gather(*tasks)
+        stop_listing.set()
+        await lister
+        return submit_elapsed
+
+    def summary(self, submit_elapsed: float, elapsed: float) -> dict:
+        args = self.args
+        return {
+            "config": {
+                "baseUrl": args.base_url,
+                "rate": args.rate,
+                "arrival": args.arrival,
+                "duration": args.duration,
+                "operations": args.operations,
+                "blobs": args.blob,
+                "container": args.container,
+                "pageRange": args.page_range,
+                "connections": args.connections,
+                "pollInterval": args.poll_interval,
+                "maxPollInterval": args.max_poll_interval,
+                "honourRetryAfter": not args.ignore_retry_after,
+                "listRate": args.list_rate,
+            },
+            "startedAt": datetime.datetime.now(datetime.UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "elapsedSeconds": round(elapsed, 3),
+            "submitted": self.submitted,
+            "achievedSubmitRate": round(self.submitted / submit_elapsed, 3) if submit_elapsed else 0.0,
+            "outcomes": dict(sorted(self.outcomes.items())),
+            "endpoints": {
+                name: {**_distribution(self.latencies[name]),
+                       "statuses": dict(sorted(self.statuses[name].items()))}
+                for name in ENDPOINTS
+            },
+            "queueToSucceeded": _distribution(self.queue_to_succeeded),
+            "serverCreatedToCompleted": _distribution(self.server_created_to_completed),
+            "pollsPerOperation": {
+                "mean": round(sum(self.polls_per_operation) / len(self.polls_per_operation), 2)
+                if self.polls_per_operation else 0.0,
+                "max": max(self.polls_per_operation, default=0),
+            },
+        }
+
+
+def _print_summary(summary: dict, out) -> None:
+    print(
+        f"Submitted:   {summary['submitted']:,} operations at {summary['achievedSubmitRate']:.2f}/s "
+        f"(run took {summary['elapsedSeconds']:.1f}s)",
+        file=out,
+    )
+    print(f"Outcomes:    {summary['outcomes']}", file=out)
+    for name, stats in summary["endpoints"].items():
+        if stats["count"]:
+            print(
+                f"{name + ':':<16} n={stats['count']:<7,} p50 {stats['p50Ms']:.1f} ms  "
+                f"p95 {stats['p95Ms']:.1f} ms  p99 {stats['p99Ms']:.1f} ms  {stats['statuses']}",
+                file=out,
+            )
+    for label, key in (("Queue→Succeeded", "queueToSucceeded"), ("Host created→done", "serverCreatedToCompleted")):
+        stats = summary[key]
+        if stats["count"]:
+            print(
+                f"{label + ':':<19} p50 {stats['p50Ms'] / 1000:.2f} s  p95 {stats['p95Ms'] / 1000:.2f} s  "
+                f"p99 {stats['p99Ms'] / 1000:.2f} s  (n={stats['count']:,})",
+                file=out,
+            )
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    pool = HttpPool(args.base_url, args.connections, args.request_timeout, args.insecure)
+    test = LoadTest(args, pool)
+    started = time.perf_counter()
+    try:
+        submit_elapsed = await test.run()
+    finally:
+        pool.close()
+    return test.summary(submit_elapsed, time.perf_counter() - started)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Drive the Operations API at a target rate and report latency percentiles."
+    )
+    parser.add_argument("--base-url", default="http://localhost:7071",
+                        help="Functions host URL (default: http://localhost:7071)")
+    parser.add_argument("--code", help="Function key, for hosts that require one")
+    parser.add_argument("--blob", action="append",
+                        help="Blob name to submit; repeat to cycle through several (default: sample.pdf)")
+    parser.add_argument("--container", default="uploaded-pdfs",
+                        help="Container holding the blobs (default: uploaded-pdfs)")
+    parser.add_argument("--page-range", help="pageRange to send with every operation")
+    parser.add_argument("-r", "--rate", type=float, default=1.0,
+                        help="Operations submitted per second (default: 1)")
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="constant",
+                        help="Inter-arrival distribution (default: constant)")
+    parser.add_argument("-d", "--duration", type=float, default=60.0,
+                        help="Seconds to keep submitting (default: 60)")
+    parser.add_argument("-n", "--operations", type=int,
+                        help="Stop after this many submissions (default: no limit)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="First and minimum poll delay in seconds (default: 1)")
+    parser.add_argument("--max-poll-interval", type=float, default=10.0,
+                        help="Poll delay cap in seconds (default: 10)")
+    parser.add_argument("--ignore-retry-after", action="store_true",
+                        help="Back off exponentially instead of honouring Retry-After")
+    parser.add_argument("--operation-timeout", type=float, default=900.0,
+                        help="Give up polling an operation after this many seconds (default: 900)")
+    parser.add_argument("--list-rate", type=float, default=0.2,
+                        help="ListOperations calls per second; 0 disables (default: 0.2)")
+    parser.add_argument("--list-max-items", type=int, default=50,
+                        help="maxItems for ListOperations (default: 50)")
+    parser.add_argument("-c", "--connections", type=int, default=64,
+                        help="Maximum concurrent HTTP requests (default: 64)")
+    parser.add_argument("--request-timeout", type=float, default=30.0,
+                        help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--insecure", action="store_true", help="Skip TLS certificate checks")
+    parser.add_argument("--seed", type=int, help="Random seed for arrivals and jitter")
+    parser.add_argument("--json", metavar="PATH", help="Write the summary as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    args.blob = args.blob or ["sample.pdf"]
+    if args.rate <= 0 or args.duration <= 0 or args.connections < 1:
+        parser.error("--rate and --duration must be > 0 and --connections >= 1")
+    if args.poll_interval <= 0 or args.max_poll_interval < args.poll_interval:
+        parser.error("--poll-interval must be > 0 and <= --max-poll-interval")
+
+    limit = f"{args.operations:,} operations or " if args.operations else ""
+    print(
+        f"Submitting to {args.base_url} at {args.rate}/s ({args.arrival}) for {limit}{args.duration:g}s",
+        file=sys.stderr,
+    )
+    try:
+        summary = asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        print("Interrupted", file=sys.stderr)
+        return 130
+
+    _print_summary(summary, sys.stderr if args.json == "-" else sys.stdout)
+    if args.json == "-":
+        print(json.dumps(summary, indent=2))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+            f.write("\n")
+    return 0 if summary["outcomes"].get("succeeded", 0) == summary["submitted"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
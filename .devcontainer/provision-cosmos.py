@@ -6,112 +6,256 @@ The Azure CLI ``az cosmosdb`` commands target the ARM control plane, which
 the emulator does not implement, so this script talks directly to the
 emulator's data-plane REST API.
 
+Requests go through the shared :mod:`cosmos_rest` client, which reuses one
+keep-alive connection per thread and retries ``429``/``503`` responses (common
+while the emulator is still starting) with exponential backoff. Containers are
+created concurrently once the database exists.
+
 Invoked by ``.devcontainer/post-create.sh`` with the following environment
 variables:
 
 - ``COSMOS_ENDPOINT`` — emulator gateway URL (e.g. ``https://127.0.0.1:8081``)
 - ``COSMOS_KEY`` — well-known emulator master key (base64)
 - ``COSMOS_DATABASE`` — database id to create
-- ``COSMOS_CONTAINERS`` — whitespace-separated list of ``name:/partitionKey``
-  specs (e.g. ``ProcessedDocuments:/identifier Operations:/id``)
+- ``COSMOS_CONTAINERS`` — whitespace-separated list of
+  ``name:/partitionKey[:option=value,...]`` specs (e.g.
+  ``ProcessedDocuments:/identifier:autoscale=4000,exclude=/schema/* Operations:/id``).
+  Options are ``throughput=<RU/s>``, ``autoscale=<max RU/s>`` and ``exclude=<path>``
+  (repeatable).
+- ``COSMOS_PROFILE`` — optional JSON profile file; its containers replace
+  ``COSMOS_CONTAINERS`` and may also declare composite indexes::
+
+      {"containers": [{"name": "ProcessedDocuments", "partitionKey": "/identifier",
+                       "autoscaleMaxThroughput": 4000,
+                       "excludedPaths": ["/schema/*", "/pageProvenance/*"],
+                       "compositeIndexes": [[{"path": "/reviewStatus"},
+                                             {"path": "/processedAt", "order": "descending"}]]}]}
+
+Existing containers are reconciled rather than skipped: indexing policy and
+throughput are updated in place when they differ from the spec, so the script
+can be re-run to switch between indexing layouts. A container that declares no
+indexing options keeps whatever policy it already has, and one created without
+throughput options gets 400 RU/s.
 """
 from __future__ import annotations
 
-import base64
-import datetime
-import hashlib
-import hmac
 import json
 import os
-import ssl
 import sys
-import urllib.error
-import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from cosmos_rest import request
 
-ENDPOINT = os.environ["COSMOS_ENDPOINT"]
-KEY = os.environ["COSMOS_KEY"]
 DB = os.environ["COSMOS_DATABASE"]
-CONTAINERS = [
-    tuple(spec.split(":", 1))
-    for spec in os.environ["COSMOS_CONTAINERS"].split()
-]
-
-# The emulator uses a self-signed certificate; trust is established at the
-# system level by the calling shell script. Disable verification here so the
-# script also works before/without that trust import.
-_ctx = ssl.create_default_context()
-_ctx.check_hostname = False
-_ctx.verify_mode = ssl.CERT_NONE
-
-
-def _auth_header(verb: str, resource_type: str, resource_id: str, date: str) -> str:
-    text = f"{verb.lower()}\n{resource_type.lower()}\n{resource_id}\n{date.lower()}\n\n"
-    sig = base64.b64encode(
-        hmac.new(base64.b64decode(KEY), text.encode("utf-8"), hashlib.sha256).digest()
-    ).decode()
-    return urllib.parse.quote(f"type=master&ver=1.0&sig={sig}", safe="")
-
-
-def _request(
-    verb: str,
-    path: str,
-    resource_type: str,
-    resource_id: str,
-    body: dict | None = None,
-    extra_headers: dict | None = None,
-) -> tuple[int, bytes]:
-    date = datetime.datetime.now(datetime.UTC).strftime("%a, %d %b %Y %H:%M:%S GMT")
-    headers = {
-        "Authorization": _auth_header(verb, resource_type, resource_id, date),
-        "x-ms-date": date,
-        "x-ms-version": "2018-12-31",
-        "Accept": "application/json",
-        "Content-Type": "application/json",
-    }
-    if extra_headers:
-        headers.update(extra_headers)
-    data = json.dumps(body).encode("utf-8") if body is not None else None
-    req = urllib.request.Request(f"{ENDPOINT}{path}", data=data, headers=headers, method=verb)
-    try:
-        with urllib.request.urlopen(req, context=_ctx, timeout=30) as resp:
-            return resp.status, resp.read()
-    except urllib.error.HTTPError as e:
-        return e.code, e.read()
+DEFAULT_THROUGHPUT = 400
+# Always excluded by Cosmos itself; kept out of comparisons.
+_ETAG_PATH = '/"_etag"/?'
+
+
+def _parse_spec(spec: str) -> dict:
+    """Parse ``name:/partitionKey[:option=value,...]`` into a profile entry."""
+    name, _, rest = spec.partition(":")
+    partition_key, _, options = rest.partition(":")
+    if not name or not partition_key.startswith("/"):
+        raise ValueError(f"Invalid container spec '{spec}' (expected name:/partitionKey)")
+    container = {"name": name, "partitionKey": partition_key}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        if key == "throughput":
+            container["throughput"] = int(value)
+        elif key == "autoscale":
+            container["autoscaleMaxThroughput"] = int(value)
+        elif key == "exclude":
+            container.setdefault("excludedPaths", []).append(value)
+        else:
+            raise ValueError(f"Unknown option '{key}' in container spec '{spec}'")
+    return container
+
+
+def _load_containers() -> list[dict]:
+    profile_path = os.environ.get("COSMOS_PROFILE")
+    if profile_path:
+        with open(profile_path, "r", encoding="utf-8") as f:
+            containers = json.load(f)["containers"]
+    else:
+        containers = [_parse_spec(spec) for spec in os.environ["COSMOS_CONTAINERS"].split()]
+    for container in containers:
+        if "throughput" in container and "autoscaleMaxThroughput" in container:
+            raise ValueError(
+                f"Container '{container['name']}' sets both throughput and autoscaleMaxThroughput"
+            )
+    return containers
 
 
 def _log(message: str) -> None:
     print(f"[post-create]   {message}")
 
 
+def _indexing_policy(container: dict) -> dict | None:
+    """Return the desired indexing policy, or None to leave indexing alone."""
+    if "excludedPaths" not in container and "compositeIndexes" not in container:
+        return None
+    return {
+        "indexingMode": "consistent",
+        "automatic": True,
+        "includedPaths": [{"path": "/*"}],
+        "excludedPaths": [{"path": path} for path in container.get("excludedPaths", [])]
+        + [{"path": _ETAG_PATH}],
+        "compositeIndexes": [
+            [{"path": part["path"], "order": part.get("order", "ascending")} for part in composite]
+            for composite in container.get("compositeIndexes", [])
+        ],
+    }
+
+
+def _policy_key(policy: dict) -> tuple:
+    """Comparable form of the parts of an indexing policy we manage."""
+    excluded = sorted(
+        entry["path"] for entry in policy.get("excludedPaths", []) if entry["path"] != _ETAG_PATH
+    )
+    composites = sorted(
+        tuple((part["path"], part.get("order", "ascending").lower()) for part in composite)
+        for composite in policy.get("compositeIndexes", [])
+    )
+    return tuple(excluded), tuple(composites)
+
+
+def _throughput_headers(container: dict) -> dict:
+    if "autoscaleMaxThroughput" in container:
+        return {
+            "x-ms-cosmos-offer-autopilot-settings": json.dumps(
+                {"maxThroughput": container["autoscaleMaxThroughput"]}
+            )
+        }
+    return {"x-ms-offer-throughput": str(container.get("throughput", DEFAULT_THROUGHPUT))}
+
+
+def _reconcile_indexing(container: dict, existing: dict) -> str | None:
+    name = container["name"]
+    policy = _indexing_policy(container)
+    if policy is None or _policy_key(policy) == _policy_key(existing.get("indexingPolicy", {})):
+        return None
+    body = {"id": name, "partitionKey": existing["partitionKey"], "indexingPolicy": policy}
+    status, resp = request("PUT", f"/dbs/{DB}/colls/{name}", "colls", f"dbs/{DB}/colls/{name}", body)
+    if status != 200:
+        raise RuntimeError(f"updating indexing policy: HTTP {status} {resp!r}")
+    return "indexing policy updated"
+
+
+def _reconcile_throughput(container: dict, existing: dict) -> str | None:
+    if "throughput" not in container and "autoscaleMaxThroughput" not in container:
+        return None
+    status, resp = request(
+        "POST",
+        "/offers",
+        "offers",
+        "",
+        {
+            "query": "SELECT * FROM root WHERE root.offerResourceId = @rid",
+            "parameters": [{"name": "@rid", "value": existing["_rid"]}],
+        },
+        extra_headers={
+            "Content-Type": "application/query+json",
+            "x-ms-documentdb-isquery": "True",
+        },
+    )
+    offers = json.loads(resp).get("Offers", []) if status == 200 else []
+    if not offers:
+        raise RuntimeError(f"reading throughput offer: HTTP {status} {resp!r}")
+    offer = offers[0]
+    content = offer.setdefault("content", {})
+    autoscale = content.get("offerAutopilotSettings")
+
+    if "autoscaleMaxThroughput" in container:
+        wanted = container["autoscaleMaxThroughput"]
+        if autoscale is None:
+            raise RuntimeError("has manual throughput; delete it to switch to autoscale")
+        if autoscale.get("maxThroughput") == wanted:
+            return None
+        autoscale["maxThroughput"] = wanted
+        change = f"autoscale max {wanted} RU/s"
+    else:
+        wanted = container["throughput"]
+        if autoscale is not None:
+            raise RuntimeError("has autoscale throughput; delete it to switch to manual")
+        if content.get("offerThroughput") == wanted:
+            return None
+        content["offerThroughput"] = wanted
+        change = f"throughput {wanted} RU/s"
+
+    offer_id = offer["id"]
+    status, resp = request("PUT", f"/offers/{offer['_rid']}", "offers", offer_id.lower(), offer)
+    if status != 200:
+        raise RuntimeError(f"updating throughput: HTTP {status} {resp!r}")
+    return change
+
+
+def _create_container(container: dict) -> tuple[str, list[str] | None, str | None]:
+    """Create or reconcile one container; returns (name, changes, error)."""
+    name = container["name"]
+    pk = container["partitionKey"]
+    container_body = {"id": name, "partitionKey": {"paths": [pk], "kind": "Hash"}}
+    policy = _indexing_policy(container)
+    if policy is not None:
+        container_body["indexingPolicy"] = policy
+    status, resp = request(
+        "POST",
+        f"/dbs/{DB}/colls",
+        "colls",
+        f"dbs/{DB}",
+        container_body,
+        extra_headers=_throughput_headers(container),
+    )
+    if status == 201:
+        return name, ["created"], None
+    if status != 409:
+        return name, None, f"HTTP {status} {resp!r}"
+
+    status, resp = request("GET", f"/dbs/{DB}/colls/{name}", "colls", f"dbs/{DB}/colls/{name}")
+    if status != 200:
+        return name, None, f"reading existing container: HTTP {status} {resp!r}"
+    existing = json.loads(resp)
+    existing_pk = existing["partitionKey"]["paths"][0]
+    if existing_pk != pk:
+        return name, None, f"exists with partition key {existing_pk}; delete it to change to {pk}"
+    changes = []
+    for reconcile in (_reconcile_indexing, _reconcile_throughput):
+        try:
+            change = reconcile(container, existing)
+        except RuntimeError as e:
+            done = f" (after: {', '.join(changes)})" if changes else ""
+            return name, None, f"{e}{done}"
+        if change:
+            changes.append(change)
+    return name, changes or ["already up to date"], None
+
+
 def main() -> int:
-    status, body = _request("POST", "/dbs", "dbs", "", {"id": DB})
+    try:
+        containers = _load_containers()
+    except (OSError, KeyError, ValueError) as e:
+        _log(f"ERROR reading container specs: {e}")
+        return 1
+
+    status, body = request("POST", "/dbs", "dbs", "", {"id": DB})
     if status in (201, 409):
         _log(f"database '{DB}': {'created' if status == 201 else 'already exists'}")
     else:
         _log(f"ERROR creating database: HTTP {status} {body!r}")
         return 1
 
-    for name, pk in CONTAINERS:
-        container_body = {"id": name, "partitionKey": {"paths": [pk], "kind": "Hash"}}
-        status, resp = _request(
-            "POST",
-            f"/dbs/{DB}/colls",
-            "colls",
-            f"dbs/{DB}",
-            container_body,
-            extra_headers={"x-ms-offer-throughput": "400"},
-        )
-        if status in (201, 409):
-            _log(
-                f"container '{name}' (pk={pk}): "
-                f"{'created' if status == 201 else 'already exists'}"
-            )
-        else:
-            _log(f"ERROR creating container '{name}': HTTP {status} {resp!r}")
-            return 1
+    exit_code = 0
+    by_name = {container["name"]: container for container in containers}
+    with ThreadPoolExecutor(max_workers=max(1, len(containers))) as executor:
+        for name, changes, error in executor.map(_create_container, containers):
+            pk = by_name[name]["partitionKey"]
+            if error is None:
+                _log(f"container '{name}' (pk={pk}): {', '.join(changes)}")
+            else:
+                _log(f"ERROR provisioning container '{name}': {error}")
+                exit_code = 1
 
-    return 0
+    return exit_code
 
 
 if __name__ == "__main__":
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""Seed the local Cosmos DB emulator with synthetic DocumentOcr data.
+
+Bulk-inserts ``DocumentOcrEntity``-shaped documents (all 13 schema fields,
+page provenance, a mix of Pending/Reviewed records) into ``ProcessedDocuments``
+and matching records into ``Operations`` so ``CosmosDbService`` queries and the
+Documents page can be exercised under realistic volume.
+
+Requests go through the shared :mod:`cosmos_rest` client with a bounded number
+in flight. The RU charge of each request (``x-ms-request-charge``) and its
+latency are recorded, and a throughput summary is printed at the end. Point
+``--endpoint`` at any server speaking the Cosmos REST protocol, such as the
+emulator or a local stand-in.
+
+Environment variables (overridable with flags):
+
+- ``COSMOS_ENDPOINT`` — gateway URL (e.g. ``https://127.0.0.1:8081``)
+- ``COSMOS_KEY`` — master key (base64)
+- ``COSMOS_DATABASE`` — database id (default ``DocumentOcrDb``)
+
+Example::
+
+    python3 .devcontainer/seed-cosmos.py --documents 50000 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cosmos_rest
+
+FIELD_NAMES = (
+    "fileTkNumber",
+    "criminalCodeForm",
+    "policeFileNumber",
+    "agency",
+    "accusedSex",
+    "accusedName",
+    "accusedDateOfBirth",
+    "mainCharge",
+    "signedOn",
+    "judgeSignature",
+    "endorsementSignature",
+    "endorsementSignedOn",
+    "additionalCharges",
+)
+DATE_FIELDS = {"accusedDateOfBirth", "signedOn", "endorsementSignedOn"}
+SIGNATURE_FIELDS = {"judgeSignature", "endorsementSignature"}
+
+AGENCIES = ("RCMP", "Vancouver PD", "Surrey PD", "Victoria PD", "Kelowna RCMP", "Burnaby RCMP")
+FIRST_NAMES = ("Alex", "Jordan", "Sam", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery")
+LAST_NAMES = ("Smith", "Nguyen", "Singh", "Brown", "Tremblay", "Martin", "Lee", "Wilson", "Chen")
+CHARGES = (
+    "Theft under $5000",
+    "Mischief",
+    "Assault",
+    "Impaired operation",
+    "Breach of undertaking",
+    "Possession of stolen property",
+    "Uttering threats",
+)
+REVIEWERS = ("reviewer1@contoso.com", "reviewer2@contoso.com", "reviewer3@contoso.com")
+
+
+def _iso(moment: datetime.datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _ocr_value(rng: random.Random, name: str, identifier: str):
+    """Return ``(ocrValue, ocrRawText)`` for one field."""
+    if name == "fileTkNumber":
+        return identifier, None
+    if name in SIGNATURE_FIELDS:
+        return rng.random() < 0.8, None
+    if name in DATE_FIELDS:
+        day = datetime.date(1960, 1, 1) + datetime.timedelta(days=rng.randrange(24000))
+        raw = day.strftime("%B %d, %Y")
+        # A share of dates fail to parse: value null, raw text kept
+        return (None if rng.random() < 0.05 else day.isoformat()), raw
+    if rng.random() < 0.05:
+        return None, None
+    if name == "criminalCodeForm":
+        return f"Form {rng.randint(1, 12)}", None
+    if name == "policeFileNumber":
+        return f"{rng.randint(2015, 2026)}-{rng.randint(1, 999999):06d}", None
+    if name == "agency":
+        return rng.choice(AGENCIES), None
+    if name == "accusedSex":
+        return rng.choice(("M", "F")), None
+    if name == "accusedName":
+        return f"{rng.choice(LAST_NAMES).upper()}, {rng.choice(FIRST_NAMES)}", None
+    if name == "mainCharge":
+        return rng.choice(CHARGES), None
+    # additionalCharges: page-ordered concatenation of zero or more charges
+    return "\n".join(rng.sample(CHARGES, rng.randint(0, 3))) or None, None
+
+
+def build_document(rng: random.Random, operation: dict, number: int, reviewed_ratio: float) -> dict:
+    """Build one synthetic ``DocumentOcrEntity``."""
+    identifier = f"TK-{rng.randint(0, 9_999_999):07d}"
+    first_page = rng.randint(1, 40)
+    page_count = rng.choice((1, 1, 2, 2, 3, 4, 6, 10))
+    page_numbers = list(range(first_page, first_page + page_count))
+    processed_at = datetime.datetime.now(datetime.UTC) - datetime.timedelta(
+        minutes=rng.randrange(60 * 24 * 90)
+    )
+    reviewed = rng.random() < reviewed_ratio
+    reviewer = rng.choice(REVIEWERS)
+    reviewed_at = processed_at + datetime.timedelta(minutes=rng.randint(5, 600))
+
+    schema = {}
+    pending_left = not reviewed
+    for index, name in enumerate(FIELD_NAMES):
+        value, raw = _ocr_value(rng, name, identifier)
+        field = {
+            "ocrValue": value,
+            "ocrConfidence": None if value is None else round(rng.betavariate(8, 1.5), 3),
+            "reviewedValue": None,
+            "reviewedAt": None,
+            "reviewedBy": None,
+            "fieldStatus": "Pending",
+        }
+        if raw is not None:
+            field["ocrRawText"] = raw
+        # Reviewed records have no Pending fields; Pending records keep at least one.
+        force_pending = pending_left and index == len(FIELD_NAMES) - 1
+        if not force_pending and (reviewed or rng.random() < 0.3):
+            corrected = rng.random() < 0.15 and name not in SIGNATURE_FIELDS
+            field["fieldStatus"] = "Corrected" if corrected else "Confirmed"
+            field["reviewedValue"] = f"{value or ''} (corrected)" if corrected else None
+            field["reviewedAt"] = _iso(reviewed_at)
+            field["reviewedBy"] = reviewer
+        schema[name] = field
+
+    provenance = [
+        {
+            "pageNumber": page,
+            "identifierSource": "Extracted" if offset == 0 or rng.random() < 0.2 else "Inferred",
+            "extractedIdentifier": None,
+        }
+        for offset, page in enumerate(page_numbers)
+    ]
+    for entry in provenance:
+        if entry["identifierSource"] == "Extracted":
+            entry["extractedIdentifier"] = identifier
+
+    blob_stem = operation["blobName"].rsplit(".", 1)[0]
+    blob_name = f"{blob_stem}_{number:04d}.pdf"
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "identifier": identifier,
+        "operationId": operation["id"],
+        "originalFileName": operation["blobName"],
+        "blobName": blob_name,
+        "containerName": "processed-documents",
+        "pdfBlobUrl": f"http://127.0.0.1:10000/devstoreaccount1/processed-documents/{blob_name}",
+        "documentNumber": number,
+        "pageCount": page_count,
+        "pageNumbers": page_numbers,
+        "processedAt": _iso(processed_at),
+        "schema": schema,
+        "pageProvenance": provenance,
+        "reviewStatus": "Reviewed" if reviewed else "Pending",
+        "reviewedBy": reviewer if reviewed else None,
+        "reviewedAt": _iso(reviewed_at) if reviewed else None,
+        "lastCheckedInBy": reviewer if reviewed else None,
+        "lastCheckedInAt": _iso(reviewed_at) if reviewed else None,
+        "checkedOutBy": None,
+        "checkedOutAt": None,
+    }
+
+
+def build_operation(rng: random.Random, index: int) -> dict:
+    """Build one synthetic ``Operation`` (status serialized as its enum number)."""
+    created = datetime.datetime.now(datetime.UTC) - datetime.timedelta(
+        minutes=rng.randrange(60 * 24 * 90)
+    )
+    operation_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    return {
+        "id": operation_id,
+        "status": 2,  # OperationStatus.Succeeded
+        "blobName": f"seed-batch-{index:06d}.pdf",
+        "containerName": "uploaded-pdfs",
+        "createdAt": _iso(created),
+        "startedAt": _iso(created + datetime.timedelta(seconds=2)),
+        "completedAt": _iso(created + datetime.timedelta(seconds=rng.randint(20, 900))),
+        "error": None,
+        "processedDocuments": 0,
+        "totalDocuments": 0,
+        "resultBlobName": None,
+        "cancelRequested": False,
+        "resourceUrl": f"/api/operations/{operation_id}",
+    }
+
+
+class _Stats:
+    """Thread-safe per-request measurements."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: list[float] = []
+        self.charge = 0.0
+        self.statuses: Counter[int] = Counter()
+        self.retries = 0
+
+    def record(self, response: cosmos_rest.Response, latency: float) -> None:
+        charge = float(response.headers.get("x-ms-request-charge") or 0.0)
+        with self._lock:
+            self.latencies.append(latency)
+            self.charge += charge
+            self.statuses[response.status] += 1
+            self.retries += response.attempts - 1
+
+
+def _insert(database: str, container: str, partition_value: str, doc: dict, stats: _Stats) -> None:
+    started = time.perf_counter()
+    response = cosmos_rest.send(
+        "POST",
+        f"/dbs/{database}/colls/{container}/docs",
+        "docs",
+        f"dbs/{database}/colls/{container}",
+        doc,
+        extra_headers={
+            "x-ms-documentdb-partitionkey": json.dumps([partition_value]),
+            "x-ms-documentdb-is-upsert": "True",
+        },
+    )
+    stats.record(response, time.perf_counter() - started)
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def seed(
+    database: str,
+    documents_container: str,
+    operations_container: str,
+    documents: int,
+    operations: int,
+    concurrency: int,
+    reviewed_ratio: float,
+    seed_value: int | None,
+) -> _Stats:
+    rng = random.Random(seed_value)
+    ops = [build_operation(rng, index) for index in range(max(1, operations))]
+    per_operation: Counter[str] = Counter()
+
+    def jobs():
+        for operation in ops[:operations]:
+            yield operations_container, operation["id"], operation
+        for number in range(documents):
+            operation = ops[number % len(ops)]
+            per_operation[operation["id"]] += 1
+            doc = build_document(rng, operation, per_operation[operation["id"]], reviewed_ratio)
+            yield documents_container, doc["identifier"], doc
+
+    stats = _Stats()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight: deque = deque()
+        for container, partition_value, doc in jobs():
+            if len(in_flight) >= concurrency * 2:
+                in_flight.popleft().result()
+            in_flight.append(
+                executor.submit(_insert, database, container, partition_value, doc, stats)
+            )
+        while in_flight:
+            in_flight.popleft().result()
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Bulk-insert synthetic ProcessedDocuments and Operations records."
+    )
+    parser.add_argument("--endpoint", default=os.environ.get("COSMOS_ENDPOINT"),
+                        help="Cosmos gateway URL (default: $COSMOS_ENDPOINT)")
+    parser.add_argument("--key", default=os.environ.get("COSMOS_KEY"),
+                        help="Cosmos master key (default: $COSMOS_KEY)")
+    parser.add_argument("--database", default=os.environ.get("COSMOS_DATABASE", "DocumentOcrDb"),
+                        help="Database id (default: $COSMOS_DATABASE or DocumentOcrDb)")
+    parser.add_argument("--documents-container", default="ProcessedDocuments")
+    parser.add_argument("--operations-container", default="Operations")
+    parser.add_argument("-n", "--documents", type=int, default=1000,
+                        help="Number of documents to insert (default: 1000)")
+    parser.add_argument("--operations", type=int,
+                        help="Number of operations to insert (default: one per 5 documents)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16,
+                        help="Maximum requests in flight (default: 16)")
+    parser.add_argument("--reviewed-ratio", type=float, default=0.3,
+                        help="Share of documents with reviewStatus Reviewed (default: 0.3)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible data")
+    args = parser.parse_args()
+
+    if not args.endpoint or not args.key:
+        parser.error("--endpoint/--key (or COSMOS_ENDPOINT/COSMOS_KEY) are required")
+    if args.documents < 0 or args.concurrency < 1:
+        parser.error("--documents must be >= 0 and --concurrency >= 1")
+    operations = args.operations if args.operations is not None else max(1, args.documents // 5)
+
+    cosmos_rest.configure(endpoint=args.endpoint, key=args.key)
+    print(
+        f"Seeding {args.documents:,} documents and {operations:,} operations "
+        f"into '{args.database}' at {args.endpoint} (concurrency {args.concurrency})"
+    )
+
+    started = time.perf_counter()
+    stats = seed(
+        args.database,
+        args.documents_container,
+        args.operations_container,
+        args.documents,
+        operations,
+        args.concurrency,
+        args.reviewed_ratio,
+        args.seed,
+    )
+    elapsed = time.perf_counter() - started
+
+    requests = len(stats.latencies)
+    latencies = sorted(stats.latencies)
+    failures = sum(count for status, count in stats.statuses.items() if status not in (200, 201))
+    print(f"Requests:    {requests:,} in {elapsed:.2f}s ({requests / elapsed if elapsed else 0:,.1f} req/s)")
+    print(f"Statuses:    {dict(sorted(stats.statuses.items()))} (retries: {stats.retries:,})")
+    print(
+        f"RU charge:   {stats.charge:,.1f} total, "
+        f"{stats.charge / requests if requests else 0:.2f}/request, "
+        f"{stats.charge / elapsed if elapsed else 0:,.1f} RU/s"
+    )
+    print(
+        "Latency ms:  "
+        f"p50 {_percentile(latencies, 0.50) * 1000:.1f}  "
+        f"p95 {_percentile(latencies, 0.95) * 1000:.1f}  "
+        f"p99 {_percentile(latencies, 0.99) * 1000:.1f}  "
+        f"max {(latencies[-1] if latencies else 0) * 1000:.1f}"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""Minimal Azure Storage (Blob and Queue) REST client for the devcontainer scripts.
+
+The storage counterpart of :mod:`cosmos_rest`: requests are signed with the
+account's Shared Key, each thread keeps one keep-alive connection per service
+endpoint, and ``500``/``503`` responses and dropped connections are retried with
+exponential backoff. Works against Azurite (path-style URLs such as
+``http://127.0.0.1:10000/devstoreaccount1``) and real storage accounts.
+
+:class:`StorageClient` is built from a connection string; ``UseDevelopmentStorage=true``
+expands to the well-known Azurite account.
+"""
+from __future__ import annotations
+
+import base64
+import email.utils
+import hashlib
+import hmac
+import http.client
+import random
+import threading
+import time
+import urllib.parse
+from concurrent.futures import Executor
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+RETRYABLE_STATUSES = (500, 503)
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10.0
+
+API_VERSION = "2021-08-06"
+# Blobs up to this size go up in a single Put Blob request.
+SINGLE_PUT_LIMIT = 8 * 1024 * 1024
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+AZURITE_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+    "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;"
+    "BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
+    "QueueEndpoint=http://127.0.0.1:10001/devstoreaccount1;"
+)
+
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+    headers: http.client.HTTPMessage
+    attempts: int
+
+
+class StorageError(Exception):
+    """A storage request finished with an unexpected status."""
+
+    def __init__(self, action: str, response: Response) -> None:
+        super().__init__(f"{action}: HTTP {response.status} {response.body[:300]!r}")
+        self.response = response
+
+
+def parse_connection_string(connection_string: str) -> dict[str, str]:
+    """Return the key/value pairs of a storage connection string, with endpoints filled in."""
+    if connection_string.strip().rstrip(";") == "UseDevelopmentStorage=true":
+        connection_string = AZURITE_CONNECTION_STRING
+    settings = {}
+    for part in filter(None, connection_string.split(";")):
+        key, _, value = part.partition("=")
+        settings[key.strip()] = value.strip()
+    if "AccountName" not in settings or "AccountKey" not in settings:
+        raise ValueError("Connection string must contain AccountName and AccountKey")
+    protocol = settings.get("DefaultEndpointsProtocol", "https")
+    suffix = settings.get("EndpointSuffix", "core.windows.net")
+    for service in ("Blob", "Queue"):
+        settings.setdefault(
+            f"{service}Endpoint", f"{protocol}://{settings['AccountName']}.{service.lower()}.{suffix}"
+        )
+    return settings
+
+
+class StorageClient:
+    """Signs and sends Blob and Queue requests for one storage account."""
+
+    def __init__(self, connection_string: str) -> None:
+        settings = parse_connection_string(connection_string)
+        self.account = settings["AccountName"]
+        self.endpoints = {
+            "blob": urllib.parse.urlsplit(settings["BlobEndpoint"].rstrip("/")),
+            "queue": urllib.parse.urlsplit(settings["QueueEndpoint"].rstrip("/")),
+        }
+        self._hmac = hmac.new(base64.b64decode(settings["AccountKey"]), digestmod=hashlib.sha256)
+        self._local = threading.local()
+
+    def _sign(self, verb: str, path: str, query: dict[str, str], headers: dict[str, str]) -> str:
+        canonical_headers = "".join(
+            f"{name}:{headers[name]}\n" for name in sorted(headers) if name.startswith("x-ms-")
+        )
+        resource = f"/{self.account}{path}" + "".join(
+            f"\n{name.lower()}:{query[name]}" for name in sorted(query, key=str.lower)
+        )
+        length = headers.get("Content-Length", "")
+        text = "\n".join([
+            verb,
+            "",  # Content-Encoding
+            "",  # Content-Language
+            "" if length == "0" else length,
+            headers.get("Content-MD5", ""),
+            headers.get("Content-Type", ""),
+            "",  # Date (x-ms-date is used instead)
+            "", "", "", "", "",  # If-* and Range
+        ]) + "\n" + canonical_headers + resource
+        mac = self._hmac.copy()
+        mac.update(text.encode("utf-8"))
+        return f"SharedKey {self.account}:{base64.b64encode(mac.digest()).decode()}"
+
+    def _connection(self, service: str) -> http.client.HTTPConnection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        conn = connections.get(service)
+        if conn is None:
+            url = self.endpoints[service]
+            cls = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+            conn = connections[service] = cls(url.hostname, url.port, timeout=60)
+        return conn
+
+    def _reset_connection(self, service: str) -> None:
+        conn = getattr(self._local, "connections", {}).pop(service, None)
+        if conn is not None:
+            conn.close()
+
+    def send(
+        self,
+        service: str,
+        verb: str,
+        resource: str,
+        query: dict[str, str] | None = None,
+        body: bytes = b"",
+        extra_headers: dict | None = None,
+    ) -> Response:
+        """Send a signed request to ``service`` (``"blob"`` or ``"queue"``), retrying transient failures."""
+        query = query or {}
+        path = self.endpoints[service].path + "/" + urllib.parse.quote(resource, safe="/~")
+        url = path + ("?" + urllib.parse.urlencode(query) if query else "")
+        for attempt in range(MAX_ATTEMPTS):
+            headers = {
+                "x-ms-date": email.utils.formatdate(usegmt=True),
+                "x-ms-version": API_VERSION,
+                "Content-Length": str(len(body)),
+            }
+            if extra_headers:
+                headers.update(extra_headers)
+            headers["Authorization"] = self._sign(verb, path, query, headers)
+            last_attempt = attempt == MAX_ATTEMPTS - 1
+            try:
+                conn = self._connection(service)
+                conn.request(verb, url, body=body, headers=headers)
+                resp = conn.getresponse()
+                payload = resp.read()
+            except (http.client.HTTPException, OSError):
+                self._reset_connection(service)
+                if last_attempt:
+                    raise
+                time.sleep(_backoff(attempt))
+                continue
+            if resp.status in RETRYABLE_STATUSES and not last_attempt:
+                time.sleep(_backoff(attempt))
+                continue
+            return Response(resp.status, payload, resp.headers, attempt + 1)
+        raise AssertionError("unreachable")
+
+    # --- Blob ------------------------------------------------------------------
+
+    def create_container(self, container: str) -> bool:
+        """Create a blob container; returns False if it already existed."""
+        response = self.send("blob", "PUT", container, {"restype": "container"})
+        if response.status not in (201, 409):
+            raise StorageError(f"creating container '{container}'", response)
+        return response.status == 201
+
+    def upload_blob(
+        self,
+        container: str,
+        name: str,
+        data: bytes,
+        content_type: str = "application/pdf",
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        executor: Executor | None = None,
+    ) -> str:
+        """
+        Upload ``data`` as a block blob, overwriting any existing blob.
+
+        Small blobs use one Put Blob request. Larger ones are staged as blocks of
+        ``block_size`` bytes (in parallel when an ``executor`` is given) and
+        committed with Put Block List. Returns the base64 MD5 of ``data``, which
+        is also stored as the blob's ``Content-MD5``.
+        """
+        md5 = base64.b64encode(hashlib.md5(data).digest()).decode()
+        resource = f"{container}/{name}"
+        if len(data) <= SINGLE_PUT_LIMIT:
+            response = self.send("blob", "PUT", resource, body=data, extra_headers={
+                "x-ms-blob-type": "BlockBlob",
+                "Content-Type": content_type,
+                "x-ms-blob-content-md5": md5,
+            })
+            if response.status != 201:
+                raise StorageError(f"uploading '{resource}'", response)
+            return md5
+
+        # Block ids must all have the same length before encoding
+        block_ids = [
+            base64.b64encode(f"{index:08d}".encode()).decode()
+            for index in range((len(data) + block_size - 1) // block_size)
+        ]
+
+        def put_block(index: int) -> None:
+            chunk = data[index * block_size:(index + 1) * block_size]
+            response = self.send(
+                "blob", "PUT", resource, {"comp": "block", "blockid": block_ids[index]}, body=chunk
+            )
+            if response.status != 201:
+                raise StorageError(f"uploading block {index} of '{resource}'", response)
+
+        if executor is None:
+            for index in range(len(block_ids)):
+                put_block(index)
+        else:
+            for future in [executor.submit(put_block, index) for index in range(len(block_ids))]:
+                future.result()
+
+        block_list = (
+            '<?xml version="1.0" encoding="utf-8"?><BlockList>'
+            + "".join(f"<Latest>{block_id}</Latest>" for block_id in block_ids)
+            + "</BlockList>"
+        ).encode("utf-8")
+        response = self.send("blob", "PUT", resource, {"comp": "blocklist"}, body=block_list, extra_headers={
+            "Content-Type": "application/xml",
+            "x-ms-blob-content-type": content_type,
+            "x-ms-blob-content-md5": md5,
+        })
+        if response.status != 201:
+            raise StorageError(f"committing blocks of '{resource}'", response)
+        return md5
+
+    # --- Queue -----------------------------------------------------------------
+
+    def create_queue(self, queue: str) -> bool:
+        """Create a queue; returns False if it already existed."""
+        response = self.send("queue", "PUT", queue)
+        if response.status not in (201, 204, 409):
+            raise StorageError(f"creating queue '{queue}'", response)
+        return response.status == 201
+
+    def put_message(self, queue: str, text: str, base64_encode: bool = True) -> None:
+        """
+        Enqueue one message.
+
+        With ``base64_encode`` (the default) the text is base64-encoded first, as
+        ``QueueMessageEncoding.Base64`` clients and the Functions queue trigger expect.
+        """
+        if base64_encode:
+            text = base64.b64encode(text.encode("utf-8")).decode()
+        body = f"<QueueMessage><MessageText>{escape(text)}</MessageText></QueueMessage>".encode("utf-8")
+        response = self.send(
+            "queue", "POST", f"{queue}/messages", body=body,
+            extra_headers={"Content-Type": "application/xml"},
+        )
+        if response.status != 201:
+            raise StorageError(f"enqueueing to '{queue}'", response)
+
+
+def _backoff(attempt: int) -> float:
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+    return delay * random.uniform(0.5, 1.0)
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""Bulk-submit a directory of PDFs to the DocumentOcr processing queue.
+
+For every PDF under the input directory this does what ``StartOperation`` does
+for one upload, without going through the Functions host:
+
+1. uploads the file to the uploads container (large files as blocks staged in
+   parallel, then committed with Put Block List);
+2. upserts a ``NotStarted`` ``Operation`` record into the Operations container,
+   carrying the ``pageSelection`` for ``--page-range`` like the API does;
+3. enqueues the ``QueueMessageWrapper`` JSON
+   (``{"OperationId": ..., "Message": {"BlobName", "ContainerName", "PageRange"}}``)
+   base64-encoded on ``pdf-processing-queue``.
+
+Files are processed in batches of ``--batch-size``: each stage runs for the whole
+batch with at most ``--concurrency`` files in flight, so a message is never
+enqueued before its blob and operation exist. ``--rate`` caps messages per
+second so a backfill does not swamp the workers.
+
+Progress is appended to a JSON Lines manifest (default
+``<directory>/.submit-manifest.jsonl``) after every stage of every file.
+Re-running the same command resumes: files already enqueued are skipped and
+files interrupted mid-way continue from their last completed stage with the
+same operation id. A file whose size or modification time changed since it was
+recorded is submitted again as a new operation. Delivery is at-least-once: a
+crash between enqueueing and writing the manifest line re-sends that message.
+
+Environment variables (overridable with flags):
+
+- ``AZURE_STORAGE_CONNECTION_STRING`` — storage account (default: Azurite)
+- ``COSMOS_ENDPOINT`` / ``COSMOS_KEY`` — Cosmos gateway URL and master key
+- ``COSMOS_DATABASE`` — database id (default ``DocumentOcrDb``)
+
+Example::
+
+    python3 .devcontainer/submit-batch.py ~/backfill/2025 --prefix backfill/2025/ \\
+        --concurrency 8 --rate 5
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cosmos_rest
+from storage_rest import StorageClient, StorageError
+
+# The page selection parser shared with the utilities (standard library only)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from page_selection import is_all_pages, normalize_page_expression, parse_page_range  # noqa: E402
+
+MANIFEST_NAME = ".submit-manifest.jsonl"
+STAGES = ("uploaded", "created", "enqueued")
+
+
+def _iso(moment: datetime.datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_page_selection(expression: str | None) -> dict | None:
+    """
+    ``PageSelection.TryParse`` (without a page limit), through ``utils/page_selection.py``.
+
+    Returns the persisted ``{"expression", "pages"}`` form, or None for "all pages".
+    Raises ValueError with the same messages as the C# parser.
+    """
+    if is_all_pages(expression):
+        return None
+    return {"expression": normalize_page_expression(expression), "pages": parse_page_range(expression)}
+
+
+class _Manifest:
+    """Append-only JSON Lines progress log; the last record per file wins."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.records: dict[str, dict] = {}
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted run
+                        continue
+                    self.records[record["file"]] = record
+        self._lock = threading.Lock()
+        self._file = path.open("a", encoding="utf-8")
+
+    def record(self, entry: dict) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.records[entry["file"]] = entry
+            self._file.write(line)
+            self._file.flush()
+
+    def sync(self) -> None:
+        with self._lock:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _RateLimiter:
+    """Spaces calls at least ``1/rate`` seconds apart across threads; ``rate <= 0`` disables it."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Submitter:
+    def __init__(self, args: argparse.Namespace, storage: StorageClient, manifest: _Manifest) -> None:
+        self.args = args
+        self.storage = storage
+        self.manifest = manifest
+        self.page_selection = parse_page_selection(args.page_range)
+        self.limiter = _RateLimiter(args.rate)
+        self.block_pool = ThreadPoolExecutor(max_workers=args.block_concurrency)
+        self.counts: Counter[str] = Counter()
+        self.bytes_uploaded = 0
+        self.errors: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def _upload(self, entry: dict) -> dict:
+        data = (self.args.directory / entry["file"]).read_bytes()
+        md5 = self.storage.upload_blob(
+            self.args.container,
+            entry["blobName"],
+            data,
+            block_size=self.args.block_size_mb * 1024 * 1024,
+            executor=self.block_pool,
+        )
+        with self._lock:
+            self.bytes_uploaded += len(data)
+        return {**entry, "stage": "uploaded", "contentMd5": md5}
+
+    def _create_operation(self, entry: dict) -> dict:
+        operation_id = entry["operationId"]
+        operation = {
+            "id": operation_id,
+            "status": 0,  # OperationStatus.NotStarted
+            "blobName": entry["blobName"],
+            "containerName": self.args.container,
+            "createdAt": _iso(datetime.datetime.now(datetime.UTC)),
+            "startedAt": None,
+            "completedAt": None,
+            "error": None,
+            "processedDocuments": 0,
+            "totalDocuments": 0,
+            "resultBlobName": None,
+            "cancelRequested": False,
+            "resourceUrl": f"{self.args.api_base_url.rstrip('/')}/api/operations/{operation_id}",
+        }
+        if self.page_selection is not None:
+            operation["pageSelection"] = self.page_selection
+        database, container = self.args.database, self.args.operations_container
+        status, body = cosmos_rest.request(
+            "POST",
+            f"/dbs/{database}/colls/{container}/docs",
+            "docs",
+            f"dbs/{database}/colls/{container}",
+            operation,
+            extra_headers={
+                "x-ms-documentdb-partitionkey": json.dumps([operation_id]),
+                "x-ms-documentdb-is-upsert": "True",
+            },
+        )
+        if status not in (200, 201):
+            raise RuntimeError(f"creating operation: HTTP {status} {body[:300]!r}")
+        return {**entry, "stage": "created"}
+
+    def _enqueue(self, entry: dict) -> dict:
+        message = {
+            "OperationId": entry["operationId"],
+            "Message": {
+                "BlobName": entry["blobName"],
+                "ContainerName": self.args.container,
+                "UseManualDetection": False,
+                "PageRange": self.args.page_range,
+            },
+        }
+        self.limiter.wait()
+        self.storage.put_message(self.args.queue, json.dumps(message))
+        return {**entry, "stage": "enqueued"}
+
+    def _run_stage(self, executor: ThreadPoolExecutor, step, entries: list[dict]) -> list[dict]:
+        """Run one stage for a batch; returns the entries that completed it."""
+        done = []
+        futures = [(entry, executor.submit(step, entry)) for entry in entries]
+        for entry, future in futures:
+            try:
+                updated = future.result()
+            except (StorageError, RuntimeError, OSError) as e:
+                self.errors.append((entry["file"], str(e)))
+                print(f"  ERROR {entry['file']}: {e}", file=sys.stderr)
+                continue
+            self.manifest.record(updated)
+            self.counts[updated["stage"]] += 1
+            done.append(updated)
+        return done
+
+    def run(self, pending: list[dict]) -> None:
+        batch_size = self.args.batch_size
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as executor:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                uploaded = self._run_stage(
+                    executor, self._upload, [e for e in batch if e.get("stage") is None]
+                )
+                created = self._run_stage(
+                    executor,
+                    self._create_operation,
+                    uploaded + [e for e in batch if e.get("stage") == "uploaded"],
+                )
+                self._run_stage(
+                    executor,
+                    self._enqueue,
+                    created + [e for e in batch if e.get("stage") == "created"],
+                )
+                self.manifest.sync()
+                print(
+                    f"  batch {start // batch_size + 1}: {min(start + batch_size, len(pending)):,}/"
+                    f"{len(pending):,} files, {self.counts['enqueued']:,} enqueued, "
+                    f"{len(self.errors)} errors",
+                    flush=True,
+                )
+        self.block_pool.shutdown()
+
+
+def plan(directory: Path, prefix: str, manifest: _Manifest) -> tuple[list[dict], int]:
+    """Return the entries still to process and the number already enqueued."""
+    pending = []
+    done = 0
+    files = sorted(
+        path for path in directory.rglob("*")
+        if path.is_file() and path.suffix.lower() == ".pdf"
+    )
+    for path in files:
+        relative = path.relative_to(directory).as_posix()
+        stat = path.stat()
+        record = manifest.records.get(relative)
+        if record and record["size"] == stat.st_size and record["mtimeNs"] == stat.st_mtime_ns:
+            if record["stage"] == "enqueued":
+                done += 1
+                continue
+            pending.append(record)
+            continue
+        if record and record["stage"] == "enqueued":
+            print(f"  {relative} changed since it was submitted; submitting it again", file=sys.stderr)
+        pending.append({
+            "file": relative,
+            "size": stat.st_size,
+            "mtimeNs": stat.st_mtime_ns,
+            "blobName": prefix + relative,
+            "operationId": str(uuid.uuid4()),
+            "stage": None,
+        })
+    return pending, done
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Upload a directory of PDFs, create their operations and enqueue them for processing."
+    )
+    parser.add_argument("directory", type=Path, help="Directory searched recursively for *.pdf")
+    parser.add_argument("--container", default="uploaded-pdfs",
+                        help="Blob container to upload to (default: uploaded-pdfs)")
+    parser.add_argument("--prefix", default="",
+                        help="Prefix for blob names, e.g. 'backfill/2025/' (default: none)")
+    parser.add_argument("--page-range", help="pageRange applied to every file (default: all pages)")
+    parser.add_argument("--queue", default="pdf-processing-queue",
+                        help="Queue to enqueue to (default: pdf-processing-queue)")
+    parser.add_argument("--connection-string",
+                        default=os.environ.get("AZURE_STORAGE_CONNECTION_STRING", "UseDevelopmentStorage=true"),
+                        help="Storage connection string (default: $AZURE_STORAGE_CONNECTION_STRING or Azurite)")
+    parser.add_argument("--endpoint", default=os.environ.get("COSMOS_ENDPOINT"),
+                        help="Cosmos gateway URL (default: $COSMOS_ENDPOINT)")
+    parser.add_argument("--key", default=os.environ.get("COSMOS_KEY"),
+                        help="Cosmos master key (default: $COSMOS_KEY)")
+    parser.add_argument("--database", default=os.environ.get("COSMOS_DATABASE", "DocumentOcrDb"),
+                        help="Database id (default: $COSMOS_DATABASE or DocumentOcrDb)")
+    parser.add_argument("--operations-container", default="Operations")
+    parser.add_argument("--api-base-url", default="http://localhost:7071",
+                        help="Functions host URL used for each operation's resourceUrl "
+                             "(default: http://localhost:7071)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8,
+                        help="Files processed in parallel (default: 8)")
+    parser.add_argument("--block-concurrency", type=int, default=8,
+                        help="Blocks uploaded in parallel across all files (default: 8)")
+    parser.add_argument("--block-size-mb", type=int, default=4,
+                        help="Block size for files over 8 MB (default: 4)")
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="Files per upload/create/enqueue batch (default: 50)")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Maximum messages enqueued per second; 0 means unlimited (default: 0)")
+    parser.add_argument("--manifest", type=Path,
+                        help=f"Progress manifest (default: <directory>/{MANIFEST_NAME})")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be submitted and exit")
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        parser.error(f"'{args.directory}' is not a directory")
+    if min(args.concurrency, args.block_concurrency, args.block_size_mb, args.batch_size) < 1:
+        parser.error("--concurrency, --block-concurrency, --block-size-mb and --batch-size must be >= 1")
+    try:
+        parse_page_selection(args.page_range)
+    except ValueError as e:
+        parser.error(f"--page-range: {e}")
+    if not args.dry_run and (not args.endpoint or not args.key):
+        parser.error("--endpoint/--key (or COSMOS_ENDPOINT/COSMOS_KEY) are required")
+
+    manifest = _Manifest(args.manifest or args.directory / MANIFEST_NAME)
+    pending, done = plan(args.directory, args.prefix, manifest)
+    stages = Counter(entry["stage"] or "new" for entry in pending)
+    print(
+        f"{len(pending) + done:,} PDFs in {args.directory}: {done:,} already enqueued, "
+        f"{len(pending):,} to submit {dict(stages)}"
+    )
+    if args.dry_run or not pending:
+        manifest.close()
+        return 0
+
+    try:
+        storage = StorageClient(args.connection_string)
+        cosmos_rest.configure(endpoint=args.endpoint, key=args.key)
+        storage.create_container(args.container)
+        storage.create_queue(args.queue)
+    except (ValueError, StorageError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        manifest.close()
+        return 1
+
+    submitter = Submitter(args, storage, manifest)
+    started = time.perf_counter()
+    try:
+        submitter.run(pending)
+    except KeyboardInterrupt:
+        print("Interrupted; re-run the same command to resume.", file=sys.stderr)
+        return 130
+    finally:
+        manifest.close()
+    elapsed = time.perf_counter() - started
+
+    counts = submitter.counts
+    print(
+        f"Uploaded:    {counts['uploaded']:,} files, {submitter.bytes_uploaded / 1024 / 1024:,.1f} MB "
+        f"({submitter.bytes_uploaded / 1024 / 1024 / elapsed if elapsed else 0:,.1f} MB/s)"
+    )
+    print(f"Operations:  {counts['created']:,} created")
+    print(f"Enqueued:    {counts['enqueued']:,} messages in {elapsed:.1f}s")
+    if submitter.errors:
+        print(f"Errors:      {len(submitter.errors):,} (re-run to retry them)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+PDF Pre-flight Analyzer
+
+This script inspects a PDF before it is queued for OCR and prints a JSON
+report: page count, which pages carry a text layer and which are image-only
+scans, the size and dimensions of every embedded image, encryption and
+structural problems, and a cost estimate for the selected pages.
+
+The PDF is opened lazily with ``PdfReader``. Only page dictionaries, resource
+dictionaries and content streams are read; image streams are never decoded,
+and their size comes from the stream's ``/Length``. That keeps the analysis
+well under a second per 100 pages, so it can sit in the ingest path.
+
+``PdfProcessorFunction`` renders every selected page to an image and sends each
+one to Document Intelligence separately, so the estimate counts one billed page
+and one analyze call per selected page. It also sizes the uncompressed bitmaps
+``PdfToImageService`` will hold at the render DPI. The ``costEstimate`` object
+can be attached to the ``StartOperation`` request as-is, together with the same
+``pageRange``.
+
+Usage:
+    python analyze_pdf.py <input_pdf> [--page-range "1-3,5"] [-o report.json]
+
+Example:
+    python analyze_pdf.py upload.pdf
+    python analyze_pdf.py upload.pdf --page-range "3-12, 15" --price-per-1000-pages 10
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+try:
+    from pypdf import PdfReader
+    from pypdf.errors import FileNotDecryptedError, PdfReadError
+    from pypdf.generic import ArrayObject
+except ImportError:
+    print("Error: pypdf library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install pypdf", file=sys.stderr)
+    sys.exit(1)
+
+from split_pdf import format_page_range, parse_page_range
+
+
+# PdfToImageService renders through PDFtoImage, which defaults to 300 DPI into
+# 32-bit BGRA bitmaps.
+DEFAULT_RENDER_DPI = 300
+BITMAP_BYTES_PER_PIXEL = 4
+
+# Document Intelligence price per 1,000 analyzed pages (USD, prebuilt models).
+DEFAULT_PRICE_PER_1000_PAGES = 10.0
+
+# Document Intelligence rejects images larger than this in either dimension.
+MAX_IMAGE_DIMENSION = 10000
+
+# Content-stream operators that show text: Tj, TJ, ' and ", each preceded by
+# whitespace or the end of its string/array operand
+_TEXT_OPERATOR = re.compile(rb'[\s)\]>](?:Tj|TJ|\'|")(?=\s|$)')
+
+# Nested form XObjects are followed this deep
+_MAX_FORM_DEPTH = 8
+
+
+class _WarningCollector(logging.Handler):
+    """Collect pypdf's recoverable-error warnings so they land in the report."""
+    
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.messages = []
+    
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _filters(stream):
+    value = stream.get('/Filter')
+    if value is None:
+        return []
+    value = value.get_object()
+    if isinstance(value, ArrayObject):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def _color_space(stream):
+    value = stream.get('/ColorSpace')
+    if value is None:
+        return None
+    value = value.get_object()
+    if isinstance(value, ArrayObject) and value:
+        return str(value[0])
+    return str(value)
+
+
+def _stream_length(stream):
+    """Encoded size of a stream, without running its filters."""
+    length = stream.get('/Length')
+    if length is not None:
+        return int(length.get_object())
+    # pypdf drops /Length once the raw bytes are loaded; they stay encoded
+    return len(getattr(stream, '_data', b'') or b'')
+
+
+def _has_text_operators(data):
+    return _TEXT_OPERATOR.search(data) is not None
+
+
+def _scan_resources(resources, images, state, depth=0):
+    """
+    Record image XObjects and font usage reachable from a resource dictionary.
+    
+    Args:
+        resources: ``/Resources`` dictionary (may be None)
+        images (list): Receives one dict per image XObject
+        state (dict): ``fonts`` flag and ``text`` flag for nested form content
+        depth (int): Current form XObject nesting depth
+    """
+    if resources is None or depth > _MAX_FORM_DEPTH:
+        return
+    resources = resources.get_object()
+    if resources.get('/Font'):
+        state['fonts'] = True
+    xobjects = resources.get('/XObject')
+    if xobjects is None:
+        return
+    for name, reference in xobjects.get_object().items():
+        xobject = reference.get_object()
+        subtype = xobject.get('/Subtype')
+        if subtype == '/Image':
+            width = int(xobject.get('/Width', 0))
+            height = int(xobject.get('/Height', 0))
+            images.append({
+                'name': str(name),
+                'width': width,
+                'height': height,
+                'bitsPerComponent': int(xobject.get('/BitsPerComponent', 0) or 0),
+                'colorSpace': _color_space(xobject),
+                'filters': _filters(xobject),
+                'bytes': _stream_length(xobject),
+            })
+        elif subtype == '/Form':
+            _scan_resources(xobject.get('/Resources'), images, state, depth + 1)
+            if not state['text'] and state['fonts']:
+                state['text'] = _has_text_operators(xobject.get_data())
+
+
+def analyze_page(page, page_number, render_dpi=DEFAULT_RENDER_DPI):
+    """
+    Describe one page without decoding its images.
+    
+    Args:
+        page (PageObject): Page from a ``PdfReader``
+        page_number (int): 1-based page number
+        render_dpi (int): Resolution used to size the rendered bitmap
+    
+    Returns:
+        dict: Page size, content classification, images and render estimate
+    """
+    box = page.mediabox
+    width_pt = float(box.width)
+    height_pt = float(box.height)
+    rotation = int(page.get('/Rotate', 0) or 0) % 360
+    if rotation in (90, 270):
+        width_pt, height_pt = height_pt, width_pt
+    
+    images = []
+    state = {'fonts': False, 'text': False}
+    _scan_resources(page.get('/Resources'), images, state)
+    if state['fonts'] and not state['text']:
+        contents = page.get_contents()
+        if contents is not None:
+            state['text'] = _has_text_operators(contents.get_data())
+    
+    if state['text'] and images:
+        content = 'mixed'
+    elif state['text']:
+        content = 'text'
+    elif images:
+        content = 'image-only'
+    else:
+        content = 'empty'
+    
+    width_in = width_pt / 72
+    height_in = height_pt / 72
+    render_width = math.ceil(width_in * render_dpi)
+    render_height = math.ceil(height_in * render_dpi)
+    # Effective resolution of the largest image across the page width
+    largest = max(images, key=lambda image: image['width'] * image['height'], default=None)
+    scan_dpi = round(largest['width'] / width_in) if largest and width_in else None
+    
+    return {
+        'page': page_number,
+        'widthPt': round(width_pt, 2),
+        'heightPt': round(height_pt, 2),
+        'rotation': rotation,
+        'content': content,
+        'hasTextLayer': state['text'],
+        'imageCount': len(images),
+        'imageBytes': sum(image['bytes'] for image in images),
+        'scanDpi': scan_dpi,
+        'images': images,
+        'render': {
+            'width': render_width,
+            'height': render_height,
+            'bitmapBytes': render_width * render_height * BITMAP_BYTES_PER_PIXEL,
+        },
+    }
+
+
+def analyze_pdf(input_path, page_range=None, render_dpi=DEFAULT_RENDER_DPI,
+                price_per_1000_pages=DEFAULT_PRICE_PER_1000_PAGES, password=None):
+    """
+    Analyze a PDF and build the pre-flight report.
+    
+    Args:
+        input_path (str): Path to the PDF file
+        page_range (str): Optional ``pageRange`` expression; only those pages
+            are analyzed and estimated (default: all pages)
+        render_dpi (int): Resolution ``PdfToImageService`` renders at
+        price_per_1000_pages (float): Document Intelligence price per 1,000 pages
+        password (str): Password for encrypted PDFs (the empty user password
+            is always tried)
+    
+    Returns:
+        dict: The report; ``readable`` is False when the PDF cannot be analyzed
+    """
+    started = time.perf_counter()
+    collector = _WarningCollector()
+    pypdf_logger = logging.getLogger('pypdf')
+    pypdf_logger.addHandler(collector)
+    report = {
+        'file': Path(input_path).name,
+        'fileBytes': os.path.getsize(input_path),
+        'readable': False,
+        'encrypted': False,
+        'pageCount': None,
+        'pageRange': page_range or None,
+        'issues': [],
+    }
+    try:
+        try:
+            reader = PdfReader(input_path, strict=False)
+        except PdfReadError as e:
+            report['issues'].append(f"Invalid or corrupted PDF: {e}")
+            return report
+        
+        if reader.is_encrypted:
+            report['encrypted'] = True
+            if not reader.decrypt(password or ''):
+                report['issues'].append('Encrypted: a password is required to open this PDF')
+                return report
+        
+        try:
+            total_pages = len(reader.pages)
+        except (PdfReadError, FileNotDecryptedError) as e:
+            report['issues'].append(f"Could not read the page tree: {e}")
+            return report
+        report['pageCount'] = total_pages
+        
+        try:
+            page_numbers = (
+                parse_page_range(page_range, max_page=total_pages)
+                if page_range else list(range(1, total_pages + 1))
+            )
+        except ValueError as e:
+            report['issues'].append(f"Invalid page range: {e}")
+            return report
+        
+        pages = []
+        for page_number in page_numbers:
+            try:
+                info = analyze_page(reader.pages[page_number - 1], page_number, render_dpi)
+            except Exception as e:  # one damaged page must not hide the rest
+                report['issues'].append(f"Page {page_number}: {e}")
+                pages.append({'page': page_number, 'content': 'error', 'error': str(e)})
+                continue
+            oversized = max(info['render']['width'], info['render']['height'])
+            if oversized > MAX_IMAGE_DIMENSION:
+                report['issues'].append(
+                    f"Page {page_number}: renders to {info['render']['width']}x"
+                    f"{info['render']['height']} px at {render_dpi} DPI, above the "
+                    f"{MAX_IMAGE_DIMENSION} px Document Intelligence limit"
+                )
+            pages.append(info)
+        
+        report['readable'] = True
+        report['summary'] = _summarize(pages)
+        report['costEstimate'] = {
+            'billablePages': len(page_numbers),
+            'analyzeCalls': len(page_numbers),
+            'pricePer1000Pages': price_per_1000_pages,
+            'estimatedCost': round(len(page_numbers) * price_per_1000_pages / 1000, 4),
+            'currency': 'USD',
+            'renderDpi': render_dpi,
+            'bitmapBytesTotal': sum(page['render']['bitmapBytes'] for page in pages if 'render' in page),
+            'bitmapBytesMax': max(
+                (page['render']['bitmapBytes'] for page in pages if 'render' in page), default=0
+            ),
+        }
+        report['pages'] = pages
+        return report
+    finally:
+        pypdf_logger.removeHandler(collector)
+        # Keep the first few distinct pypdf warnings; damaged files can emit thousands
+        for message in dict.fromkeys(collector.messages):
+            if len(report['issues']) >= 50:
+                break
+            report['issues'].append(f"pypdf: {message}")
+        report['elapsedMs'] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _summarize(pages):
+    counts = {'text': 0, 'image-only': 0, 'mixed': 0, 'empty': 0, 'error': 0}
+    for page in pages:
+        counts[page['content']] += 1
+    return {
+        'pagesAnalyzed': len(pages),
+        'textPages': counts['text'],
+        'imageOnlyPages': counts['image-only'],
+        'mixedPages': counts['mixed'],
+        'emptyPages': counts['empty'],
+        'errorPages': counts['error'],
+        'imageOnlyPageRange': format_page_range(
+            page['page'] for page in pages if page['content'] == 'image-only'
+        ),
+        'textPageRange': format_page_range(
+            page['page'] for page in pages if page['content'] in ('text', 'mixed')
+        ),
+        'imageCount': sum(page.get('imageCount', 0) for page in pages),
+        'imageBytes': sum(page.get('imageBytes', 0) for page in pages),
+    }
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Pre-flight a PDF: page content, image sizes, problems and an OCR cost estimate.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s upload.pdf
+  %(prog)s upload.pdf --page-range "3-12, 15"
+  %(prog)s upload.pdf --summary-only -o preflight.json
+        """
+    )
+    
+    parser.add_argument(
+        'input_pdf',
+        help='Path to the PDF file to analyze'
+    )
+    
+    parser.add_argument(
+        '-p', '--page-range',
+        help='Only analyze and estimate these pages, e.g. "1-3,5" (same syntax as pageRange)'
+    )
+    
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        default=DEFAULT_RENDER_DPI,
+        help=f'Render resolution used for the bitmap estimate (default: {DEFAULT_RENDER_DPI})'
+    )
+    
+    parser.add_argument(
+        '--price-per-1000-pages',
+        type=float,
+        default=DEFAULT_PRICE_PER_1000_PAGES,
+        help=f'Document Intelligence price per 1,000 pages in USD (default: {DEFAULT_PRICE_PER_1000_PAGES})'
+    )
+    
+    parser.add_argument(
+        '--password',
+        help='Password for an encrypted PDF'
+    )
+    
+    parser.add_argument(
+        '-s', '--summary-only',
+        action='store_true',
+        help='Omit the per-page details from the report'
+    )
+    
+    parser.add_argument(
+        '-o', '--output',
+        help='Write the report to this file instead of stdout'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.0.0'
+    )
+    
+    args = parser.parse_args()
+    
+    if not os.path.isfile(args.input_pdf):
+        print(f"Error: Input file '{args.input_pdf}' does not exist.", file=sys.stderr)
+        sys.exit(1)
+    
+    report = analyze_pdf(
+        args.input_pdf,
+        page_range=args.page_range,
+        render_dpi=args.dpi,
+        price_per_1000_pages=args.price_per_1000_pages,
+        password=args.password,
+    )
+    if args.summary_only:
+        report.pop('pages', None)
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Pre-flight report written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    
+    # Non-zero exit lets the ingest path reject unreadable uploads
+    sys.exit(0 if report['readable'] else 1)
+
+
+if __name__ == '__main__':
+    main()
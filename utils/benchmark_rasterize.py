@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Page Rasterization Benchmark
+
+This script measures what ``PdfToImageService`` does in step 2 of
+``PdfProcessorFunction``: render every page of a PDF to an image and encode it
+in memory before OCR. For each DPI/format/compression setting it reports
+per-page render and encode time, encoded image size, and the peak resident
+memory of the run.
+
+Pages are rendered with PDFium (through pypdfium2), the same engine the
+PDFtoImage package uses, and encoded with Pillow. By default every encoded page
+is kept in memory until the document is finished, like the service's
+``List<Stream>``; ``--discard`` drops each image once it has been measured.
+
+Three execution variants can be compared:
+
+- ``serial``: one page after another, as the Function does today
+- ``thread``: a thread pool; PDFium is not thread-safe, so rendering is
+  serialized and only encoding overlaps
+- ``process``: a process pool; each worker opens the PDF and renders a
+  contiguous batch of pages
+
+Every (setting, variant) trial runs in a fresh process so that its peak RSS is
+not inflated by earlier trials. For the process variant the reported peak is
+the trial process plus the peak of each worker, an upper bound on the memory
+the pool needed at once.
+
+Usage:
+    python benchmark_rasterize.py <input_pdf> [<input_pdf> ...] [options]
+
+Example:
+    python benchmark_rasterize.py sample.pdf
+    python benchmark_rasterize.py sample.pdf --dpi 150 200 300 --format png jpeg
+    python benchmark_rasterize.py sample.pdf --modes serial process --workers 8 --json results.json
+"""
+
+import argparse
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import pypdfium2 as pdfium
+    from PIL import Image  # noqa: F401  (pypdfium2's to_pil() needs Pillow)
+except ImportError:
+    print("Error: pypdfium2 and Pillow are required for rasterization benchmarks.", file=sys.stderr)
+    print("Please install them using: pip install pypdfium2 Pillow", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# PDFtoImage renders at 300 DPI and the service encodes PNG at quality 100.
+DEFAULT_DPIS = [300]
+DEFAULT_FORMATS = ['png']
+FORMATS = ('png', 'jpeg', 'webp')
+# Quality for JPEG/WebP; PNG uses zlib compress levels instead.
+DEFAULT_QUALITIES = [90]
+DEFAULT_PNG_LEVELS = [6]
+MODES = ('serial', 'thread', 'process')
+
+# Page batches handed to each worker process, as in split_pdf.py.
+SHARDS_PER_WORKER = 4
+
+# PDFium keeps global state and must not be entered from two threads at once.
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _peak_rss_mb():
+    """Return this process's peak resident set size in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def build_settings(dpis, formats, qualities, png_levels):
+    """
+    Expand the command-line options into a list of render settings.
+    
+    Args:
+        dpis (list): Render resolutions
+        formats (list): Image formats (``png``, ``jpeg`` or ``webp``)
+        qualities (list): JPEG/WebP quality values
+        png_levels (list): PNG zlib compression levels
+    
+    Returns:
+        list: ``{"dpi", "format", "compression"}`` dictionaries
+    """
+    settings = []
+    for dpi, image_format in itertools.product(dpis, formats):
+        levels = png_levels if image_format == 'png' else qualities
+        for level in levels:
+            settings.append({'dpi': dpi, 'format': image_format, 'compression': level})
+    return settings
+
+
+def _encode_options(setting):
+    if setting['format'] == 'png':
+        return {'format': 'PNG', 'compress_level': setting['compression']}
+    if setting['format'] == 'jpeg':
+        return {'format': 'JPEG', 'quality': setting['compression']}
+    return {'format': 'WEBP', 'quality': setting['compression']}
+
+
+def _render_page(pdf, page_index, setting, lock=None):
+    """
+    Render and encode one page.
+    
+    Returns:
+        tuple: (per-page measurement dict, encoded image bytes)
+    """
+    requested = time.perf_counter()
+    if lock is not None:
+        lock.acquire()
+    # Render time starts once the lock is held; waiting for it is reported apart
+    started = time.perf_counter()
+    try:
+        page = pdf[page_index]
+        bitmap = page.render(scale=setting['dpi'] / 72)
+        image = bitmap.to_pil()
+        width, height = image.size
+    finally:
+        if lock is not None:
+            lock.release()
+    rendered = time.perf_counter()
+    
+    buffer = io.BytesIO()
+    image.save(buffer, **_encode_options(setting))
+    encoded = time.perf_counter()
+    
+    image.close()
+    if lock is not None:
+        with lock:
+            bitmap.close()
+            page.close()
+    else:
+        bitmap.close()
+        page.close()
+    
+    record = {
+        'page': page_index + 1,
+        'width': width,
+        'height': height,
+        'lock_wait_ms': (started - requested) * 1000,
+        'render_ms': (rendered - started) * 1000,
+        'encode_ms': (encoded - rendered) * 1000,
+        'bytes': buffer.getbuffer().nbytes,
+    }
+    return record, buffer
+
+
+def _render_batch(input_path, page_indices, setting, retain):
+    """Worker-process entry point: render a batch of pages from a fresh document."""
+    pdf = pdfium.PdfDocument(input_path)
+    retained = []
+    records = []
+    try:
+        for page_index in page_indices:
+            record, buffer = _render_page(pdf, page_index, setting)
+            records.append(record)
+            if retain:
+                retained.append(buffer)
+    finally:
+        pdf.close()
+    return os.getpid(), _peak_rss_mb(), records
+
+
+def _shard_pages(page_count, workers):
+    shard_count = min(page_count, workers * SHARDS_PER_WORKER)
+    if shard_count == 0:
+        return []
+    size, remainder = divmod(page_count, shard_count)
+    shards = []
+    start = 0
+    for index in range(shard_count):
+        stop = start + size + (1 if index < remainder else 0)
+        shards.append(list(range(start, stop)))
+        start = stop
+    return shards
+
+
+def run_trial(input_path, setting, mode, workers, retain, max_pages=None):
+    """
+    Rasterize one PDF with one setting and execution variant.
+    
+    Intended to run in a fresh process (see :func:`benchmark`) so the peak RSS
+    it reports belongs to this trial alone.
+    
+    Returns:
+        dict: ``{"wall_s", "peak_rss_mb", "pages": [per-page records]}``
+    """
+    pdf = pdfium.PdfDocument(input_path)
+    page_count = len(pdf)
+    if max_pages:
+        page_count = min(page_count, max_pages)
+    retained = []
+    worker_peaks = {}
+    
+    started = time.perf_counter()
+    if mode == 'serial':
+        records = []
+        for page_index in range(page_count):
+            record, buffer = _render_page(pdf, page_index, setting)
+            records.append(record)
+            if retain:
+                retained.append(buffer)
+    elif mode == 'thread':
+        def render(page_index):
+            record, buffer = _render_page(pdf, page_index, setting, _PDFIUM_LOCK)
+            return record, buffer if retain else None
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render, range(page_count)))
+        records = [record for record, _ in results]
+        retained = [buffer for _, buffer in results if buffer is not None]
+        del results
+    else:
+        # Workers reopen the file; the parent only needed the page count.
+        pdf.close()
+        pdf = None
+        records = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_render_batch, input_path, shard, setting, retain)
+                for shard in _shard_pages(page_count, workers)
+            ]
+            for future in futures:
+                pid, peak, batch_records = future.result()
+                records.extend(batch_records)
+                if peak is not None:
+                    worker_peaks[pid] = max(peak, worker_peaks.get(pid, 0.0))
+    wall = time.perf_counter() - started
+    
+    peak_rss = _peak_rss_mb()
+    if peak_rss is not None and worker_peaks:
+        peak_rss += sum(worker_peaks.values())
+    retained.clear()
+    if pdf is not None:
+        pdf.close()
+    return {'wall_s': wall, 'peak_rss_mb': peak_rss, 'pages': records}
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(result):
+    """
+    Reduce a trial's per-page records to summary statistics.
+    
+    Returns:
+        dict: Page count, throughput, time percentiles, image sizes and peak RSS
+    """
+    pages = result['pages']
+    render = [page['render_ms'] for page in pages]
+    lock_wait = [page['lock_wait_ms'] for page in pages]
+    encode = [page['encode_ms'] for page in pages]
+    sizes = [page['bytes'] for page in pages]
+    wall = result['wall_s']
+    return {
+        'pages': len(pages),
+        'wall_s': round(wall, 3),
+        'pages_per_sec': round(len(pages) / wall, 2) if wall > 0 else 0.0,
+        'render_ms_p50': round(_percentile(render, 0.50), 1),
+        'render_ms_p95': round(_percentile(render, 0.95), 1),
+        'lock_wait_ms_p50': round(_percentile(lock_wait, 0.50), 1),
+        'lock_wait_ms_p95': round(_percentile(lock_wait, 0.95), 1),
+        'encode_ms_p50': round(_percentile(encode, 0.50), 1),
+        'encode_ms_p95': round(_percentile(encode, 0.95), 1),
+        'image_kb_avg': round(sum(sizes) / len(sizes) / 1024, 1) if sizes else 0.0,
+        'images_mb_total': round(sum(sizes) / (1024 * 1024), 2),
+        'peak_rss_mb': round(result['peak_rss_mb'], 1) if result['peak_rss_mb'] is not None else None,
+    }
+
+
+def benchmark(input_paths, settings, modes, workers, retain=True, max_pages=None):
+    """
+    Run every (input, setting, mode) trial, each in a fresh process.
+    
+    Args:
+        input_paths (list): PDF files to rasterize
+        settings (list): Render settings from :func:`build_settings`
+        modes (list): Execution variants (``serial``, ``thread``, ``process``)
+        workers (int): Pool size for the thread and process variants
+        retain (bool): Keep every encoded page in memory until the end, like
+            ``PdfToImageService``
+        max_pages (int): Only rasterize the first N pages of each PDF
+    
+    Returns:
+        list: One result dict per trial with its summary and per-page records
+    """
+    # spawn gives each trial a clean interpreter, so ru_maxrss starts low.
+    context = multiprocessing.get_context('spawn')
+    results = []
+    header = (
+        f"{'setting':<16} {'mode':<8} {'pages':>5} {'pages/s':>8} {'render p50/p95 ms':>18} {'lock wait p50/p95 ms':>21} "
+        f"{'encode p50 ms':>13} {'avg KB':>8} {'total MB':>9} {'peak RSS MB':>11}"
+    )
+    for input_path in input_paths:
+        print(f"\n{input_path}")
+        print(header)
+        print('-' * len(header))
+        for setting, mode in itertools.product(settings, modes):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as trial:
+                result = trial.submit(
+                    run_trial, input_path, setting, mode, workers, retain, max_pages
+                ).result()
+            summary = summarize(result)
+            label = f"{setting['dpi']}dpi {setting['format']}/{setting['compression']}"
+            peak = f"{summary['peak_rss_mb']:.1f}" if summary['peak_rss_mb'] is not None else 'n/a'
+            print(
+                f"{label:<16} {mode:<8} {summary['pages']:>5} {summary['pages_per_sec']:>8.2f} "
+                f"{summary['render_ms_p50']:>8.1f} /{summary['render_ms_p95']:>8.1f} "
+                f"{summary['lock_wait_ms_p50']:>11.1f} /{summary['lock_wait_ms_p95']:>8.1f} "
+                f"{summary['encode_ms_p50']:>13.1f} {summary['image_kb_avg']:>8.1f} "
+                f"{summary['images_mb_total']:>9.2f} {peak:>11}"
+            )
+            results.append({
+                'input': input_path,
+                'setting': setting,
+                'mode': mode,
+                'workers': 1 if mode == 'serial' else workers,
+                'retain': retain,
+                'summary': summary,
+                'pages': result['pages'],
+            })
+    return results
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark PDF page rasterization (render time, image size, peak memory).",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s sample.pdf
+  %(prog)s sample.pdf --dpi 150 200 300 --format png jpeg
+  %(prog)s sample.pdf --format jpeg webp --quality 75 90
+  %(prog)s a.pdf b.pdf --modes serial process --workers 8 --json results.json
+        """
+    )
+    
+    parser.add_argument(
+        'input_pdf',
+        nargs='+',
+        help='PDF file(s) to rasterize'
+    )
+    
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        nargs='+',
+        default=DEFAULT_DPIS,
+        help='Render resolutions to compare (default: 300, as PDFtoImage)'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        nargs='+',
+        choices=FORMATS,
+        default=DEFAULT_FORMATS,
+        help='Image formats to compare (default: png, as PdfToImageService)'
+    )
+    
+    parser.add_argument(
+        '-q', '--quality',
+        type=int,
+        nargs='+',
+        default=DEFAULT_QUALITIES,
+        help='JPEG/WebP quality values to compare (default: 90)'
+    )
+    
+    parser.add_argument(
+        '--png-level',
+        type=int,
+        nargs='+',
+        choices=range(10),
+        default=DEFAULT_PNG_LEVELS,
+        metavar='LEVEL',
+        help='PNG compression levels 0-9 to compare (default: 6)'
+    )
+    
+    parser.add_argument(
+        '-m', '--modes',
+        nargs='+',
+        choices=MODES,
+        default=list(MODES),
+        help='Execution variants to compare (default: serial thread process)'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help='Pool size for the thread and process variants (default: min(4, CPUs))'
+    )
+    
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        help='Only rasterize the first N pages of each PDF'
+    )
+    
+    parser.add_argument(
+        '--discard',
+        action='store_true',
+        help='Drop each encoded image after measuring it instead of keeping every page in memory'
+    )
+    
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write summaries and per-page measurements to a JSON file'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.0.0'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.workers < 1:
+        parser.error('--workers must be 1 or greater')
+    for input_path in args.input_pdf:
+        if not os.path.isfile(input_path):
+            print(f"Error: Input file '{input_path}' does not exist.", file=sys.stderr)
+            sys.exit(1)
+    
+    settings = build_settings(args.dpi, args.format, args.quality, args.png_level)
+    print(
+        f"Trials: {len(settings) * len(args.modes) * len(args.input_pdf)} "
+        f"({len(settings)} setting(s) x {len(args.modes)} mode(s) x {len(args.input_pdf)} file(s)), "
+        f"workers: {args.workers}, {'discarding' if args.discard else 'retaining'} encoded pages"
+    )
+    
+    try:
+        results = benchmark(
+            args.input_pdf,
+            settings,
+            args.modes,
+            args.workers,
+            retain=not args.discard,
+            max_pages=args.max_pages,
+        )
+    except pdfium.PdfiumError as e:
+        print(f"Error: Invalid or corrupted PDF file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote measurements to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
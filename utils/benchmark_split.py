@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+PDF Split Memory Benchmark
+
+This script measures the peak memory and time of ``split_pdf.py`` as inputs
+grow. It generates synthetic scanned PDFs (one distinct image per page, in a
+balanced page tree like the ones scanners and PDF libraries write) with 10,
+1,000 and 10,000 pages by default, then splits each one in two ways:
+
+- ``all``: every page, one file each
+- ``selection``: a short run of pages from the middle, as ``--pages`` does
+
+Each is run with ``split_pdf`` and with a ``baseline`` that uses pypdf the
+plain way (``PdfReader(path)`` and ``reader.pages``), which loads the whole
+file and keeps every parsed page until the reader is closed. Every trial runs
+in a fresh process so its peak RSS is its own.
+
+Usage:
+    python benchmark_split.py [--sizes 10 1000 10000] [--image-kb 32] [--json results.json]
+
+Example:
+    python benchmark_split.py
+    python benchmark_split.py --sizes 1000 10000 --image-kb 128 --select 21
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    print("Error: pypdf library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install pypdf", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from split_pdf import split_pdf
+
+
+DEFAULT_SIZES = [10, 1000, 10000]
+DEFAULT_IMAGE_KB = 32
+DEFAULT_SELECTION = 21
+# Kids per page tree node in the generated files
+PAGE_TREE_FANOUT = 32
+IMAGE_WIDTH = 256
+MODES = ('all', 'selection')
+ENGINES = ('split_pdf', 'baseline')
+
+
+def _peak_rss_mb():
+    """Return this process's peak resident set size in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def write_synthetic_pdf(path, page_count, image_kb):
+    """
+    Write a PDF whose pages each show a different uncompressed greyscale image.
+    
+    The file is written directly (not through pypdf) so that generating
+    10,000 pages takes seconds. Pages sit in a balanced page tree with
+    ``PAGE_TREE_FANOUT`` kids per node.
+    
+    Args:
+        path (str): Output path
+        page_count (int): Number of pages
+        image_kb (int): Size of each page's image in KB
+    """
+    height = max(1, image_kb * 1024 // IMAGE_WIDTH)
+    
+    # Object numbers: 1 catalog, 2 page tree root, then image, content and
+    # page for every page, then the intermediate page tree nodes
+    page_numbers = [5 + 3 * index for index in range(page_count)]
+    next_number = 3 + 3 * page_count
+    parents = {}
+    nodes = []
+    level = [(number, 1) for number in page_numbers]
+    while len(level) > PAGE_TREE_FANOUT:
+        grouped = []
+        for start in range(0, len(level), PAGE_TREE_FANOUT):
+            kids = level[start:start + PAGE_TREE_FANOUT]
+            for kid, _ in kids:
+                parents[kid] = next_number
+            nodes.append((next_number, kids))
+            grouped.append((next_number, sum(count for _, count in kids)))
+            next_number += 1
+        level = grouped
+    for kid, _ in level:
+        parents[kid] = 2
+    
+    def kids_array(kids):
+        return b" ".join(b"%d 0 R" % number for number, _ in kids)
+    
+    offsets = {}
+    with open(path, 'wb') as f:
+        def write(number, body, stream=None):
+            offsets[number] = f.tell()
+            if stream is None:
+                f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+            else:
+                f.write(b"%d 0 obj\n<< %s /Length %d >>\nstream\n" % (number, body, len(stream)))
+                f.write(stream + b"\nendstream\nendobj\n")
+        
+        f.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        for index, number in enumerate(page_numbers):
+            write(number - 2, b"/Type /XObject /Subtype /Image /Width %d /Height %d "
+                  b"/ColorSpace /DeviceGray /BitsPerComponent 8" % (IMAGE_WIDTH, height),
+                  os.urandom(IMAGE_WIDTH * height))
+            write(number - 1, b"", b"q 612 0 0 792 0 0 cm /Im0 Do Q BT /F1 12 Tf 36 36 Td (Page %d) Tj ET" % (index + 1))
+            write(number, b"<< /Type /Page /Parent %d 0 R /Contents %d 0 R "
+                  b"/Resources << /XObject << /Im0 %d 0 R >> /Font << /F1 %d 0 R >> >> >>" % (
+                      parents[number], number - 1, number - 2, next_number))
+        for number, kids in nodes:
+            write(number, b"<< /Type /Pages /Parent %d 0 R /Count %d /Kids [%s] >>" % (
+                parents[number], sum(count for _, count in kids), kids_array(kids)))
+        write(2, b"<< /Type /Pages /Count %d /Kids [%s] /MediaBox [0 0 612 792] >>" % (
+            page_count, kids_array(level)))
+        write(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        write(next_number, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (next_number + 1))
+        for number in range(1, next_number + 1):
+            f.write(b"%010d 00000 n \n" % offsets[number])
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_number + 1, xref))
+
+
+def _baseline_split(input_path, output_dir, page_nums):
+    reader = PdfReader(input_path)
+    for page_num in page_nums:
+        writer = PdfWriter()
+        writer.add_page(reader.pages[page_num])
+        writer.write(os.path.join(output_dir, f"page_{page_num + 1:05d}.pdf"))
+
+
+def run_trial(input_path, page_count, mode, engine, selection):
+    """
+    Split one synthetic PDF and measure it (runs in its own process).
+    
+    Args:
+        input_path (str): Synthetic PDF
+        page_count (int): Pages in the PDF
+        mode (str): ``all`` or ``selection``
+        engine (str): ``split_pdf`` or ``baseline``
+        selection (int): Pages in the ``selection`` mode
+    
+    Returns:
+        dict: Pages written, seconds, RSS before the split and peak RSS in MB
+    """
+    if mode == 'all':
+        first, last = 1, page_count
+    else:
+        first = max(1, (page_count - selection) // 2 + 1)
+        last = min(page_count, first + selection - 1)
+    output_dir = tempfile.mkdtemp(prefix='benchmark_split_')
+    try:
+        start_rss = _peak_rss_mb()
+        started = time.perf_counter()
+        if engine == 'split_pdf':
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                pages = split_pdf(input_path, output_dir, pages=f"{first}-{last}")
+        else:
+            _baseline_split(input_path, output_dir, range(first - 1, last))
+            pages = last - first + 1
+        return {
+            'pages': pages,
+            'seconds': time.perf_counter() - started,
+            'start_rss_mb': start_rss,
+            'peak_rss_mb': _peak_rss_mb(),
+        }
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def benchmark(sizes, image_kb, selection, work_dir, modes=MODES, engines=ENGINES):
+    """
+    Generate the inputs and run every (size, mode, engine) trial.
+    
+    Args:
+        sizes (list): Page counts to generate
+        image_kb (int): Image size per page in KB
+        selection (int): Pages in the ``selection`` mode
+        work_dir (str): Directory for the generated PDFs
+        modes (list): Modes to run
+        engines (list): Engines to run
+    
+    Returns:
+        list: One result dict per trial
+    """
+    # spawn gives each trial a clean interpreter, so ru_maxrss starts low.
+    context = multiprocessing.get_context('spawn')
+    results = []
+    header = (
+        f"{'pages':>6} {'file MB':>8} {'mode':<10} {'engine':<10} {'written':>7} "
+        f"{'seconds':>8} {'pages/s':>8} {'start MB':>9} {'peak MB':>8}"
+    )
+    print(header)
+    print('-' * len(header))
+    for page_count in sizes:
+        input_path = os.path.join(work_dir, f"synthetic_{page_count}.pdf")
+        if not os.path.isfile(input_path):
+            write_synthetic_pdf(input_path, page_count, image_kb)
+        file_mb = os.path.getsize(input_path) / (1024 * 1024)
+        for mode in modes:
+            for engine in engines:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as trial:
+                    result = trial.submit(run_trial, input_path, page_count, mode, engine, selection).result()
+                rate = result['pages'] / result['seconds'] if result['seconds'] > 0 else 0.0
+                start = f"{result['start_rss_mb']:.1f}" if result['start_rss_mb'] is not None else 'n/a'
+                peak = f"{result['peak_rss_mb']:.1f}" if result['peak_rss_mb'] is not None else 'n/a'
+                print(
+                    f"{page_count:>6} {file_mb:>8.1f} {mode:<10} {engine:<10} {result['pages']:>7} "
+                    f"{result['seconds']:>8.2f} {rate:>8.1f} {start:>9} {peak:>8}"
+                )
+                results.append(dict(result, input_pages=page_count, file_mb=file_mb, mode=mode, engine=engine))
+    return results
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark split_pdf.py peak memory and time on synthetic PDFs of growing size.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --sizes 1000 10000 --image-kb 128
+  %(prog)s --modes selection --engines split_pdf --json results.json
+        """
+    )
+    
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=DEFAULT_SIZES,
+        help='Page counts of the generated PDFs (default: 10 1000 10000)'
+    )
+    
+    parser.add_argument(
+        '--image-kb',
+        type=int,
+        default=DEFAULT_IMAGE_KB,
+        help=f'Size of each page image in KB (default: {DEFAULT_IMAGE_KB})'
+    )
+    
+    parser.add_argument(
+        '--select',
+        type=int,
+        default=DEFAULT_SELECTION,
+        help=f'Pages extracted in the selection mode (default: {DEFAULT_SELECTION})'
+    )
+    
+    parser.add_argument(
+        '-m', '--modes',
+        nargs='+',
+        choices=MODES,
+        default=list(MODES),
+        help='Modes to run (default: all selection)'
+    )
+    
+    parser.add_argument(
+        '-e', '--engines',
+        nargs='+',
+        choices=ENGINES,
+        default=list(ENGINES),
+        help='Implementations to run (default: split_pdf baseline)'
+    )
+    
+    parser.add_argument(
+        '--work-dir',
+        help='Keep the generated PDFs in this directory and reuse them (default: a temporary directory)'
+    )
+    
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write the measurements to a JSON file'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.0.0'
+    )
+    
+    args = parser.parse_args()
+    
+    if any(size < 1 for size in args.sizes) or args.image_kb < 1 or args.select < 1:
+        parser.error('--sizes, --image-kb and --select must be 1 or greater')
+    
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='benchmark_split_inputs_')
+    os.makedirs(work_dir, exist_ok=True)
+    print(f"Inputs: {', '.join(str(size) for size in args.sizes)} pages, {args.image_kb} KB image per page, in {work_dir}")
+    
+    try:
+        results = benchmark(args.sizes, args.image_kb, args.select, work_dir, args.modes, args.engines)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote measurements to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,32 +5,143 @@ Base64 File Encoder Utility
 This script reads a file and outputs its base64-encoded representation to the console.
 Useful for encoding files for embedding in JSON, APIs, or other text-based formats.
 
+The file is streamed in fixed-size chunks (a multiple of 3 bytes, so no padding
+appears mid-stream), so memory use stays constant regardless of file size. The
+same streaming approach is used to decode base64 back to binary with ``--decode``.
+
+Given a directory, a glob pattern or several files, the script switches to batch
+mode: files are encoded concurrently on a thread pool and emitted as JSON Lines
+records (name, size, SHA-256 and base64 content), with the hash and the base64
+text computed from the same read of each file.
+
 Usage:
-    python encode_base64.py <input_file>
+    python encode_base64.py <input_file> [--output FILE] [--wrap COLS]
+    python encode_base64.py --decode <input_file> [--output FILE]
+    python encode_base64.py <directory | glob | file ...> [--jsonl] [--workers N]
 
 Example:
     python encode_base64.py document.pdf
     python encode_base64.py image.png
     python encode_base64.py /path/to/file.txt
+    python encode_base64.py scan.pdf --output scan.b64 --wrap 76
+    python encode_base64.py --decode scan.b64 --output scan.pdf
+    python encode_base64.py samples/ --output payloads.jsonl
+    python encode_base64.py "samples/**/*.pdf" --workers 16 > payloads.jsonl
 """
 
 import argparse
 import base64
+import binascii
+import glob
+import hashlib
+import json
 import os
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
-def encode_file_to_base64(input_path):
+# Bytes read per chunk when encoding. Must be a multiple of 3 so each chunk
+# encodes to whole base64 quanta without padding.
+ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+
+# Bytes read per chunk when decoding.
+DECODE_CHUNK_SIZE = 4 * 256 * 1024
+
+# Whitespace ignored in base64 input (line wrapping, CRLF, trailing newline).
+_WHITESPACE = b" \t\r\n\v\f"
+
+
+def encode_stream(source, target, wrap=0, chunk_size=ENCODE_CHUNK_SIZE):
     """
-    Encode a file to base64 and output to console.
+    Stream-encode a binary file object to base64.
     
     Args:
-        input_path (str): Path to the input file
+        source: Binary file object to read from
+        target: Binary file object to write base64 text to
+        wrap (int): Wrap output lines after this many characters (0 disables wrapping)
+        chunk_size (int): Bytes to read per chunk; must be a multiple of 3
     
     Returns:
-        str: Base64-encoded string of the file contents
+        int: Number of base64 characters written (excluding line breaks)
     """
+    if chunk_size % 3:
+        raise ValueError("chunk_size must be a multiple of 3")
+    
+    encoded_size = 0
+    pending = b""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        encoded = base64.b64encode(chunk)
+        encoded_size += len(encoded)
+        
+        if not wrap:
+            target.write(encoded)
+            continue
+        
+        # Emit only whole lines; carry the remainder into the next chunk
+        pending += encoded
+        whole = len(pending) - len(pending) % wrap
+        for offset in range(0, whole, wrap):
+            target.write(pending[offset:offset + wrap] + b"\n")
+        pending = pending[whole:]
+    
+    if pending or not wrap:
+        target.write(pending + b"\n")
+    return encoded_size
+
+
+def decode_stream(source, target, chunk_size=DECODE_CHUNK_SIZE):
+    """
+    Stream-decode base64 text from a binary file object.
+    
+    Whitespace (including line wrapping) is ignored.
+    
+    Args:
+        source: Binary file object containing base64 text
+        target: Binary file object to write decoded bytes to
+        chunk_size (int): Bytes to read per chunk
+    
+    Returns:
+        int: Number of decoded bytes written
+    
+    Raises:
+        binascii.Error: If the input is not valid base64
+    """
+    decoded_size = 0
+    pending = b""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk.translate(None, _WHITESPACE)
+        
+        # Decode whole 4-character quanta; carry the remainder
+        whole = len(pending) - len(pending) % 4
+        if whole:
+            decoded = base64.b64decode(pending[:whole], validate=True)
+            target.write(decoded)
+            decoded_size += len(decoded)
+            pending = pending[whole:]
+    
+    if pending:
+        raise binascii.Error("Truncated base64 input (length is not a multiple of 4)")
+    return decoded_size
+
+
+def _open_target(output_path):
+    """Open the output file, or return stdout's binary buffer when no path is given."""
+    if output_path:
+        return open(output_path, 'wb')
+    sys.stdout.flush()
+    return sys.stdout.buffer
+
+
+def _validate_input(input_path):
+    """Exit with an error if the input file is missing or unreadable."""
     # Validate input file
     if not os.path.isfile(input_path):
         print(f"Error: Input file '{input_path}' does not exist.", file=sys.stderr)
@@ -40,6 +151,25 @@ def encode_file_to_base64(input_path):
     if not os.access(input_path, os.R_OK):
         print(f"Error: Permission denied reading file '{input_path}'.", file=sys.stderr)
         sys.exit(1)
+
+
+def encode_file_to_base64(input_path, output_path=None, wrap=0):
+    """
+    Encode a file to base64 and output to console or a target file.
+    
+    Args:
+        input_path (str): Path to the input file
+        output_path (str): Optional file to write the base64 text to (default: stdout)
+        wrap (int): Wrap output lines after this many characters (0 disables wrapping)
+    
+    Returns:
+        int: Number of base64 characters written
+    """
+    _validate_input(input_path)
+    
+    if wrap < 0:
+        print("Error: --wrap must be 0 or greater.", file=sys.stderr)
+        sys.exit(1)
     
     try:
         # Get file info
@@ -50,20 +180,210 @@ def encode_file_to_base64(input_path):
         print(f"Encoding file: {file_name}", file=sys.stderr)
         print(f"File size: {file_size:,} bytes", file=sys.stderr)
         
-        # Read and encode the file
-        with open(input_path, 'rb') as file:
-            file_content = file.read()
-            base64_encoded = base64.b64encode(file_content).decode('utf-8')
-        
-        # Output the base64 string to stdout
-        print(base64_encoded)
+        # Stream the file through the encoder
+        target = _open_target(output_path)
+        try:
+            with open(input_path, 'rb') as file:
+                encoded_size = encode_stream(file, target, wrap=wrap)
+        finally:
+            if output_path:
+                target.close()
+            else:
+                target.flush()
         
         # Print completion message to stderr
-        encoded_size = len(base64_encoded)
         print(f"Successfully encoded to {encoded_size:,} base64 characters", file=sys.stderr)
         
-        return base64_encoded
+        return encoded_size
+    
+    except PermissionError as e:
+        print(f"Error: Permission denied: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"Error reading file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error processing file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+
+def decode_base64_file(input_path, output_path=None):
+    """
+    Decode a base64 text file and output the binary content.
+    
+    Args:
+        input_path (str): Path to the base64 text file
+        output_path (str): Optional file to write the decoded bytes to (default: stdout)
+    
+    Returns:
+        int: Number of decoded bytes written
+    """
+    _validate_input(input_path)
+    
+    try:
+        file_name = Path(input_path).name
+        print(f"Decoding file: {file_name}", file=sys.stderr)
+        
+        # Stream the file through the decoder
+        target = _open_target(output_path)
+        try:
+            with open(input_path, 'rb') as file:
+                decoded_size = decode_stream(file, target)
+        finally:
+            if output_path:
+                target.close()
+            else:
+                target.flush()
+        
+        print(f"Successfully decoded to {decoded_size:,} bytes", file=sys.stderr)
+        
+        return decoded_size
+    
+    except binascii.Error as e:
+        print(f"Error: Invalid base64 input: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except PermissionError as e:
+        print(f"Error: Permission denied: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"Error reading file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error processing file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+
+def encode_file_record(input_path):
+    """
+    Encode a file into a JSON-ready payload record.
+    
+    The SHA-256 digest and the base64 text are computed from the same chunked
+    read, so each file is read from disk once.
+    
+    Args:
+        input_path (str): Path to the input file
+    
+    Returns:
+        dict: ``{"name", "size", "sha256", "content"}`` for the file
+    """
+    digest = hashlib.sha256()
+    parts = []
+    size = 0
+    with open(input_path, 'rb') as file:
+        while True:
+            chunk = file.read(ENCODE_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+            parts.append(base64.b64encode(chunk))
+    return {
+        "name": Path(input_path).name,
+        "size": size,
+        "sha256": digest.hexdigest(),
+        "content": b"".join(parts).decode('ascii'),
+    }
+
+
+def _is_pattern(item):
+    """Tell whether an input is a glob pattern; existing files named like ``scan[1].pdf`` are not."""
+    return not os.path.isfile(item) and glob.has_magic(item)
+
+
+def expand_inputs(inputs):
+    """
+    Expand directories and glob patterns into a sorted list of files.
+    
+    Directories contribute the regular files directly inside them; glob
+    patterns support ``**`` for recursive matches. An existing file is taken
+    as it is, even when its name contains ``[``, ``*`` or ``?``.
+    
+    Args:
+        inputs (list): File paths, directory paths and/or glob patterns
+    
+    Returns:
+        list: De-duplicated file paths in a stable order
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(
+                os.path.join(item, name) for name in os.listdir(item)
+                if os.path.isfile(os.path.join(item, name))
+            )
+        elif _is_pattern(item):
+            matches = sorted(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [item]
+        files.extend(matches)
+    return list(dict.fromkeys(files))
+
+
+def encode_files_to_jsonl(inputs, output_path=None, workers=None):
+    """
+    Encode many files concurrently and write one JSON Lines record per file.
+    
+    Records are written in input order as soon as they are ready. At most
+    ``2 * workers`` files are in flight, so memory is bounded by the largest
+    few files rather than the whole batch.
+    
+    Args:
+        inputs (list): File paths, directory paths and/or glob patterns
+        output_path (str): Optional file to write the records to (default: stdout)
+        workers (int): Number of encoder threads (default: based on CPU count)
+    
+    Returns:
+        int: Number of records written
+    """
+    files = expand_inputs(inputs)
+    if not files:
+        print("Error: No input files matched.", file=sys.stderr)
+        sys.exit(1)
+    for input_path in files:
+        _validate_input(input_path)
+    
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) + 4)
+    if workers < 1:
+        print("Error: --workers must be 1 or greater.", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"Encoding {len(files):,} files with {workers} workers", file=sys.stderr)
+    
+    try:
+        target = _open_target(output_path)
+        total_size = 0
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                remaining = iter(files)
+                
+                # Keep a bounded window of in-flight files and drain it in order
+                for input_path in remaining:
+                    pending.append(executor.submit(encode_file_record, input_path))
+                    if len(pending) >= workers * 2:
+                        break
+                while pending:
+                    record = pending.popleft().result()
+                    target.write(json.dumps(record).encode('utf-8') + b"\n")
+                    total_size += record["size"]
+                    print(f"  Encoded {record['name']} ({record['size']:,} bytes)", file=sys.stderr)
+                    next_path = next(remaining, None)
+                    if next_path is not None:
+                        pending.append(executor.submit(encode_file_record, next_path))
+        finally:
+            if output_path:
+                target.close()
+            else:
+                target.flush()
+        
+        print(
+            f"Successfully encoded {len(files):,} files ({total_size:,} bytes) to JSON Lines",
+            file=sys.stderr,
+        )
         
+        return len(files)
+    
     except PermissionError as e:
         print(f"Error: Permission denied: {str(e)}", file=sys.stderr)
         sys.exit(1)
@@ -85,28 +405,83 @@ Examples:
   %(prog)s document.pdf
   %(prog)s image.png > encoded.txt
   %(prog)s /path/to/file.txt
-  
+  %(prog)s scan.pdf --output scan.b64 --wrap 76
+  %(prog)s --decode scan.b64 --output scan.pdf
+  %(prog)s samples/ --output payloads.jsonl
+  %(prog)s "samples/**/*.pdf" --workers 16 > payloads.jsonl
+
 Note: Base64 output goes to stdout, status messages go to stderr.
-      Use redirection (>) to save base64 output to a file.
+      Use redirection (>) or --output to save base64 output to a file.
+      Files are streamed in chunks, so memory use does not grow with file size.
+      A directory, glob pattern or several files switch to JSON Lines batch
+      output: {"name": ..., "size": ..., "sha256": ..., "content": ...}
         """
     )
     
     parser.add_argument(
         'input_file',
-        help='Path to the input file to encode'
+        nargs='+',
+        help='Path to the input file to encode (or decode with --decode); '
+             'directories and glob patterns are encoded in batch mode'
+    )
+    
+    parser.add_argument(
+        '-o', '--output',
+        help='Write output to this file instead of stdout'
+    )
+    
+    parser.add_argument(
+        '-w', '--wrap',
+        type=int,
+        default=0,
+        metavar='COLS',
+        help='Wrap encoded lines after COLS characters (default: 0, no wrapping)'
+    )
+    
+    parser.add_argument(
+        '-d', '--decode',
+        action='store_true',
+        help='Decode base64 input back to binary instead of encoding'
+    )
+    
+    parser.add_argument(
+        '--jsonl',
+        action='store_true',
+        help='Emit JSON Lines payload records even for a single input file'
+    )
+    
+    parser.add_argument(
+        '-j', '--workers',
+        type=int,
+        help='Number of encoder threads in batch mode (default: based on CPU count)'
     )
     
     parser.add_argument(
         '-v', '--version',
         action='version',
-        version='%(prog)s 1.0.0'
+        version='%(prog)s 1.2.0'
     )
     
     args = parser.parse_args()
     
-    # Encode the file
-    encode_file_to_base64(args.input_file)
+    batch = (
+        args.jsonl
+        or len(args.input_file) > 1
+        or any(os.path.isdir(item) or _is_pattern(item) for item in args.input_file)
+    )
+    
+    if batch:
+        if args.decode or args.wrap:
+            parser.error("--decode and --wrap cannot be used with batch (JSON Lines) mode")
+        # Encode all matching files
+        encode_files_to_jsonl(args.input_file, args.output, workers=args.workers)
+    elif args.decode:
+        # Decode the file
+        decode_base64_file(args.input_file[0], args.output)
+    else:
+        # Encode the file
+        encode_file_to_base64(args.input_file[0], args.output, wrap=args.wrap)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Blank and Duplicate Page Filter
+
+This script finds pages that are not worth an OCR call, such as separator
+sheets, blank backs and, with ``--duplicates``, pages that are in the file more
+than once. It prints a ``pageRange`` expression that leaves them out, in the
+syntax the ``StartOperation`` request and the queue message ``PageRange``
+already accept.
+
+Every page is rasterized in grayscale at a low resolution (50 DPI by default)
+and reduced with NumPy to two measurements:
+
+- ink coverage: the share of pixels darker than ``--ink-level`` inside the page
+  margins. Pages below ``--blank-threshold`` are blank.
+- a 64-bit perceptual hash (DCT of a 32x32 thumbnail). With ``--duplicates``,
+  pages within ``--hash-distance`` bits of an earlier kept page are duplicate
+  candidates.
+
+A skipped duplicate is never OCRed, so a duplicate has to draw the same thing,
+not just look alike: filings of the same printed form that differ only in a
+file number hash alike and differ by a few pixels at 50 DPI. A candidate is
+only a duplicate if its ink mask matches the earlier page's pixel for pixel (at
+most ``--max-ink-pixels`` pixels differ, 0 by default), first at ``--dpi`` and
+then with both pages rendered again at ``--confirm-dpi``. This catches pages
+that were sent or copied into the file twice; two scans of the same sheet never
+match exactly and are both kept.
+
+The page range goes to stdout and the summary to stderr, so the range can be
+captured directly::
+    
+    RANGE=$(python filter_pages.py scan.pdf)
+
+Usage:
+    python filter_pages.py <input_pdf> [--page-range "1-40"] [--json report.json]
+
+Example:
+    python filter_pages.py scan.pdf
+    python filter_pages.py scan.pdf --blank-threshold 0.0005 --duplicates
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    print("Error: pypdfium2 library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install pypdfium2", file=sys.stderr)
+    sys.exit(1)
+
+from split_pdf import format_page_range, parse_page_range
+
+
+DEFAULT_DPI = 50
+# Gray level (0-255) below which a pixel counts as ink
+DEFAULT_INK_LEVEL = 160
+# Pages with less ink than this share of the area are blank
+DEFAULT_BLANK_THRESHOLD = 0.001
+# Share of each edge ignored for coverage (scanner shadows, punch holes)
+DEFAULT_MARGIN = 0.05
+# Hamming distance between hashes for a duplicate candidate
+DEFAULT_HASH_DISTANCE = 6
+# Pixels whose ink may differ between a page and its duplicate
+DEFAULT_MAX_INK_PIXELS = 0
+# Resolution at which a duplicate is confirmed; one character of a file
+# number is only a few pixels at 50 DPI
+DEFAULT_CONFIRM_DPI = 200
+
+HASH_SIZE = 8
+_DCT_SIZE = 32
+# Page batches handed to each worker process, as in split_pdf.py
+SHARDS_PER_WORKER = 4
+
+
+def _dct_matrix(size):
+    """Orthonormal DCT-II basis, so ``M @ X @ M.T`` is the 2-D DCT of ``X``."""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _resize_area(image, size):
+    """Downscale a 2-D array to ``size`` x ``size`` by averaging pixel blocks."""
+    height, width = image.shape
+    if height < size or width < size:
+        rows = np.linspace(0, height - 1, size).astype(int)
+        cols = np.linspace(0, width - 1, size).astype(int)
+        return image[np.ix_(rows, cols)].astype(np.float64)
+    row_edges = np.linspace(0, height, size + 1).astype(int)
+    col_edges = np.linspace(0, width, size + 1).astype(int)
+    summed = np.add.reduceat(np.add.reduceat(image.astype(np.float64), row_edges[:-1], axis=0),
+                             col_edges[:-1], axis=1)
+    return summed / np.outer(np.diff(row_edges), np.diff(col_edges))
+
+
+def perceptual_hash(image):
+    """
+    Compute a 64-bit DCT perceptual hash of a grayscale page.
+    
+    Args:
+        image (numpy.ndarray): 2-D uint8 array
+    
+    Returns:
+        int: Hash with one bit per low-frequency coefficient above the median
+    """
+    coefficients = _DCT @ _resize_area(image, _DCT_SIZE) @ _DCT.T
+    low = coefficients[:HASH_SIZE, :HASH_SIZE].ravel()
+    # The DC term only reflects overall brightness
+    bits = low[1:] > np.median(low[1:])
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def ink_coverage(image, ink_level=DEFAULT_INK_LEVEL, margin=DEFAULT_MARGIN):
+    """
+    Return the share of pixels darker than ``ink_level`` inside the margins.
+    
+    Args:
+        image (numpy.ndarray): 2-D uint8 grayscale array
+        ink_level (int): Gray level below which a pixel is ink
+        margin (float): Share of each edge to ignore
+    
+    Returns:
+        float: Ink coverage between 0 and 1
+    """
+    height, width = image.shape
+    top, left = int(height * margin), int(width * margin)
+    inner = image[top:height - top or None, left:width - left or None]
+    if inner.size == 0:
+        return 0.0
+    return float(np.count_nonzero(inner < ink_level)) / inner.size
+
+
+def ink_difference(mask_a, mask_b):
+    """
+    Return the number of pixels that are ink on one page and not the other.
+    
+    No movement is tolerated: a file number that differs by one character
+    differs by only a few pixels at low resolution, and any tolerance for ink
+    that moved would hide it.
+    
+    Args:
+        mask_a (numpy.ndarray): Boolean ink mask of one page
+        mask_b (numpy.ndarray): Boolean ink mask of the same shape
+    
+    Returns:
+        int: 0 for pages that render identically
+    """
+    return int(np.count_nonzero(mask_a ^ mask_b))
+
+
+def _render_gray(pdf, page_index, dpi):
+    page = pdf[page_index]
+    try:
+        bitmap = page.render(scale=dpi / 72, grayscale=True)
+        try:
+            # Copy out of PDFium's buffer before the bitmap is released
+            return np.array(bitmap.to_numpy(), dtype=np.uint8).reshape(bitmap.height, -1)
+        finally:
+            bitmap.close()
+    finally:
+        page.close()
+
+
+def _unpack(shape, packed):
+    return np.unpackbits(packed, count=shape[0] * shape[1]).reshape(shape).astype(bool)
+
+
+def _measure_pages(input_path, page_numbers, dpi, ink_level, margin):
+    """
+    Rasterize pages and reduce each one to its measurements.
+    
+    Runs in-process or as a worker-process batch. Masks are bit-packed so a
+    batch is cheap to send back to the parent.
+    
+    Returns:
+        list: ``(page, coverage, hash, shape, packed mask)`` tuples
+    """
+    pdf = pdfium.PdfDocument(input_path)
+    try:
+        measurements = []
+        for page_number in page_numbers:
+            image = _render_gray(pdf, page_number - 1, dpi)
+            mask = image < ink_level
+            measurements.append((
+                page_number,
+                ink_coverage(image, ink_level, margin),
+                perceptual_hash(image),
+                mask.shape,
+                np.packbits(mask, axis=None),
+            ))
+        return measurements
+    finally:
+        pdf.close()
+
+
+def _shard_pages(page_numbers, workers):
+    shard_count = min(len(page_numbers), workers * SHARDS_PER_WORKER)
+    if shard_count == 0:
+        return []
+    size, remainder = divmod(len(page_numbers), shard_count)
+    shards = []
+    start = 0
+    for index in range(shard_count):
+        stop = start + size + (1 if index < remainder else 0)
+        shards.append(page_numbers[start:stop])
+        start = stop
+    return shards
+
+
+def analyze_pages(input_path, page_numbers=None, dpi=DEFAULT_DPI, ink_level=DEFAULT_INK_LEVEL,
+                  blank_threshold=DEFAULT_BLANK_THRESHOLD, margin=DEFAULT_MARGIN,
+                  hash_distance=DEFAULT_HASH_DISTANCE, max_ink_pixels=DEFAULT_MAX_INK_PIXELS,
+                  confirm_dpi=DEFAULT_CONFIRM_DPI, detect_duplicates=False, workers=1):
+    """
+    Classify pages as kept, blank or duplicate.
+    
+    Args:
+        input_path (str): Path to the PDF file
+        page_numbers (list): 1-indexed pages to consider (default: all)
+        dpi (int): Rasterization resolution
+        ink_level (int): Gray level below which a pixel counts as ink
+        blank_threshold (float): Coverage below which a page is blank
+        margin (float): Share of each edge ignored for coverage
+        hash_distance (int): Maximum hash Hamming distance for a duplicate candidate
+        max_ink_pixels (int): Maximum number of differing ink pixels for a
+            duplicate, at ``dpi`` and again at ``confirm_dpi``
+        confirm_dpi (int): Resolution at which duplicates are confirmed
+        detect_duplicates (bool): Whether to look for duplicates at all
+        workers (int): Processes to rasterize with (1 renders in-process)
+    
+    Returns:
+        list: One dict per page with ``page``, ``coverage``, ``hash``,
+        ``status`` (``kept``, ``blank`` or ``duplicate``) and ``duplicateOf``
+    """
+    if page_numbers is None:
+        pdf = pdfium.PdfDocument(input_path)
+        page_numbers = list(range(1, len(pdf) + 1))
+        pdf.close()
+    
+    if workers == 1:
+        measurements = _measure_pages(input_path, page_numbers, dpi, ink_level, margin)
+    else:
+        # Rendering dominates; matching below stays sequential in page order
+        measurements = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_measure_pages, input_path, shard, dpi, ink_level, margin)
+                for shard in _shard_pages(page_numbers, workers)
+            ]
+            for future in futures:
+                measurements.extend(future.result())
+    
+    results = []
+    kept_hashes = []
+    kept_masks = []
+    kept_pages = []
+    # Masks at confirm_dpi, rendered the first time a page is compared there
+    confirm_masks = {}
+    confirm_pdf = None
+    
+    def confirm_mask(page_number):
+        nonlocal confirm_pdf
+        if page_number not in confirm_masks:
+            if confirm_pdf is None:
+                confirm_pdf = pdfium.PdfDocument(input_path)
+            image = _render_gray(confirm_pdf, page_number - 1, confirm_dpi)
+            confirm_masks[page_number] = (image.shape, np.packbits(image < ink_level, axis=None))
+        shape, packed = confirm_masks[page_number]
+        return _unpack(shape, packed)
+    
+    try:
+        for page_number, coverage, page_hash, shape, packed in measurements:
+            result = {
+                'page': page_number,
+                'coverage': round(coverage, 5),
+                'hash': f"{page_hash:016x}",
+                'status': 'kept',
+                'duplicateOf': None,
+            }
+            results.append(result)
+            
+            if coverage < blank_threshold:
+                result['status'] = 'blank'
+                continue
+            if not detect_duplicates:
+                continue
+            
+            if kept_hashes:
+                distances = np.array([bin(page_hash ^ other).count('1') for other in kept_hashes])
+                # Closest hashes first: an exact copy usually matches on the first try
+                candidates = np.flatnonzero(distances <= hash_distance)
+                mask = None
+                for index in candidates[np.argsort(distances[candidates], kind='stable')]:
+                    other_shape, other_packed = kept_masks[index]
+                    if other_shape != shape:
+                        continue
+                    if mask is None:
+                        mask = _unpack(shape, packed)
+                    if ink_difference(mask, _unpack(shape, other_packed)) > max_ink_pixels:
+                        continue
+                    high, other_high = confirm_mask(page_number), confirm_mask(kept_pages[index])
+                    if high.shape == other_high.shape and ink_difference(high, other_high) <= max_ink_pixels:
+                        result['status'] = 'duplicate'
+                        result['duplicateOf'] = kept_pages[index]
+                        break
+            if result['status'] == 'kept':
+                kept_hashes.append(page_hash)
+                kept_masks.append((shape, packed))
+                kept_pages.append(page_number)
+    finally:
+        if confirm_pdf is not None:
+            confirm_pdf.close()
+    return results
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Find blank and duplicate pages and print a pageRange that skips them.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s scan.pdf
+  %(prog)s scan.pdf --page-range "1-40" --json report.json
+  %(prog)s scan.pdf --blank-threshold 0.0005 --duplicates
+        """
+    )
+    
+    parser.add_argument(
+        'input_pdf',
+        help='Path to the PDF file to check'
+    )
+    
+    parser.add_argument(
+        '-p', '--page-range',
+        help='Only consider these pages, e.g. "1-40" (same syntax as pageRange)'
+    )
+    
+    parser.add_argument(
+        '--dpi',
+        type=int,
+        default=DEFAULT_DPI,
+        help=f'Rasterization resolution (default: {DEFAULT_DPI})'
+    )
+    
+    parser.add_argument(
+        '--ink-level',
+        type=int,
+        default=DEFAULT_INK_LEVEL,
+        help=f'Gray level 0-255 below which a pixel counts as ink (default: {DEFAULT_INK_LEVEL})'
+    )
+    
+    parser.add_argument(
+        '--blank-threshold',
+        type=float,
+        default=DEFAULT_BLANK_THRESHOLD,
+        help=f'Ink coverage below which a page is blank (default: {DEFAULT_BLANK_THRESHOLD})'
+    )
+    
+    parser.add_argument(
+        '--margin',
+        type=float,
+        default=DEFAULT_MARGIN,
+        help=f'Share of each edge ignored when measuring ink (default: {DEFAULT_MARGIN})'
+    )
+    
+    parser.add_argument(
+        '--hash-distance',
+        type=int,
+        default=DEFAULT_HASH_DISTANCE,
+        help=f'Maximum perceptual hash distance for a duplicate candidate (default: {DEFAULT_HASH_DISTANCE})'
+    )
+    
+    parser.add_argument(
+        '--max-ink-pixels',
+        type=int,
+        default=DEFAULT_MAX_INK_PIXELS,
+        help=f'With --duplicates, number of pixels whose ink may differ between a page and its duplicate '
+             f'(default: {DEFAULT_MAX_INK_PIXELS}, identical)'
+    )
+    
+    parser.add_argument(
+        '--confirm-dpi',
+        type=int,
+        default=DEFAULT_CONFIRM_DPI,
+        help=f'With --duplicates, resolution at which a duplicate is confirmed (default: {DEFAULT_CONFIRM_DPI})'
+    )
+    
+    parser.add_argument(
+        '--duplicates',
+        action='store_true',
+        help='Also skip pages that render identically to an earlier page (default: only skip blank pages)'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes to rasterize with (default: 1, serial)'
+    )
+    
+    parser.add_argument(
+        '--json',
+        metavar='PATH',
+        help='Also write per-page coverage, hashes and decisions to a JSON file'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.1.0'
+    )
+    
+    args = parser.parse_args()
+    
+    if not os.path.isfile(args.input_pdf):
+        print(f"Error: Input file '{args.input_pdf}' does not exist.", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.workers < 1:
+        print("Error: --workers must be 1 or greater.", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.max_ink_pixels < 0 or args.confirm_dpi < 1:
+        print("Error: --max-ink-pixels must be 0 or greater and --confirm-dpi 1 or greater.", file=sys.stderr)
+        sys.exit(1)
+    
+    started = time.perf_counter()
+    try:
+        page_numbers = None
+        if args.page_range:
+            pdf = pdfium.PdfDocument(args.input_pdf)
+            total_pages = len(pdf)
+            pdf.close()
+            page_numbers = parse_page_range(args.page_range, max_page=total_pages)
+        results = analyze_pages(
+            args.input_pdf,
+            page_numbers=page_numbers,
+            dpi=args.dpi,
+            ink_level=args.ink_level,
+            blank_threshold=args.blank_threshold,
+            margin=args.margin,
+            hash_distance=args.hash_distance,
+            max_ink_pixels=args.max_ink_pixels,
+            confirm_dpi=args.confirm_dpi,
+            detect_duplicates=args.duplicates,
+            workers=args.workers,
+        )
+    except pdfium.PdfiumError as e:
+        print(f"Error: Invalid or corrupted PDF file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: Invalid page selection: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+    
+    kept = [result['page'] for result in results if result['status'] == 'kept']
+    blank = [result['page'] for result in results if result['status'] == 'blank']
+    duplicates = [result for result in results if result['status'] == 'duplicate']
+    page_range = format_page_range(kept)
+    
+    skipped = len(blank) + len(duplicates)
+    share = skipped / len(results) * 100 if results else 0.0
+    print(f"Checked {len(results)} pages in {elapsed:.2f}s", file=sys.stderr)
+    print(f"  Blank:      {len(blank)} ({format_page_range(blank) or '-'})", file=sys.stderr)
+    pairs = ', '.join('{}={}'.format(d['page'], d['duplicateOf']) for d in duplicates[:20])
+    if len(duplicates) > 20:
+        pairs += ', ...'
+    print(f"  Duplicates: {len(duplicates)} ({pairs or '-'})", file=sys.stderr)
+    print(f"  Skipped:    {skipped} of {len(results)} OCR calls ({share:.1f}%)", file=sys.stderr)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'file': args.input_pdf, 'pageRange': page_range, 'pages': results}, f, indent=2)
+        print(f"  Report:     {args.json}", file=sys.stderr)
+    
+    if not kept:
+        # An empty pageRange means "all pages" to the API, so never emit one
+        print("Error: every page is blank or a duplicate; nothing to OCR.", file=sys.stderr)
+        sys.exit(2)
+    print(page_range)
+
+
+if __name__ == '__main__':
+    main()
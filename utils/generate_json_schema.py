@@ -8,19 +8,37 @@ and data types found in the JSON data. The schema follows the JSON Schema Draft
 This utility uses the genson library for robust schema generation with advanced features
 like schema merging, type inference, and proper handling of complex data structures.
 
+Very large inputs can be processed in streaming mode (``--stream``): top-level
+arrays and JSON Lines files are parsed one item at a time and fed straight into
+the schema builder, so memory stays proportional to the schema rather than the
+data. ``--sample`` and ``--sample-rate`` limit how many items are inspected for
+quick passes over huge exports.
+
+With ``--workers N`` the input is split into shards, partial schemas are built
+in a process pool and merged with genson's ``add_schema``; the result is the
+same schema the serial path produces. JSON Lines files are split by byte range
+so each worker reads its own part of the file.
+
 Usage:
-    python generate_json_schema.py <input_json_file>
+    python generate_json_schema.py <input_json_file> [--stream] [--sample N] [--sample-rate P]
+    python generate_json_schema.py <input_json_file> --workers N
 
 Example:
     python generate_json_schema.py data.json
     python generate_json_schema.py config.json > schema.json
     python generate_json_schema.py /path/to/file.json
+    python generate_json_schema.py export.jsonl --sample 10000 > schema.json
+    python generate_json_schema.py export.jsonl --workers 8 > schema.json
 """
 
 import argparse
 import json
 import os
+import random
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
 
 try:
@@ -32,7 +50,323 @@ except ImportError:
     sys.exit(1)
 
 
-def generate_json_schema(json_data, title=None, description=None):
+# Characters read from the input per refill in streaming mode.
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# File extensions that are always parsed as JSON Lines (streaming mode).
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+
+# Items per shard when an array is streamed by the parent to worker processes.
+PARALLEL_BATCH_SIZE = 5000
+
+# Byte-range shards per worker when splitting JSON Lines files.
+SHARDS_PER_WORKER = 4
+
+_JSON_WHITESPACE = ' \t\n\r'
+
+# Characters that may legally follow a complete top-level or array item value.
+_JSON_DELIMITERS = _JSON_WHITESPACE + ',]'
+
+
+class _JsonStreamReader:
+    """
+    Incremental reader over a text file containing JSON values.
+    
+    Keeps only the unparsed tail of the input in memory and decodes one value
+    at a time with ``json.JSONDecoder.raw_decode``.
+    """
+    
+    def __init__(self, file, chunk_size=STREAM_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+    
+    def _fill(self, size):
+        """Drop consumed input and append up to ``size`` more characters."""
+        data = self.file.read(size)
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        if not data:
+            self.eof = True
+        return bool(data)
+    
+    def peek(self):
+        """Skip whitespace and return the next character, or '' at end of input."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _JSON_WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+    
+    def expect(self, char):
+        """Consume ``char`` (after whitespace) or raise a decode error."""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+    
+    def decode_value(self):
+        """Decode the JSON value starting at the next non-whitespace character."""
+        self.peek()
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number may be cut short at a chunk boundary ("1.5e" of
+                # "1.5e3"); only accept it once a delimiter follows, or at EOF.
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in _JSON_DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if self._fill(read_size):
+                # Grow reads so values larger than one chunk aren't re-parsed per chunk
+                read_size *= 2
+
+
+def iter_json_items(file, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield items from a JSON file one at a time without loading it whole.
+    
+    A top-level array yields its elements; otherwise the file is treated as a
+    sequence of whitespace-separated values (JSON Lines, or a single object).
+    
+    Args:
+        file: Text file object opened for reading
+        chunk_size (int): Characters to read per refill
+    
+    Yields:
+        The parsed JSON items, in file order
+    
+    Raises:
+        json.JSONDecodeError: If the input is not valid JSON
+    """
+    reader = _JsonStreamReader(file, chunk_size)
+    first = reader.peek()
+    if first != "[":
+        while reader.peek():
+            yield reader.decode_value()
+        return
+    
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+    else:
+        while True:
+            yield reader.decode_value()
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("]")
+            break
+    if reader.peek():
+        raise json.JSONDecodeError("Extra data", reader.buffer, reader.pos)
+
+
+def sample_items(items, sample=None, sample_rate=None, seed=None):
+    """
+    Thin out an item stream for quick passes over huge inputs.
+    
+    Args:
+        items: Iterable of items
+        sample (int): Stop after this many items have been kept
+        sample_rate (float): Keep each item with this probability (0 < P <= 1)
+        seed (int): Optional random seed so sampled runs are reproducible
+    
+    Yields:
+        The kept items, in input order
+    """
+    rng = random.Random(seed)
+    kept = 0
+    for item in items:
+        if sample is not None and kept >= sample:
+            return
+        if sample_rate is not None and rng.random() >= sample_rate:
+            continue
+        kept += 1
+        yield item
+
+
+def _build_partial_schema(items):
+    """
+    Worker entry point: build a schema for one shard of items.
+    
+    Args:
+        items: Iterable of parsed JSON items
+    
+    Returns:
+        tuple: ``(schema, item_count, elapsed_seconds)``
+    """
+    started = time.perf_counter()
+    builder = SchemaBuilder()
+    count = 0
+    for item in items:
+        builder.add_object(item)
+        count += 1
+    return builder.to_schema(), count, time.perf_counter() - started
+
+
+def _iter_json_lines(input_path, start, end):
+    """Yield the JSON Lines values whose lines start in ``[start, end)``."""
+    with open(input_path, 'rb') as file:
+        file.seek(start)
+        position = start
+        while position < end:
+            line = file.readline()
+            if not line:
+                break
+            position += len(line)
+            if line.strip():
+                yield json.loads(line)
+
+
+def _build_partial_schema_from_lines(input_path, start, end):
+    """Worker entry point: build a schema for a byte range of a JSON Lines file."""
+    return _build_partial_schema(_iter_json_lines(input_path, start, end))
+
+
+def _json_lines_shards(input_path, shard_count):
+    """
+    Split a JSON Lines file into ``(start, end)`` byte ranges on line boundaries.
+    
+    Args:
+        input_path: Path to the JSON Lines file
+        shard_count: Desired number of shards
+    
+    Returns:
+        list: Non-empty byte ranges covering the whole file, in order
+    """
+    file_size = os.path.getsize(input_path)
+    boundaries = [0]
+    with open(input_path, 'rb') as file:
+        for index in range(1, shard_count):
+            file.seek(max(file_size * index // shard_count, boundaries[-1]))
+            file.readline()
+            boundaries.append(min(file.tell(), file_size))
+    boundaries.append(file_size)
+    return [
+        (start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start
+    ]
+
+
+def merge_schemas(schemas):
+    """
+    Merge partial schemas into one with genson's ``add_schema``.
+    
+    Args:
+        schemas: Iterable of schemas, in the order their items appeared
+    
+    Returns:
+        dict: The merged schema
+    """
+    builder = SchemaBuilder()
+    for schema in schemas:
+        builder.add_schema(schema)
+    return builder.to_schema()
+
+
+def build_schema_parallel(shard_jobs, workers):
+    """
+    Build partial schemas in a process pool and merge them in shard order.
+    
+    Jobs are submitted lazily with at most ``2 * workers`` in flight, and each
+    partial schema is merged as soon as all earlier shards are done, so memory
+    is bounded by a few shards regardless of input size. Per-shard timings are
+    reported on stderr.
+    
+    Args:
+        shard_jobs: Iterable of ``(function, args)`` worker calls; each
+            function returns ``(schema, item_count, elapsed_seconds)``
+        workers: Number of worker processes
+    
+    Returns:
+        tuple: ``(schema, item_count)`` with the merged schema
+    """
+    builder = SchemaBuilder()
+    total = 0
+    results = {}
+    next_to_merge = 0
+    started = time.perf_counter()
+    jobs = iter(enumerate(shard_jobs))
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+        
+        def submit_next():
+            job = next(jobs, None)
+            if job is not None:
+                shard_id, (function, args) = job
+                in_flight[executor.submit(function, *args)] = shard_id
+        
+        for _ in range(workers * 2):
+            submit_next()
+        
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard_id = in_flight.pop(future)
+                schema, count, elapsed = future.result()
+                print(
+                    f"  Shard {shard_id + 1}: {count:,} items in {elapsed:.2f}s",
+                    file=sys.stderr,
+                )
+                results[shard_id] = schema
+                total += count
+                submit_next()
+            
+            # Merge completed shards in order so the result matches a serial run
+            while next_to_merge in results:
+                builder.add_schema(results.pop(next_to_merge))
+                next_to_merge += 1
+    
+    elapsed = time.perf_counter() - started
+    print(
+        f"Merged {next_to_merge:,} shards with {workers} workers in {elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    return builder.to_schema(), total
+
+
+def _batched(items, size):
+    """Yield lists of up to ``size`` consecutive items."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _apply_schema_metadata(schema, title=None, description=None):
+    """Add title, description, ``$schema`` and ``$id`` to a generated schema."""
+    # Add custom metadata if provided
+    if title:
+        schema["title"] = title
+    else:
+        schema["title"] = "Generated JSON Schema"
+    
+    if description:
+        schema["description"] = description
+    else:
+        schema["description"] = "Schema generated from sample JSON data using genson"
+    
+    # Add schema version if not present
+    if "$schema" not in schema:
+        schema["$schema"] = "https://json-schema.org/draft-07/schema#"
+    
+    # Add an ID if not present
+    if "$id" not in schema:
+        schema["$id"] = "generated-schema"
+    
+    return schema
+
+
+def generate_json_schema(json_data, title=None, description=None, workers=1):
     """
     Generate a JSON schema from JSON data using genson.
     
@@ -40,10 +374,21 @@ def generate_json_schema(json_data, title=None, description=None):
         json_data: The parsed JSON data
         title: Optional title for the schema
         description: Optional description for the schema
-        
+        workers: Number of worker processes for arrays (1 builds in-process)
+    
     Returns:
         dict: The generated JSON schema
     """
+    if workers > 1 and isinstance(json_data, list):
+        # Split the array into shards and merge the partial schemas
+        shard_size = max(1, -(-len(json_data) // (workers * SHARDS_PER_WORKER)))
+        shard_jobs = (
+            (_build_partial_schema, (json_data[start:start + shard_size],))
+            for start in range(0, len(json_data), shard_size)
+        )
+        schema, _ = build_schema_parallel(shard_jobs, workers)
+        return _apply_schema_metadata(schema, title, description)
+    
     # Create a SchemaBuilder instance
     builder = SchemaBuilder()
     
@@ -60,35 +405,51 @@ def generate_json_schema(json_data, title=None, description=None):
     # Generate the schema
     schema = builder.to_schema()
     
-    # Add custom metadata if provided
-    if title:
-        schema["title"] = title
-    else:
-        schema["title"] = "Generated JSON Schema"
+    return _apply_schema_metadata(schema, title, description)
+
+
+def generate_json_schema_from_items(items, title=None, description=None):
+    """
+    Generate a JSON schema from an iterable of items, one at a time.
     
-    if description:
-        schema["description"] = description
-    else:
-        schema["description"] = "Schema generated from sample JSON data using genson"
+    Each item is passed to ``SchemaBuilder.add_object`` as it arrives, so the
+    items never need to be held in memory together.
     
-    # Add schema version if not present
-    if "$schema" not in schema:
-        schema["$schema"] = "https://json-schema.org/draft-07/schema#"
+    Args:
+        items: Iterable of parsed JSON items
+        title: Optional title for the schema
+        description: Optional description for the schema
     
-    # Add an ID if not present
-    if "$id" not in schema:
-        schema["$id"] = "generated-schema"
+    Returns:
+        tuple: ``(schema, item_count)``
+    """
+    builder = SchemaBuilder()
+    count = 0
+    for item in items:
+        builder.add_object(item)
+        count += 1
     
-    return schema
+    schema = builder.to_schema()
+    
+    return _apply_schema_metadata(schema, title, description), count
 
 
-def generate_schema_from_file(input_path):
+def generate_schema_from_file(
+    input_path, stream=False, sample=None, sample_rate=None, seed=None, workers=1
+):
     """
     Generate JSON schema from a JSON file.
     
     Args:
-        input_path: Path to the input JSON file
-        
+        input_path: Path to the input JSON (or JSON Lines) file
+        stream: Parse the file item by item instead of loading it whole.
+            Implied by JSON Lines files and by the sampling options.
+        sample: Optional maximum number of items to inspect (streaming)
+        sample_rate: Optional probability of inspecting each item (streaming)
+        seed: Optional random seed for ``sample_rate``
+        workers: Number of worker processes; more than one builds partial
+            schemas in parallel and merges them (cannot be combined with sampling)
+    
     Returns:
         dict: The generated JSON schema
     """
@@ -111,17 +472,55 @@ def generate_schema_from_file(input_path):
         print(f"Analyzing JSON file: {file_name}", file=sys.stderr)
         print(f"File size: {file_size:,} bytes", file=sys.stderr)
         
-        # Read and parse the JSON file
-        with open(input_path, 'r', encoding='utf-8') as file:
-            json_data = json.load(file)
-        
         # Generate custom title and description based on filename
         base_name = Path(input_path).stem
         title = f"Schema for {base_name}"
         description = f"JSON schema generated from {file_name} using genson library"
         
-        # Generate the schema
-        schema = generate_json_schema(json_data, title=title, description=description)
+        stream = (
+            stream
+            or sample is not None
+            or sample_rate is not None
+            or Path(input_path).suffix.lower() in JSON_LINES_EXTENSIONS
+        )
+        
+        is_json_lines = Path(input_path).suffix.lower() in JSON_LINES_EXTENSIONS
+        
+        if workers > 1 and is_json_lines:
+            # Each worker parses its own byte range of the file
+            shards = _json_lines_shards(input_path, workers * SHARDS_PER_WORKER)
+            shard_jobs = (
+                (_build_partial_schema_from_lines, (input_path, start, end))
+                for start, end in shards
+            )
+            schema, count = build_schema_parallel(shard_jobs, workers)
+            schema = _apply_schema_metadata(schema, title, description)
+            print(f"Items analyzed: {count:,}", file=sys.stderr)
+        elif workers > 1:
+            # Stream the array here and hand batches of items to the workers
+            with open(input_path, 'r', encoding='utf-8') as file:
+                shard_jobs = (
+                    (_build_partial_schema, (batch,))
+                    for batch in _batched(iter_json_items(file), PARALLEL_BATCH_SIZE)
+                )
+                schema, count = build_schema_parallel(shard_jobs, workers)
+            schema = _apply_schema_metadata(schema, title, description)
+            print(f"Items analyzed: {count:,}", file=sys.stderr)
+        elif stream:
+            # Parse and add items one at a time
+            with open(input_path, 'r', encoding='utf-8') as file:
+                items = sample_items(iter_json_items(file), sample, sample_rate, seed)
+                schema, count = generate_json_schema_from_items(
+                    items, title=title, description=description
+                )
+            print(f"Items analyzed: {count:,}", file=sys.stderr)
+        else:
+            # Read and parse the JSON file
+            with open(input_path, 'r', encoding='utf-8') as file:
+                json_data = json.load(file)
+            
+            # Generate the schema
+            schema = generate_json_schema(json_data, title=title, description=description)
         
         # Output the schema to stdout
         print(json.dumps(schema, indent=2, ensure_ascii=False))
@@ -130,7 +529,7 @@ def generate_schema_from_file(input_path):
         print(f"Successfully generated JSON schema using genson", file=sys.stderr)
         
         return schema
-        
+    
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON file: {str(e)}", file=sys.stderr)
         sys.exit(1)
@@ -155,15 +554,26 @@ Examples:
   %(prog)s data.json
   %(prog)s config.json > schema.json
   %(prog)s /path/to/file.json
-  
+  %(prog)s export.json --stream > schema.json
+  %(prog)s export.jsonl --sample 10000
+  %(prog)s export.jsonl --sample-rate 0.01 --seed 42
+  %(prog)s export.jsonl --workers 8
+
 Note: JSON schema output goes to stdout, status messages go to stderr.
       Use redirection (>) to save schema output to a file.
-      
+
 This utility uses the genson library for robust schema generation with features like:
 - Advanced type inference and schema merging
 - Proper handling of optional properties
 - Support for complex nested structures
 - JSON Schema Draft 7 compliance
+
+Streaming mode parses top-level arrays and JSON Lines (.jsonl/.ndjson) files
+one item at a time, so multi-GB exports can be profiled with flat memory.
+
+Parallel mode (--workers N) builds partial schemas in a process pool and merges
+them into the same schema a serial run produces. JSON Lines files must hold one
+value per line so they can be split by byte range.
         """
     )
     
@@ -172,16 +582,66 @@ This utility uses the genson library for robust schema generation with features
         help='Path to the input JSON file to analyze'
     )
     
+    parser.add_argument(
+        '-s', '--stream',
+        action='store_true',
+        help='Parse the input item by item instead of loading it into memory '
+             '(implied for .jsonl/.ndjson files and sampling options)'
+    )
+    
+    parser.add_argument(
+        '--sample',
+        type=int,
+        metavar='N',
+        help='Stop after analyzing N items'
+    )
+    
+    parser.add_argument(
+        '--sample-rate',
+        type=float,
+        metavar='P',
+        help='Analyze each item with probability P (0 < P <= 1)'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Random seed for --sample-rate, for reproducible runs'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes for sharded schema inference (default: 1)'
+    )
+    
     parser.add_argument(
         '-v', '--version',
         action='version',
-        version='%(prog)s 2.0.0'
+        version='%(prog)s 2.2.0'
     )
     
     args = parser.parse_args()
     
+    if args.sample is not None and args.sample < 1:
+        parser.error("--sample must be 1 or greater")
+    if args.sample_rate is not None and not 0 < args.sample_rate <= 1:
+        parser.error("--sample-rate must be greater than 0 and at most 1")
+    if args.workers < 1:
+        parser.error("--workers must be 1 or greater")
+    if args.workers > 1 and (args.sample is not None or args.sample_rate is not None):
+        parser.error("--workers cannot be combined with --sample or --sample-rate")
+    
     # Generate the schema
-    generate_schema_from_file(args.input_json_file)
+    generate_schema_from_file(
+        args.input_json_file,
+        stream=args.stream,
+        sample=args.sample,
+        sample_rate=args.sample_rate,
+        seed=args.seed,
+        workers=args.workers,
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+PDF Linearizer
+
+This script rewrites PDFs as linearized ("fast web view") files. A linearized
+PDF starts with a linearization dictionary, the objects the first page needs
+and hint tables that locate every other page, so a viewer reading the file
+with HTTP range requests (pdf.js on the review page, served by
+``PdfController.GetPdf`` with range processing) can render page 1 before the
+rest of the file has arrived.
+
+pypdf cannot write linearized files. The work is done by pikepdf when it is
+installed, and otherwise by the ``qpdf`` command-line tool (pikepdf is built on
+the qpdf library, so both produce the same layout).
+
+Inputs are PDF files and directories of PDFs. The linearized files are written
+to ``--output-dir`` under the same names, or replace the originals with
+``--in-place``. Every file is written under a temporary name and renamed, so an
+interrupted run never leaves a truncated PDF behind. Files that are already
+linearized are copied (or left alone) unless ``--force`` is given.
+
+``split_pdf.py --linearize`` uses the same code to linearize split output as it
+is written.
+
+Usage:
+    python linearize_pdf.py <pdf_or_directory>... --output-dir DIR [--workers N]
+    python linearize_pdf.py <pdf_or_directory>... --in-place [--workers N]
+
+Example:
+    python linearize_pdf.py output_pages/ --in-place --workers 8
+    python linearize_pdf.py scan1.pdf scan2.pdf -o linearized/
+"""
+
+import argparse
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pikepdf
+except ImportError:  # the qpdf command-line tool is used instead
+    pikepdf = None
+
+
+# qpdf exits with 3 when the output was written but there were warnings
+QPDF_WARNING_EXIT_CODE = 3
+# The linearization dictionary is the first object in the file
+LINEARIZED_HEADER_BYTES = 1024
+_LINEARIZED_PATTERN = re.compile(rb'\bobj\s*<<[^>]*/Linearized\b')
+# Files handed to each worker process, as in split_pdf.py
+SHARDS_PER_WORKER = 4
+
+
+def linearize_backend():
+    """
+    Return the tool that will linearize PDFs.
+    
+    Returns:
+        str: ``pikepdf``, ``qpdf``, or None if neither is available
+    """
+    if pikepdf is not None:
+        return 'pikepdf'
+    if shutil.which('qpdf'):
+        return 'qpdf'
+    return None
+
+
+def is_linearized(data):
+    """
+    Tell whether a PDF is linearized from the first bytes of the file.
+    
+    Args:
+        data (bytes): The file's contents, or at least its first
+            ``LINEARIZED_HEADER_BYTES`` bytes
+    
+    Returns:
+        bool: True if the file starts with a linearization dictionary
+    """
+    return _LINEARIZED_PATTERN.search(data[:LINEARIZED_HEADER_BYTES]) is not None
+
+
+def _is_linearized_file(path):
+    with open(path, 'rb') as f:
+        return is_linearized(f.read(LINEARIZED_HEADER_BYTES))
+
+
+def _run_qpdf(input_path, output_path):
+    qpdf = shutil.which('qpdf')
+    if qpdf is None:
+        raise RuntimeError("Neither pikepdf nor the qpdf command-line tool is installed.")
+    result = subprocess.run(
+        [qpdf, '--linearize', input_path, output_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if result.returncode not in (0, QPDF_WARNING_EXIT_CODE):
+        raise RuntimeError(result.stderr.strip() or f"qpdf exited with code {result.returncode}")
+
+
+def linearize_bytes(data):
+    """
+    Linearize an in-memory PDF.
+    
+    Args:
+        data (bytes): PDF file contents
+    
+    Returns:
+        bytes: The linearized PDF
+    
+    Raises:
+        RuntimeError: If neither pikepdf nor qpdf is available, or qpdf fails
+    """
+    if pikepdf is not None:
+        buffer = io.BytesIO()
+        with pikepdf.open(io.BytesIO(data)) as pdf:
+            pdf.save(buffer, linearize=True)
+        return buffer.getvalue()
+    
+    with tempfile.TemporaryDirectory(prefix='linearize_') as work_dir:
+        input_path = os.path.join(work_dir, 'input.pdf')
+        output_path = os.path.join(work_dir, 'output.pdf')
+        with open(input_path, 'wb') as input_file:
+            input_file.write(data)
+        _run_qpdf(input_path, output_path)
+        with open(output_path, 'rb') as output_file:
+            return output_file.read()
+
+
+def linearize_file(input_path, output_path):
+    """
+    Write a linearized copy of a PDF file.
+    
+    The copy is written under a temporary name in the output directory and
+    renamed into place, so ``output_path`` may be ``input_path``. It keeps the
+    input file's permissions.
+    
+    Args:
+        input_path (str): PDF to linearize
+        output_path (str): Where to write the linearized PDF
+    
+    Raises:
+        RuntimeError: If neither pikepdf nor qpdf is available, or qpdf fails
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    descriptor, partial_path = tempfile.mkstemp(prefix='.linearize_', suffix='.partial', dir=directory)
+    os.close(descriptor)
+    try:
+        if pikepdf is not None:
+            with pikepdf.open(input_path) as pdf:
+                pdf.save(partial_path, linearize=True)
+        else:
+            _run_qpdf(input_path, partial_path)
+        shutil.copymode(input_path, partial_path)
+        os.replace(partial_path, output_path)
+    except BaseException:
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+        raise
+
+
+def collect_pdfs(paths):
+    """
+    Expand the command-line inputs into a list of PDF files.
+    
+    Args:
+        paths (list): PDF files and directories (the PDFs directly inside a
+            directory are used)
+    
+    Returns:
+        list: PDF file paths, directories' contents sorted by name
+    
+    Raises:
+        FileNotFoundError: If an input does not exist
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith('.pdf') and os.path.isfile(os.path.join(path, name))
+            )
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"Input '{path}' does not exist.")
+    return files
+
+
+def _linearize_jobs(jobs, force=False):
+    """
+    Worker entry point: linearize a batch of files.
+    
+    Args:
+        jobs (list): ``(input_path, output_path)`` tuples
+        force (bool): Rewrite files that are already linearized
+    
+    Returns:
+        list: ``(input_path, status, size_before, size_after, error)`` tuples,
+        where ``status`` is ``linearized``, ``skipped`` or ``failed``
+    """
+    results = []
+    for input_path, output_path in jobs:
+        size_before = os.path.getsize(input_path)
+        try:
+            if not force and _is_linearized_file(input_path):
+                if os.path.abspath(output_path) != os.path.abspath(input_path):
+                    shutil.copyfile(input_path, output_path)
+                    shutil.copymode(input_path, output_path)
+                results.append((input_path, 'skipped', size_before, size_before, None))
+                continue
+            linearize_file(input_path, output_path)
+            results.append((input_path, 'linearized', size_before, os.path.getsize(output_path), None))
+        except Exception as e:  # one damaged file must not stop the batch
+            results.append((input_path, 'failed', size_before, None, str(e)))
+    return results
+
+
+def linearize_pdfs(paths, output_dir=None, workers=1, force=False):
+    """
+    Linearize PDF files in bulk.
+    
+    Args:
+        paths (list): PDF files and directories of PDFs
+        output_dir (str): Directory for the linearized files; None rewrites
+            the inputs in place
+        workers (int): Number of worker processes (1 runs serially in-process)
+        force (bool): Rewrite files that are already linearized
+    
+    Returns:
+        dict: Number of files per status (``linearized``, ``skipped``,
+        ``failed``)
+    """
+    if workers < 1:
+        print("Error: --workers must be 1 or greater.", file=sys.stderr)
+        sys.exit(1)
+    
+    backend = linearize_backend()
+    if backend is None:
+        print("Error: Linearizing needs pikepdf or the qpdf command-line tool.", file=sys.stderr)
+        print("Please install it using: pip install pikepdf", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        files = collect_pdfs(paths)
+    except FileNotFoundError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    
+    if output_dir is None:
+        jobs = [(path, path) for path in files]
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = [(path, os.path.join(output_dir, os.path.basename(path))) for path in files]
+        names = [os.path.basename(path) for path in files]
+        duplicates = sorted(set(name for name in names if names.count(name) > 1))
+        if duplicates:
+            print(f"Error: More than one input is named '{duplicates[0]}'.", file=sys.stderr)
+            sys.exit(1)
+    
+    print(f"Linearizing {len(jobs)} PDF file(s) with {backend}")
+    started = time.perf_counter()
+    counts = {'linearized': 0, 'skipped': 0, 'failed': 0}
+    bytes_before = bytes_after = 0
+    
+    if workers == 1 or len(jobs) <= 1:
+        batches = [_linearize_jobs(jobs, force)]
+    else:
+        shard_count = min(len(jobs), workers * SHARDS_PER_WORKER)
+        shards = [jobs[index::shard_count] for index in range(shard_count)]
+        print(f"Linearizing with {workers} workers across {len(shards)} batches")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batches = list(executor.map(_linearize_jobs, shards, [force] * len(shards)))
+    
+    for batch in batches:
+        for input_path, status, size_before, size_after, error in batch:
+            counts[status] += 1
+            if status == 'failed':
+                print(f"  Failed {input_path}: {error}", file=sys.stderr)
+                continue
+            bytes_before += size_before
+            bytes_after += size_after
+            if status == 'skipped':
+                print(f"  Already linearized: {input_path}")
+            else:
+                print(f"  Linearized {input_path} ({size_before:,} -> {size_after:,} bytes)")
+    
+    elapsed = time.perf_counter() - started
+    destination = 'in place' if output_dir is None else f"into '{output_dir}'"
+    print(
+        f"\nLinearized {counts['linearized']} file(s) {destination}; "
+        f"{counts['skipped']} already linearized, {counts['failed']} failed"
+    )
+    print(f"Size: {bytes_before:,} -> {bytes_after:,} bytes")
+    print(f"Elapsed: {elapsed:.2f}s")
+    return counts
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description='Rewrite PDFs as linearized ("fast web view") files.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s output_pages/ --in-place
+  %(prog)s output_pages/ --in-place --workers 8
+  %(prog)s scan1.pdf scan2.pdf -o linearized/
+  %(prog)s processed/ -o linearized/ --force
+        """
+    )
+    
+    parser.add_argument(
+        'inputs',
+        nargs='+',
+        metavar='PDF_OR_DIRECTORY',
+        help='PDF files, or directories whose PDFs are all linearized'
+    )
+    
+    destination = parser.add_mutually_exclusive_group(required=True)
+    
+    destination.add_argument(
+        '-o', '--output-dir',
+        help='Write the linearized files to this directory under the same names'
+    )
+    
+    destination.add_argument(
+        '-i', '--in-place',
+        action='store_true',
+        help='Replace each input with its linearized version'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes (default: 1, serial)'
+    )
+    
+    parser.add_argument(
+        '-f', '--force',
+        action='store_true',
+        help='Rewrite files that are already linearized (default: copy or leave them as they are)'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.0.0'
+    )
+    
+    args = parser.parse_args()
+    
+    counts = linearize_pdfs(args.inputs, output_dir=args.output_dir, workers=args.workers, force=args.force)
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Page Cache
+
+This script fingerprints every page of a PDF by its content and keeps a local
+SQLite index from page fingerprints to the OCR results produced for them. When
+the same PDF is uploaded again, or a longer version with pages appended, the
+cache shows which pages already have results and prints a ``pageRange`` of the
+pages that still need OCR.
+
+A page's fingerprint is a SHA-256 over:
+
+- its decoded content stream(s), with runs of whitespace collapsed,
+- its size and rotation,
+- each named resource the content can use: image XObjects by their encoded
+  stream bytes and image parameters, form XObjects by their content and
+  resources (recursively), and fonts by their whole dictionary: embedded font
+  programs, Type 3 glyph procedures, widths, encodings and ``/ToUnicode``
+  maps included, since fonts that share a (subset) name can draw different
+  glyphs.
+
+Image streams are hashed without being decoded, and a resource shared by
+several pages (a letterhead image, a font) is hashed once per run. Pages that
+render the same from the same resources therefore get the same fingerprint
+whichever PDF they came from.
+
+The index is bounded: ``--max-entries`` and ``--max-mb`` evict the least
+recently used results after every write.
+
+Usage:
+    python page_cache.py lookup <input_pdf> [--results results.json]
+    python page_cache.py store <input_pdf> <ocr_results.json>
+    python page_cache.py stats
+    python page_cache.py evict [--max-entries N] [--max-mb M]
+
+Example:
+    python page_cache.py store batch.pdf batch-ocr.json
+    python page_cache.py lookup batch-v2.pdf
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+
+try:
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+except ImportError:
+    print("Error: pypdf library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install pypdf", file=sys.stderr)
+    sys.exit(1)
+
+from split_pdf import format_page_range, parse_page_range
+
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'documentocr',
+    'page_cache.sqlite',
+)
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MAX_MB = 512
+
+# Image parameters that change what a stream decodes to
+_IMAGE_KEYS = ('/Width', '/Height', '/BitsPerComponent', '/ColorSpace', '/Filter',
+               '/DecodeParms', '/Decode', '/ImageMask', '/SMask', '/Mask')
+_WHITESPACE = re.compile(rb'\s+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    hash       TEXT PRIMARY KEY,
+    result     BLOB NOT NULL,
+    size       INTEGER NOT NULL,
+    source     TEXT,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL,
+    hits       INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used);
+"""
+
+
+class PageHasher:
+    """
+    Fingerprint pages by content.
+    
+    Hashes of indirect objects are memoized per instance, so a resource used by
+    many pages of one document is only hashed once.
+    """
+    
+    def __init__(self):
+        self._memo = {}
+    
+    def _value(self, value, depth=0):
+        """Stable text form of a small PDF value (names, numbers, arrays, dicts)."""
+        if isinstance(value, IndirectObject):
+            return self._object(value, depth)
+        if isinstance(value, StreamObject):
+            return self._stream(value, depth)
+        if isinstance(value, ArrayObject):
+            return '[' + ' '.join(self._value(item, depth) for item in value) + ']'
+        if isinstance(value, DictionaryObject):
+            return '<<' + ' '.join(
+                f"{key} {self._value(value[key], depth)}" for key in sorted(value)
+            ) + '>>'
+        return str(value)
+    
+    def _object(self, reference, depth):
+        key = (reference.idnum, reference.generation)
+        digest = self._memo.get(key)
+        if digest is None:
+            # Reserve the slot first so reference cycles terminate
+            self._memo[key] = 'cycle'
+            digest = self._value(reference.get_object(), depth)
+            self._memo[key] = digest
+        return digest
+    
+    def _stream(self, stream, depth):
+        subtype = stream.get('/Subtype')
+        hasher = hashlib.sha256()
+        if subtype == '/Form':
+            hasher.update(b'form')
+            hasher.update(_WHITESPACE.sub(b' ', stream.get_data()).strip())
+            hasher.update(self._resources(stream.get('/Resources'), depth + 1).encode())
+            for name in ('/BBox', '/Matrix'):
+                hasher.update(self._value(stream.get(name), depth).encode())
+        else:
+            # Images (and anything else) by their encoded bytes: no decoding
+            hasher.update(b'stream')
+            for name in _IMAGE_KEYS:
+                if name in stream:
+                    hasher.update(f"{name} {self._value(stream[name], depth)}".encode())
+            hasher.update(getattr(stream, '_data', b'') or b'')
+        return hasher.hexdigest()
+    
+    def _resources(self, resources, depth):
+        if resources is None or depth > 8:
+            return ''
+        resources = resources.get_object()
+        parts = []
+        for category in ('/XObject', '/Font', '/ExtGState', '/ColorSpace', '/Pattern', '/Shading'):
+            entries = resources.get(category)
+            if entries is None:
+                continue
+            entries = entries.get_object()
+            for name in sorted(entries):
+                parts.append(f"{category}{name}={self._value(entries[name], depth)}")
+        return '\n'.join(parts)
+    
+    def page_hash(self, page):
+        """
+        Return the content fingerprint of one page.
+        
+        Args:
+            page (PageObject): Page from a ``PdfReader``
+        
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        hasher = hashlib.sha256()
+        box = page.mediabox
+        hasher.update(
+            f"{float(box.width):.2f}x{float(box.height):.2f} r{int(page.get('/Rotate', 0) or 0) % 360}\n"
+            .encode()
+        )
+        contents = page.get_contents()
+        if contents is not None:
+            hasher.update(_WHITESPACE.sub(b' ', contents.get_data()).strip())
+        hasher.update(b'\n')
+        hasher.update(self._resources(page.get('/Resources'), 0).encode())
+        return hasher.hexdigest()
+
+
+def hash_pages(input_path, page_numbers=None):
+    """
+    Fingerprint the pages of a PDF.
+    
+    Args:
+        input_path (str): Path to the PDF file
+        page_numbers (list): 1-indexed pages to hash (default: all)
+    
+    Returns:
+        list: ``(page_number, hash)`` tuples in page order
+    
+    Raises:
+        ValueError: If a page number is outside the document
+    """
+    reader = PdfReader(input_path)
+    page_count = len(reader.pages)
+    if page_numbers is None:
+        page_numbers = range(1, page_count + 1)
+    for page in page_numbers:
+        if not 1 <= page <= page_count:
+            raise ValueError(f"Page {page} is out of range: '{input_path}' has {page_count} page(s).")
+    hasher = PageHasher()
+    return [(page, hasher.page_hash(reader.pages[page - 1])) for page in page_numbers]
+
+
+class PageCache:
+    """SQLite index from page fingerprints to compressed OCR results."""
+    
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+    
+    def close(self):
+        self._db.close()
+    
+    def lookup(self, hashes, touch=True):
+        """
+        Return cached results for the given fingerprints.
+        
+        Args:
+            hashes (list): Page fingerprints
+            touch (bool): Mark hits as recently used
+        
+        Returns:
+            dict: ``{hash: result}`` for every fingerprint found
+        """
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT hash, result FROM pages WHERE hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for page_hash, blob in rows:
+                found[page_hash] = json.loads(zlib.decompress(blob))
+        if touch and found:
+            now = time.time()
+            with self._db:
+                self._db.executemany(
+                    'UPDATE pages SET last_used = ?, hits = hits + 1 WHERE hash = ?',
+                    [(now, page_hash) for page_hash in found],
+                )
+        return found
+    
+    def store(self, entries, source=None):
+        """
+        Insert or replace results, then evict down to the limits.
+        
+        Args:
+            entries (list): ``(hash, result)`` tuples; results must be JSON-serializable
+            source (str): Optional file name recorded with each entry
+        
+        Returns:
+            int: Number of entries evicted afterwards
+        """
+        now = time.time()
+        rows = []
+        for page_hash, result in entries:
+            blob = zlib.compress(json.dumps(result, separators=(',', ':')).encode('utf-8'))
+            rows.append((page_hash, blob, len(blob), source, now, now))
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO pages (hash, result, size, source, created_at, last_used) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        return self.evict()
+    
+    def evict(self):
+        """
+        Delete least recently used entries until both limits are met.
+        
+        Returns:
+            int: Number of entries deleted
+        """
+        count, total = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return 0
+        evicted = 0
+        victims = []
+        for page_hash, size in self._db.execute('SELECT hash, size FROM pages ORDER BY last_used'):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((page_hash,))
+            count -= 1
+            total -= size
+            evicted += 1
+        with self._db:
+            self._db.executemany('DELETE FROM pages WHERE hash = ?', victims)
+        return evicted
+    
+    def stats(self):
+        count, total, hits = self._db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM pages'
+        ).fetchone()
+        return {
+            'path': self.path,
+            'entries': count,
+            'bytes': total,
+            'hits': hits,
+            'maxEntries': self.max_entries,
+            'maxBytes': self.max_bytes,
+            'fileBytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+        }
+
+
+def load_ocr_results(results_path):
+    """
+    Load per-page OCR results.
+    
+    Accepts a list of ``PageOcrResult``-shaped objects
+    (``{"pageNumber": 1, "extractedData": {...}}``) or an object keyed by page
+    number (``{"1": {...}, "2": {...}}``).
+    
+    Returns:
+        dict: ``{page_number: result}``
+    """
+    with open(results_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return {int(page): result for page, result in data.items()}
+    if isinstance(data, list):
+        results = {}
+        for entry in data:
+            if not isinstance(entry, dict) or 'pageNumber' not in entry:
+                raise ValueError('List entries must have "pageNumber" and "extractedData"')
+            results[int(entry['pageNumber'])] = entry.get('extractedData', {})
+        return results
+    raise ValueError('OCR results must be a JSON object keyed by page number or a list')
+
+
+def _selected_pages(input_path, page_range):
+    if not page_range:
+        return None
+    return parse_page_range(page_range, max_page=len(PdfReader(input_path).pages))
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Cache OCR results by page content and report which pages need OCR again.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s store batch.pdf batch-ocr.json
+  %(prog)s lookup batch-v2.pdf
+  %(prog)s lookup batch-v2.pdf --results cached.json
+  %(prog)s stats
+  %(prog)s evict --max-mb 100
+        """
+    )
+    
+    parser.add_argument(
+        '--cache',
+        default=DEFAULT_CACHE_PATH,
+        help=f'Path to the SQLite index (default: {DEFAULT_CACHE_PATH})'
+    )
+    
+    parser.add_argument(
+        '--max-entries',
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f'Evict least recently used pages beyond this many entries (default: {DEFAULT_MAX_ENTRIES})'
+    )
+    
+    parser.add_argument(
+        '--max-mb',
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help=f'Evict least recently used pages beyond this many MB of results (default: {DEFAULT_MAX_MB})'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.0.0'
+    )
+    
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    lookup_parser = commands.add_parser('lookup', help='Report cache hits and the pageRange still to OCR')
+    lookup_parser.add_argument('input_pdf', help='PDF to look up')
+    lookup_parser.add_argument('-p', '--page-range', help='Only consider these pages, e.g. "1-40"')
+    lookup_parser.add_argument('--results', metavar='PATH',
+                               help='Write cached results for the hits to this JSON file')
+    lookup_parser.add_argument('--json', action='store_true',
+                               help='Print a JSON report instead of the pageRange')
+    
+    store_parser = commands.add_parser('store', help='Cache OCR results for the pages of a PDF')
+    store_parser.add_argument('input_pdf', help='PDF the results were produced from')
+    store_parser.add_argument('ocr_results', help='JSON file with per-page OCR results')
+    
+    commands.add_parser('stats', help='Show cache size and hit counts')
+    commands.add_parser('evict', help='Evict down to --max-entries/--max-mb now')
+    
+    args = parser.parse_args()
+    
+    cache = PageCache(args.cache, args.max_entries, int(args.max_mb * 1024 * 1024))
+    try:
+        if args.command == 'stats':
+            print(json.dumps(cache.stats(), indent=2))
+            return
+        if args.command == 'evict':
+            print(f"Evicted {cache.evict()} entries", file=sys.stderr)
+            print(json.dumps(cache.stats(), indent=2))
+            return
+        
+        if not os.path.isfile(args.input_pdf):
+            print(f"Error: Input file '{args.input_pdf}' does not exist.", file=sys.stderr)
+            sys.exit(1)
+        
+        started = time.perf_counter()
+        if args.command == 'store':
+            results = load_ocr_results(args.ocr_results)
+            pages = hash_pages(args.input_pdf, sorted(results))
+            evicted = cache.store(
+                [(page_hash, results[page]) for page, page_hash in pages],
+                source=os.path.basename(args.input_pdf),
+            )
+            print(
+                f"Stored {len(pages)} page result(s) from {args.input_pdf} in "
+                f"{time.perf_counter() - started:.2f}s ({evicted} evicted)",
+                file=sys.stderr,
+            )
+            return
+        
+        pages = hash_pages(args.input_pdf, _selected_pages(args.input_pdf, args.page_range))
+        found = cache.lookup([page_hash for _, page_hash in pages])
+        hits = [page for page, page_hash in pages if page_hash in found]
+        misses = [page for page, page_hash in pages if page_hash not in found]
+        elapsed = time.perf_counter() - started
+        
+        if args.results:
+            with open(args.results, 'w', encoding='utf-8') as f:
+                json.dump(
+                    [{'pageNumber': page, 'extractedData': found[page_hash]}
+                     for page, page_hash in pages if page_hash in found],
+                    f,
+                    indent=2,
+                )
+        
+        share = len(hits) / len(pages) * 100 if pages else 0.0
+        print(
+            f"Checked {len(pages)} pages in {elapsed:.2f}s: {len(hits)} cached ({share:.1f}%), "
+            f"{len(misses)} to OCR",
+            file=sys.stderr,
+        )
+        if args.json:
+            print(json.dumps({
+                'file': args.input_pdf,
+                'hits': format_page_range(hits),
+                'pageRange': format_page_range(misses),
+                'pages': [
+                    {'page': page, 'hash': page_hash, 'cached': page_hash in found}
+                    for page, page_hash in pages
+                ],
+            }, indent=2))
+        elif misses:
+            print(format_page_range(misses))
+        else:
+            # An empty pageRange means "all pages" to the API, so never emit one
+            print("Every page is cached; nothing to OCR.", file=sys.stderr)
+            sys.exit(2)
+    
+    except PdfReadError as e:
+        print(f"Error: Invalid or corrupted PDF file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Page Selection Parsing
+
+Python port of ``PageSelection`` in DocumentOcr.Common: the print-dialog style
+page selections ("1-3, 5, 7-9") used by the upload form, the queue message
+``PageRange`` and the ``--pages``/``--ranges`` options of the utilities.
+Tokens are trimmed and parsed exactly as ``PageSelection.TryParse`` does
+(``String.Trim``, then ``int.TryParse``), so a selection accepted here is
+accepted by the queue worker, and vice versa.
+
+The module only uses the standard library, so the devcontainer scripts can
+import it as well.
+"""
+
+import re
+
+
+# Whitespace C#'s String.Trim removes, as PageSelection trims tokens (unlike
+# str.strip, it keeps the \x1c-\x1f separators)
+_TRIM_CHARACTERS = (
+    '\t\n\x0b\x0c\r \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005'
+    '\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000'
+)
+# int.TryParse with NumberStyles.Integer: optional sign and ASCII digits
+_PAGE_NUMBER_PATTERN = re.compile(r'[+-]?[0-9]+\Z')
+_INT32_MIN, _INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def is_all_pages(expression):
+    """
+    Tell whether ``PageSelection.TryParse`` reads an expression as "all pages".
+    
+    Args:
+        expression (str): Selection expression, or None
+    
+    Returns:
+        bool: True for None and for empty or white-space expressions
+    """
+    return expression is None or not expression.strip(_TRIM_CHARACTERS)
+
+
+def parse_page_range(expression, max_page=None):
+    """
+    Parse a print-dialog style page selection such as ``"1-3, 5, 7-9"``.
+    
+    Mirrors ``PageSelection.TryParse`` in DocumentOcr.Common so a selection
+    accepted here is accepted by the queue worker, and vice versa.
+    
+    Args:
+        expression (str): Comma-separated page numbers and ``N-M`` ranges
+        max_page (int): Optional upper bound every page must not exceed
+    
+    Returns:
+        list: Sorted, de-duplicated, 1-indexed page numbers
+    
+    Raises:
+        ValueError: If the expression is malformed or out of bounds
+    """
+    return sorted(set(page for group in parse_page_groups(expression, max_page) for page in group))
+
+
+def format_page_range(pages):
+    """
+    Format page numbers as the shortest equivalent selection expression.
+    
+    The inverse of :func:`parse_page_range`: ``[1, 2, 3, 5, 7, 8]`` becomes
+    ``"1-3, 5, 7-8"``, using the same ``", "`` separator as the normalized
+    ``PageSelection.Expression``.
+    
+    Args:
+        pages (iterable): 1-indexed page numbers, in any order
+    
+    Returns:
+        str: Selection expression, or an empty string when ``pages`` is empty
+    """
+    tokens = []
+    run_start = previous = None
+    for page in sorted(set(pages)):
+        if previous is not None and page == previous + 1:
+            previous = page
+            continue
+        if run_start is not None:
+            tokens.append(str(run_start) if run_start == previous else f"{run_start}-{previous}")
+        run_start = previous = page
+    if run_start is not None:
+        tokens.append(str(run_start) if run_start == previous else f"{run_start}-{previous}")
+    return ", ".join(tokens)
+
+
+def normalize_page_expression(expression):
+    """
+    Return the selection expression as ``PageSelection.Expression`` stores it.
+    
+    Tokens and the parts of ``N-M`` ranges are trimmed and tokens are joined
+    with ``", "``; the user's tokens are otherwise kept as written.
+    
+    Args:
+        expression (str): A selection that :func:`parse_page_range` accepts
+    
+    Returns:
+        str: Normalized expression
+    """
+    tokens = []
+    for raw_token in expression.split(','):
+        token = raw_token.strip(_TRIM_CHARACTERS)
+        if '-' in token:
+            start_part, end_part = token.split('-', 1)
+            token = f"{start_part.strip(_TRIM_CHARACTERS)}-{end_part.strip(_TRIM_CHARACTERS)}"
+        tokens.append(token)
+    return ", ".join(tokens)
+
+
+def _parse_page_number(text):
+    """Parse a page number as ``int.TryParse`` would, or return None."""
+    if not _PAGE_NUMBER_PATTERN.match(text):
+        return None
+    value = int(text)
+    return value if _INT32_MIN <= value <= _INT32_MAX else None
+
+
+def parse_page_groups(expression, max_page=None):
+    """
+    Parse a page selection, keeping each comma-separated token as its own group.
+    
+    ``"1-3,5,7-9"`` yields ``[[1, 2, 3], [5], [7, 8, 9]]``. Tokens are parsed
+    exactly as ``PageSelection.TryParse`` parses them, except that an empty
+    expression is an error here rather than "all pages".
+    
+    Args:
+        expression (str): Comma-separated page numbers and ``N-M`` ranges
+        max_page (int): Optional upper bound every page must not exceed
+    
+    Returns:
+        list: One list of 1-indexed page numbers per token, in input order
+    
+    Raises:
+        ValueError: If the expression is malformed or out of bounds
+    """
+    if is_all_pages(expression):
+        raise ValueError("Page selection is empty.")
+    
+    groups = []
+    for raw_token in expression.split(','):
+        token = raw_token.strip(_TRIM_CHARACTERS)
+        if not token:
+            raise ValueError(f"Invalid token '{raw_token}': use page numbers or N-M ranges.")
+        
+        if '-' in token:
+            start_part, end_part = (part.strip(_TRIM_CHARACTERS) for part in token.split('-', 1))
+        else:
+            start_part = end_part = token
+        
+        start, end = _parse_page_number(start_part), _parse_page_number(end_part)
+        if start is None or end is None:
+            raise ValueError(f"Invalid token '{token}': use page numbers or N-M ranges.")
+        
+        if start < 1 or end < 1:
+            raise ValueError("Page numbers must be 1 or greater.")
+        if start > end:
+            raise ValueError(f"Range '{start}-{end}' has start greater than end.")
+        if max_page is not None and end > max_page:
+            raise ValueError(f"Page {end} exceeds document length ({max_page}).")
+        
+        groups.append(list(range(start, end + 1)))
+    return groups
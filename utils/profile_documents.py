@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Processed Document Profiler Utility
+
+This script streams a JSON or JSON Lines export of the ProcessedDocuments Cosmos
+container and reports, for each of the 13 reviewable schema fields, what the
+JSON schema alone cannot tell you:
+
+- distribution of ``ocrConfidence`` (histogram, mean, min/max and quantiles)
+- distribution of ``fieldStatus`` (Pending / Confirmed / Corrected)
+- missing and null rates for the field and its ``ocrValue``
+- estimated cardinality of ``ocrValue``
+
+Documents are parsed one at a time and accumulated in batches with NumPy, so
+memory stays flat and a multi-million document export is profiled in a single
+pass. Quantiles come from a fixed-size reservoir sample per field and the
+cardinality from a k-minimum-values sketch, both of constant size.
+
+Usage:
+    python profile_documents.py <export_file> [--format json|text]
+
+Example:
+    python profile_documents.py processed-documents.jsonl > profile.json
+    python profile_documents.py processed-documents.json --format text
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install numpy", file=sys.stderr)
+    print("Or install all requirements: pip install -r requirements.txt", file=sys.stderr)
+    sys.exit(1)
+
+from generate_json_schema import iter_json_items
+
+
+# Camel-case field names in catalog order; mirrors ProcessedDocumentSchema.FieldNames.
+FIELD_NAMES = (
+    "fileTkNumber",
+    "criminalCodeForm",
+    "policeFileNumber",
+    "agency",
+    "accusedSex",
+    "accusedName",
+    "accusedDateOfBirth",
+    "mainCharge",
+    "signedOn",
+    "judgeSignature",
+    "endorsementSignature",
+    "endorsementSignedOn",
+    "additionalCharges",
+)
+
+# SchemaFieldStatus values as serialized by Newtonsoft's StringEnumConverter.
+FIELD_STATUSES = ("Pending", "Confirmed", "Corrected")
+_STATUS_CODES = {name: index for index, name in enumerate(FIELD_STATUSES)}
+
+# ReviewStatus and IdentifierSource values.
+REVIEW_STATUSES = ("Pending", "Reviewed")
+IDENTIFIER_SOURCES = ("Extracted", "Inferred")
+
+# Documents accumulated per vectorized batch.
+DEFAULT_BATCH_SIZE = 10000
+
+# Confidence values kept per field for quantile estimation.
+DEFAULT_RESERVOIR_SIZE = 10000
+
+# Hashes kept per field by the k-minimum-values cardinality sketch.
+DISTINCT_SKETCH_SIZE = 4096
+
+# Confidence histogram bin edges (0.05 wide).
+CONFIDENCE_BINS = np.linspace(0.0, 1.0, 21)
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+_UINT64_RANGE = float(2 ** 64)
+
+
+def _stable_hash(value):
+    """Return a 64-bit hash of a JSON value that is the same in every process."""
+    text = json.dumps(value, sort_keys=True)
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _mix_hashes(values):
+    """
+    Hash values to well-distributed unsigned 64-bit integers.
+    
+    Python's ``hash`` is salted per process for strings (``PYTHONHASHSEED``),
+    so it would change the cardinality estimate from run to run; values are
+    hashed with BLAKE2b instead, by their JSON text (so ``"1"`` and ``1`` stay
+    distinct).
+    """
+    return np.fromiter((_stable_hash(value) for value in values), dtype=np.uint64, count=len(values))
+
+
+class _DistinctSketch:
+    """K-minimum-values estimator for the number of distinct values."""
+    
+    def __init__(self, size=DISTINCT_SKETCH_SIZE):
+        self.size = size
+        self.minimums = np.empty(0, dtype=np.uint64)
+    
+    def add(self, hashes):
+        """Fold a batch of 64-bit hashes into the sketch."""
+        if len(hashes):
+            merged = np.unique(np.concatenate((self.minimums, hashes)))
+            self.minimums = merged[:self.size]
+    
+    def estimate(self):
+        """Return ``(count, exact)``; exact while fewer than ``size`` values were seen."""
+        if len(self.minimums) < self.size:
+            return len(self.minimums), True
+        kth = (float(self.minimums[-1]) + 1.0) / _UINT64_RANGE
+        return int(round((self.size - 1) / kth)), False
+
+
+class _Reservoir:
+    """Uniform fixed-size sample of a stream, filled a batch at a time (Algorithm R)."""
+    
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self.values = np.empty(size, dtype=np.float64)
+        self.seen = 0
+    
+    def add(self, values):
+        """Offer a batch of values to the reservoir."""
+        if not len(values):
+            return
+        # Fill any free slots directly
+        free = max(0, min(self.size - self.seen, len(values)))
+        self.values[self.seen:self.seen + free] = values[:free]
+        rest = values[free:]
+        if len(rest):
+            # Item i of the stream replaces a random slot with probability size / (i + 1).
+            # Fancy assignment keeps the last write per slot, matching sequential order.
+            positions = np.arange(self.seen + free, self.seen + len(values))
+            slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            keep = slots < self.size
+            self.values[slots[keep]] = rest[keep]
+        self.seen += len(values)
+    
+    def sample(self):
+        """Return the sampled values."""
+        return self.values[:min(self.seen, self.size)]
+
+
+class _FieldAccumulator:
+    """Running statistics for one schema field."""
+    
+    def __init__(self, reservoir_size, rng):
+        self.documents = 0
+        self.missing = 0
+        self.null_values = 0
+        self.null_confidence = 0
+        self.confidence_count = 0
+        self.confidence_sum = 0.0
+        self.confidence_min = np.inf
+        self.confidence_max = -np.inf
+        self.histogram = np.zeros(len(CONFIDENCE_BINS) - 1, dtype=np.int64)
+        # One extra slot counts statuses outside FIELD_STATUSES
+        self.statuses = np.zeros(len(FIELD_STATUSES) + 1, dtype=np.int64)
+        self.reservoir = _Reservoir(reservoir_size, rng)
+        self.distinct = _DistinctSketch()
+    
+    def add_batch(self, entries):
+        """
+        Accumulate one batch of field entries.
+        
+        Args:
+            entries (list): The field's ``SchemaField`` dict for each document,
+                or None where the document lacks the field
+        """
+        count = len(entries)
+        self.documents += count
+        fields = [entry for entry in entries if isinstance(entry, dict)]
+        self.missing += count - len(fields)
+        if not fields:
+            return
+        
+        # Confidence: NaN marks a null/absent confidence
+        confidence = np.fromiter(
+            (_as_float(field.get("ocrConfidence")) for field in fields),
+            dtype=np.float64,
+            count=len(fields),
+        )
+        known = confidence[~np.isnan(confidence)]
+        self.null_confidence += len(confidence) - len(known)
+        if len(known):
+            self.confidence_count += len(known)
+            self.confidence_sum += float(known.sum())
+            self.confidence_min = min(self.confidence_min, float(known.min()))
+            self.confidence_max = max(self.confidence_max, float(known.max()))
+            self.histogram += np.histogram(np.clip(known, 0.0, 1.0), bins=CONFIDENCE_BINS)[0]
+            self.reservoir.add(known)
+        
+        # Status: index into FIELD_STATUSES, unknown values in the last slot
+        status_codes = np.fromiter(
+            (_STATUS_CODES.get(field.get("fieldStatus"), len(FIELD_STATUSES)) for field in fields),
+            dtype=np.int64,
+            count=len(fields),
+        )
+        self.statuses += np.bincount(status_codes, minlength=len(self.statuses))
+        
+        # Values: null rate and cardinality of non-null OCR values
+        values = [field.get("ocrValue") for field in fields]
+        non_null = [value for value in values if value is not None]
+        self.null_values += len(values) - len(non_null)
+        self.distinct.add(_mix_hashes(non_null))
+    
+    def report(self):
+        """Return the field's statistics as a JSON-ready dict."""
+        present = self.documents - self.missing
+        sample = self.reservoir.sample()
+        cardinality, exact = self.distinct.estimate()
+        confidence = {
+            "count": self.confidence_count,
+            "nullRate": _rate(self.null_confidence, present),
+        }
+        if self.confidence_count:
+            confidence.update({
+                "mean": round(self.confidence_sum / self.confidence_count, 4),
+                "min": round(self.confidence_min, 4),
+                "max": round(self.confidence_max, 4),
+                "quantiles": {
+                    f"p{int(q * 100)}": round(float(value), 4)
+                    for q, value in zip(QUANTILES, np.quantile(sample, QUANTILES))
+                },
+                "histogram": self.histogram.tolist(),
+            })
+        statuses = {name: int(self.statuses[index]) for index, name in enumerate(FIELD_STATUSES)}
+        if self.statuses[-1]:
+            statuses["Other"] = int(self.statuses[-1])
+        return {
+            "missingRate": _rate(self.missing, self.documents),
+            "ocrValueNullRate": _rate(self.null_values, present),
+            "cardinality": cardinality,
+            "cardinalityExact": exact,
+            "confidence": confidence,
+            "fieldStatus": statuses,
+        }
+
+
+def _as_float(value):
+    """Return a confidence as float, or NaN when it is null or not numeric."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.nan
+
+
+def _rate(part, whole):
+    """Return ``part / whole`` rounded for the report, or None when ``whole`` is 0."""
+    return round(part / whole, 4) if whole else None
+
+
+class DocumentProfiler:
+    """
+    Single-pass profiler for ProcessedDocuments exports.
+    
+    Feed documents with :meth:`add_documents` and read the result from
+    :meth:`report`.
+    """
+    
+    def __init__(self, reservoir_size=DEFAULT_RESERVOIR_SIZE, seed=None):
+        rng = np.random.default_rng(seed)
+        self.fields = {name: _FieldAccumulator(reservoir_size, rng) for name in FIELD_NAMES}
+        self.documents = 0
+        self.review_statuses = {}
+        self.identifier_sources = {}
+        self.page_count_sum = 0
+        self.page_count_max = 0
+    
+    def add_documents(self, documents):
+        """Accumulate a batch of documents."""
+        documents = [document for document in documents if isinstance(document, dict)]
+        self.documents += len(documents)
+        schemas = [document.get("schema") or {} for document in documents]
+        for name, accumulator in self.fields.items():
+            accumulator.add_batch([schema.get(name) for schema in schemas])
+        
+        for document in documents:
+            status = document.get("reviewStatus")
+            self.review_statuses[status] = self.review_statuses.get(status, 0) + 1
+            for entry in document.get("pageProvenance") or ():
+                source = entry.get("identifierSource") if isinstance(entry, dict) else None
+                self.identifier_sources[source] = self.identifier_sources.get(source, 0) + 1
+        
+        page_counts = np.fromiter(
+            (document.get("pageCount") or 0 for document in documents),
+            dtype=np.int64,
+            count=len(documents),
+        )
+        if len(page_counts):
+            self.page_count_sum += int(page_counts.sum())
+            self.page_count_max = max(self.page_count_max, int(page_counts.max()))
+    
+    def report(self):
+        """Return the profile as a JSON-ready dict."""
+        return {
+            "documents": self.documents,
+            "reviewStatus": {str(key): value for key, value in self.review_statuses.items()},
+            "pageCount": {
+                "mean": round(self.page_count_sum / self.documents, 2) if self.documents else None,
+                "max": self.page_count_max,
+            },
+            "identifierSource": {str(key): value for key, value in self.identifier_sources.items()},
+            "confidenceBins": [round(edge, 2) for edge in CONFIDENCE_BINS.tolist()],
+            "fields": {name: accumulator.report() for name, accumulator in self.fields.items()},
+        }
+
+
+def format_text_report(report):
+    """Render a profile as a fixed-width table for terminals."""
+    lines = [
+        f"Documents: {report['documents']:,}",
+        f"Review status: {report['reviewStatus']}",
+        f"Identifier source: {report['identifierSource']}",
+        "",
+        f"{'field':<22}{'missing':>9}{'null':>8}{'distinct':>10}"
+        f"{'conf p5':>9}{'p50':>7}{'p95':>7}{'pending':>10}{'confirmed':>11}{'corrected':>11}",
+    ]
+    for name, stats in report["fields"].items():
+        quantiles = stats["confidence"].get("quantiles", {})
+        distinct = f"{'' if stats['cardinalityExact'] else '~'}{stats['cardinality']:,}"
+        lines.append(
+            f"{name:<22}"
+            f"{_format_rate(stats['missingRate']):>9}"
+            f"{_format_rate(stats['ocrValueNullRate']):>8}"
+            f"{distinct:>10}"
+            f"{_format_number(quantiles.get('p5')):>9}"
+            f"{_format_number(quantiles.get('p50')):>7}"
+            f"{_format_number(quantiles.get('p95')):>7}"
+            f"{stats['fieldStatus']['Pending']:>10,}"
+            f"{stats['fieldStatus']['Confirmed']:>11,}"
+            f"{stats['fieldStatus']['Corrected']:>11,}"
+        )
+    return "\n".join(lines)
+
+
+def _format_rate(value):
+    return "-" if value is None else f"{value:.1%}"
+
+
+def _format_number(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def profile_file(input_path, output_format="json", batch_size=DEFAULT_BATCH_SIZE,
+                 reservoir_size=DEFAULT_RESERVOIR_SIZE, seed=None):
+    """
+    Profile a ProcessedDocuments export and print the report to stdout.
+    
+    Args:
+        input_path (str): Path to a JSON array or JSON Lines export
+        output_format (str): ``json`` or ``text``
+        batch_size (int): Documents accumulated per vectorized batch
+        reservoir_size (int): Confidence values sampled per field for quantiles
+        seed (int): Optional random seed for reproducible quantiles
+    
+    Returns:
+        dict: The profile report
+    """
+    # Validate input file
+    if not os.path.isfile(input_path):
+        print(f"Error: Input file '{input_path}' does not exist.", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        file_size = os.path.getsize(input_path)
+        print(f"Profiling export: {Path(input_path).name}", file=sys.stderr)
+        print(f"File size: {file_size:,} bytes", file=sys.stderr)
+        
+        profiler = DocumentProfiler(reservoir_size=reservoir_size, seed=seed)
+        started = time.perf_counter()
+        with open(input_path, 'r', encoding='utf-8') as file:
+            items = iter_json_items(file)
+            while True:
+                batch = list(islice(items, batch_size))
+                if not batch:
+                    break
+                profiler.add_documents(batch)
+        
+        report = profiler.report()
+        if output_format == "text":
+            print(format_text_report(report))
+        else:
+            print(json.dumps(report, indent=2))
+        
+        elapsed = time.perf_counter() - started
+        rate = profiler.documents / elapsed if elapsed > 0 else 0.0
+        print(
+            f"Profiled {profiler.documents:,} documents in {elapsed:.2f}s ({rate:,.0f} docs/sec)",
+            file=sys.stderr,
+        )
+        return report
+    
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON file: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except PermissionError as e:
+        print(f"Error: Permission denied: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except UnicodeDecodeError as e:
+        print(f"Error: File encoding issue: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error profiling export: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Profile per-field confidence, status, null rates and cardinality "
+                    "in a ProcessedDocuments export.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s processed-documents.jsonl > profile.json
+  %(prog)s processed-documents.json --format text
+  %(prog)s processed-documents.jsonl --seed 42
+
+Note: The report goes to stdout, status messages go to stderr.
+      Inputs may be a top-level JSON array or JSON Lines.
+        """
+    )
+    
+    parser.add_argument(
+        'export_file',
+        help='Path to the JSON or JSON Lines export to profile'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        choices=('json', 'text'),
+        default='json',
+        help='Report format (default: json)'
+    )
+    
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Documents per vectorized batch (default: {DEFAULT_BATCH_SIZE})'
+    )
+    
+    parser.add_argument(
+        '--reservoir-size',
+        type=int,
+        default=DEFAULT_RESERVOIR_SIZE,
+        help=f'Confidence values sampled per field for quantiles (default: {DEFAULT_RESERVOIR_SIZE})'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='Random seed for the quantile reservoirs, for reproducible reports'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.0.0'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.batch_size < 1:
+        parser.error("--batch-size must be 1 or greater")
+    if args.reservoir_size < 1:
+        parser.error("--reservoir-size must be 1 or greater")
+    
+    profile_file(
+        args.export_file,
+        output_format=args.format,
+        batch_size=args.batch_size,
+        reservoir_size=args.reservoir_size,
+        seed=args.seed,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1059 @@
+#!/usr/bin/env python3
+"""
+Aggregation and Schema-Merge Replay
+
+This script re-runs the Processor's post-OCR steps offline: grouping pages into
+documents by identifier (``DocumentAggregatorService``) and merging each
+document's page fields into the 13-field schema (``DocumentSchemaMapperService``
+and ``DateFieldParser``). Stored page OCR results can be replayed in bulk to see
+how a change to the rules would change the resulting documents.
+
+Two implementations are included:
+
+- a reference port that follows the C# services line by line, one page at a
+  time;
+- a columnar engine that holds pages as NumPy arrays (source, page number,
+  identifier, and a value and confidence per field), finds documents by
+  run-length detection over forward-filled identifiers, and merges fields with
+  grouped reductions (``np.maximum.reduceat``/``np.minimum.reduceat``).
+
+Both produce the same documents. ``--self-test`` checks them against the
+expectations of the C# unit tests and against each other on random input.
+
+Input is JSON Lines or a JSON list of page results:
+    
+    {"source": "scan.pdf", "pageNumber": 3, "extractedData": {"Fields": {...}}}
+
+``source`` names the PDF the page came from (pages are grouped per source); when
+missing, the input file name is used. Parsed pages can be saved as ``.npz``
+columns with ``--save-columns`` and replayed from there without re-parsing.
+
+Usage:
+    python replay_pipeline.py <pages.jsonl> [-o documents.jsonl] [--identifier-field NAME]
+    python replay_pipeline.py --self-test
+    python replay_pipeline.py --benchmark 1000000
+
+Example:
+    python replay_pipeline.py pages.jsonl --save-columns pages.npz
+    python replay_pipeline.py pages.npz --min-identifier-confidence 0.8
+"""
+
+import argparse
+import calendar
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: numpy library is not installed.", file=sys.stderr)
+    print("Please install it using: pip install numpy", file=sys.stderr)
+    sys.exit(1)
+
+
+# ProcessedDocumentSchema.FieldNames, in schema order
+FIELD_NAMES = (
+    'fileTkNumber',
+    'criminalCodeForm',
+    'policeFileNumber',
+    'agency',
+    'accusedSex',
+    'accusedName',
+    'accusedDateOfBirth',
+    'mainCharge',
+    'signedOn',
+    'judgeSignature',
+    'endorsementSignature',
+    'endorsementSignedOn',
+    'additionalCharges',
+)
+DATE_FIELDS = frozenset(('accusedDateOfBirth', 'signedOn', 'endorsementSignedOn'))
+SIGNATURE_FIELDS = frozenset(('judgeSignature', 'endorsementSignature'))
+MULTI_VALUE_FIELDS = frozenset(('mainCharge', 'additionalCharges'))
+SIGNATURE_TRUE_VALUES = frozenset(('signed', 'present'))
+
+# Matches the Processor's DocumentProcessing:IdentifierFieldName default
+DEFAULT_IDENTIFIER_FIELD = 'identifier'
+
+# Keys checked for a field's raw value, in DocumentSchemaMapperService order
+_RAW_VALUE_KEYS = ('valueString', 'content', 'valueDate', 'valuePhoneNumber', 'valueSignature')
+# C# sorts missing confidences as double.MinValue
+_MISSING_CONFIDENCE = -sys.float_info.max
+
+_COMPACT_DATE = re.compile(
+    r'^\s*(?P<year>\d{4})(?P<mon>JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC)(?P<day>\d{1,2})\s*$',
+    re.IGNORECASE,
+)
+_LONG_DATE = re.compile(
+    r'^\s*(?P<day>\d{1,2})\s*(?:ST|ND|RD|TH)?\s*DAY\s*OF\s*'
+    r'(?P<month>JANUARY|FEBRUARY|MARCH|APRIL|MAY|JUNE|JULY|AUGUST|SEPTEMBER|OCTOBER|NOVEMBER|DECEMBER)'
+    r'\s*,?\s*(?P<year>\d{4})\s*$',
+    re.IGNORECASE,
+)
+_SHORT_MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+_LONG_MONTHS = ('JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE', 'JULY', 'AUGUST',
+                'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER')
+
+
+def parse_date(raw):
+    """
+    Parse OCR date text the way ``DateFieldParser.TryParse`` does.
+    
+    Accepts ``1985JAN12`` and ``3rd day of January, 2026`` (any casing).
+    
+    Args:
+        raw (str): OCR text, or None
+    
+    Returns:
+        str: ISO ``yyyy-MM-dd`` date, or None when the text does not parse
+    """
+    if raw is None or not raw.strip():
+        return None
+    match = _COMPACT_DATE.match(raw)
+    if match:
+        month = _SHORT_MONTHS.index(match.group('mon').upper()) + 1
+    else:
+        match = _LONG_DATE.match(raw)
+        if not match:
+            return None
+        month = _LONG_MONTHS.index(match.group('month').upper()) + 1
+    year = int(match.group('year'))
+    day = int(match.group('day'))
+    if year < 1 or day < 1 or day > calendar.monthrange(year, month)[1]:
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _to_text(value):
+    """``object.ToString()`` for JSON values."""
+    if isinstance(value, bool):
+        return 'True' if value else 'False'
+    return value if isinstance(value, str) else str(value)
+
+
+def _is_blank(text):
+    return text is None or not text.strip()
+
+
+def _page_fields(page):
+    extracted = page.get('extractedData')
+    fields = extracted.get('Fields') if isinstance(extracted, dict) else None
+    return fields if isinstance(fields, dict) else {}
+
+
+def _raw_value(field):
+    # The first key present wins, even when its value is null
+    for key in _RAW_VALUE_KEYS:
+        if key in field:
+            value = field[key]
+            return None if value is None else _to_text(value)
+    return None
+
+
+def _confidence(field):
+    value = field.get('confidence')
+    return None if value is None else float(value)
+
+
+def extract_identifier(fields, identifier_field, min_confidence=None):
+    """
+    Return a page's identifier like ``DocumentAggregatorService.TryExtractIdentifier``.
+    
+    Args:
+        fields (dict): The page's ``Fields`` dictionary
+        identifier_field (str): Field holding the identifier
+        min_confidence (float): Ignore identifiers below this confidence (not in the C# rules)
+    
+    Returns:
+        str: The identifier, or None
+    """
+    field = fields.get(identifier_field)
+    if not isinstance(field, dict):
+        return None
+    if min_confidence is not None and (_confidence(field) or 0.0) < min_confidence:
+        return None
+    for key in ('valueString', 'content'):
+        value = field.get(key)
+        if isinstance(value, str) and not _is_blank(value):
+            return value
+    return None
+
+
+def _provenance(page_number, identifier):
+    return {
+        'pageNumber': page_number,
+        'identifierSource': 'Extracted' if identifier is not None else 'Inferred',
+        'extractedIdentifier': identifier,
+    }
+
+
+def _schema_field(value, confidence, raw_text=None):
+    field = {'ocrValue': value}
+    if raw_text is not None:
+        field['ocrRawText'] = raw_text
+    field.update({
+        'ocrConfidence': confidence,
+        'reviewedValue': None,
+        'reviewedAt': None,
+        'reviewedBy': None,
+        'fieldStatus': 'Pending',
+    })
+    return field
+
+
+# --- Reference implementation ------------------------------------------------
+
+
+def aggregate_pages(pages, identifier_field, min_identifier_confidence=None):
+    """
+    Group one PDF's pages into documents (``AggregatePagesByIdentifier``).
+    
+    Pages are taken in page-number order. A page with an identifier different
+    from the current one starts a new document; pages without one are
+    forward-filled into the current document, and pages before the first
+    identifier form a document with an empty identifier.
+    
+    Args:
+        pages (list): Page results (``pageNumber``, ``extractedData``)
+        identifier_field (str): Field holding the identifier
+        min_identifier_confidence (float): Optional identifier confidence floor
+    
+    Returns:
+        list: Documents as dicts with ``identifier``, ``pages`` and ``provenance``
+    """
+    groups = []
+    current = None
+    current_identifier = None
+    for page in sorted(pages, key=lambda p: p['pageNumber']):
+        extracted = extract_identifier(_page_fields(page), identifier_field, min_identifier_confidence)
+        if extracted is not None:
+            if current_identifier is None or extracted != current_identifier:
+                current = {'identifier': extracted, 'pages': [], 'provenance': []}
+                groups.append(current)
+                current_identifier = extracted
+        elif current is None:
+            current = {'identifier': '', 'pages': [], 'provenance': []}
+            groups.append(current)
+            current_identifier = None
+        current['pages'].append(page)
+        current['provenance'].append(_provenance(page['pageNumber'], extracted))
+    return groups
+
+
+def _highest_confidence(contributions):
+    # Stable: the earliest page wins ties
+    best = contributions[0]
+    for contribution in contributions[1:]:
+        if _confidence_key(contribution[2]) > _confidence_key(best[2]):
+            best = contribution
+    return best
+
+
+def _confidence_key(confidence):
+    return _MISSING_CONFIDENCE if confidence is None else confidence
+
+
+def merge_field(name, contributions):
+    """
+    Merge one field's ``(pageNumber, raw, confidence)`` contributions.
+    
+    Args:
+        name (str): Schema field name
+        contributions (list): Contributions in page order
+    
+    Returns:
+        dict: The ``SchemaField`` as stored in Cosmos DB
+    """
+    if not contributions:
+        return _schema_field(None, None)
+    if name in SIGNATURE_FIELDS:
+        present = any(raw is not None and raw.lower() in SIGNATURE_TRUE_VALUES for _, raw, _ in contributions)
+        confidences = [confidence for _, _, confidence in contributions if confidence is not None]
+        return _schema_field(present, min(confidences) if confidences else None)
+    if name in DATE_FIELDS:
+        _, raw, confidence = _highest_confidence(contributions)
+        return _schema_field(parse_date(raw), confidence, raw)
+    if name in MULTI_VALUE_FIELDS:
+        parts = [(raw, confidence) for _, raw, confidence in contributions if not _is_blank(raw)]
+        if not parts:
+            return _schema_field(None, None)
+        confidences = [confidence for _, confidence in parts if confidence is not None]
+        return _schema_field('\n'.join(raw for raw, _ in parts), min(confidences) if confidences else 0.0)
+    _, raw, confidence = _highest_confidence(contributions)
+    return _schema_field(raw, confidence)
+
+
+def map_document(group, document_number, original_file_name):
+    """
+    Build the consolidated document for one group (``DocumentSchemaMapperService.Map``).
+    
+    Only the fields derived from the pages are produced; ids, timestamps and
+    blob locations are left out.
+    
+    Args:
+        group (dict): A document from ``aggregate_pages``
+        document_number (int): 1-based position of the document in its PDF
+        original_file_name (str): Source PDF name
+    
+    Returns:
+        dict: ``DocumentOcrEntity``-shaped document
+    """
+    if not group['pages']:
+        raise ValueError('A document must contain at least one page.')
+    pages = sorted(group['pages'], key=lambda p: p['pageNumber'])
+    first_page = pages[0]['pageNumber']
+    identifier = group['identifier']
+    if _is_blank(identifier):
+        identifier = f"unknown-{original_file_name}-{first_page}"
+    
+    schema = {}
+    for name in FIELD_NAMES:
+        contributions = []
+        for page in pages:
+            field = _page_fields(page).get(name)
+            if not isinstance(field, dict):
+                continue
+            raw = _raw_value(field)
+            confidence = _confidence(field)
+            if raw is not None or confidence is not None:
+                contributions.append((page['pageNumber'], raw, confidence))
+        schema[name] = merge_field(name, contributions)
+    
+    return {
+        'identifier': identifier,
+        'originalFileName': original_file_name,
+        'documentNumber': document_number,
+        'pageCount': len(pages),
+        'pageNumbers': [page['pageNumber'] for page in pages],
+        'schema': schema,
+        'pageProvenance': list(group['provenance']),
+    }
+
+
+def reference_documents(records, identifier_field, min_identifier_confidence=None):
+    """
+    Replay page records with the reference implementation.
+    
+    Args:
+        records (iterable): ``(source, page)`` tuples
+        identifier_field (str): Field holding the identifier
+        min_identifier_confidence (float): Optional identifier confidence floor
+    
+    Yields:
+        dict: Documents, per source in order of first appearance
+    """
+    by_source = {}
+    for source, page in records:
+        by_source.setdefault(source, []).append(page)
+    for source in by_source:
+        groups = aggregate_pages(by_source[source], identifier_field, min_identifier_confidence)
+        for number, group in enumerate(groups, start=1):
+            yield map_document(group, number, source)
+
+
+# --- Columnar engine ---------------------------------------------------------
+
+
+class PageColumns:
+    """
+    Pages as columns.
+    
+    Strings (identifiers and field values) are interned into ``strings`` and
+    stored as int32 codes, -1 meaning null. Field arrays are field-major:
+    ``raw[f, i]`` and ``confidence[f, i]`` (NaN meaning null) for field
+    ``FIELD_NAMES[f]`` of page ``i``.
+    """
+    
+    def __init__(self, sources, source, page, identifier, identifier_confidence, raw, confidence, strings):
+        self.sources = sources
+        self.source = source
+        self.page = page
+        self.identifier = identifier
+        self.identifier_confidence = identifier_confidence
+        self.raw = raw
+        self.confidence = confidence
+        self.strings = strings
+    
+    def __len__(self):
+        return len(self.page)
+    
+    @classmethod
+    def from_records(cls, records, identifier_field):
+        """
+        Build columns from ``(source, page)`` tuples.
+        
+        Args:
+            records (iterable): ``(source, page)`` tuples
+            identifier_field (str): Field holding the identifier
+        
+        Returns:
+            PageColumns: The columns
+        """
+        codes = {}
+        strings = []
+        source_codes = {}
+        sources = []
+        
+        def intern(text):
+            if text is None:
+                return -1
+            code = codes.get(text)
+            if code is None:
+                code = codes[text] = len(strings)
+                strings.append(text)
+            return code
+        
+        source_column, page_column, identifier_column, identifier_confidence = [], [], [], []
+        raw_columns = [[] for _ in FIELD_NAMES]
+        confidence_columns = [[] for _ in FIELD_NAMES]
+        nan = math.nan
+        for source, page in records:
+            code = source_codes.get(source)
+            if code is None:
+                code = source_codes[source] = len(sources)
+                sources.append(source)
+            source_column.append(code)
+            page_column.append(page['pageNumber'])
+            fields = _page_fields(page)
+            identifier_column.append(intern(extract_identifier(fields, identifier_field)))
+            identifier_field_data = fields.get(identifier_field)
+            confidence = _confidence(identifier_field_data) if isinstance(identifier_field_data, dict) else None
+            identifier_confidence.append(nan if confidence is None else confidence)
+            for index, name in enumerate(FIELD_NAMES):
+                field = fields.get(name)
+                if isinstance(field, dict):
+                    confidence = _confidence(field)
+                    raw_columns[index].append(intern(_raw_value(field)))
+                    confidence_columns[index].append(nan if confidence is None else confidence)
+                else:
+                    raw_columns[index].append(-1)
+                    confidence_columns[index].append(nan)
+        
+        return cls(
+            sources,
+            np.array(source_column, dtype=np.int32),
+            np.array(page_column, dtype=np.int32),
+            np.array(identifier_column, dtype=np.int32),
+            np.array(identifier_confidence, dtype=np.float64),
+            np.array(raw_columns, dtype=np.int32).reshape(len(FIELD_NAMES), -1),
+            np.array(confidence_columns, dtype=np.float64).reshape(len(FIELD_NAMES), -1),
+            strings,
+        )
+    
+    def save(self, path):
+        """Write the columns to an ``.npz`` file."""
+        np.savez_compressed(
+            path,
+            sources=np.array(self.sources, dtype=str),
+            source=self.source,
+            page=self.page,
+            identifier=self.identifier,
+            identifier_confidence=self.identifier_confidence,
+            raw=self.raw,
+            confidence=self.confidence,
+            strings=np.array(self.strings, dtype=str),
+        )
+    
+    @classmethod
+    def load(cls, path):
+        """Read columns written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['sources'].tolist(),
+                data['source'],
+                data['page'],
+                data['identifier'],
+                data['identifier_confidence'],
+                data['raw'],
+                data['confidence'],
+                data['strings'].tolist(),
+            )
+
+
+def _string_table(strings, predicate):
+    """Boolean property per string code, with a trailing False so code -1 looks it up safely."""
+    table = np.zeros(len(strings) + 1, dtype=bool)
+    table[:-1] = np.fromiter((predicate(text) for text in strings), dtype=bool, count=len(strings))
+    return table
+
+
+class ReplayResult:
+    """Documents found by ``replay``, held as per-group arrays."""
+    
+    def __init__(self, columns, order, identifier, starts, merged):
+        self.columns = columns
+        self.order = order
+        # Per page, in replay order: the page's own identifier code (-1 if none)
+        self.identifier = identifier
+        self.starts = starts
+        self.ends = np.append(starts[1:], len(order)).astype(np.int64)
+        self.merged = merged
+        self.page = columns.page[order]
+        self.source = columns.source[order]
+        self._dates = {}
+    
+    def __len__(self):
+        return len(self.starts)
+    
+    def _date(self, code):
+        if code not in self._dates:
+            self._dates[code] = parse_date(self.columns.strings[code])
+        return self._dates[code]
+    
+    def _field(self, name, group):
+        strings = self.columns.strings
+        merged = self.merged[name]
+        if name in MULTI_VALUE_FIELDS:
+            lo, hi = merged['part_bounds'][group], merged['part_bounds'][group + 1]
+            if lo == hi:
+                return _schema_field(None, None)
+            codes = merged['part_codes'][lo:hi]
+            confidence = merged['confidence'][group]
+            return _schema_field('\n'.join(strings[code] for code in codes),
+                                 0.0 if math.isinf(confidence) else float(confidence))
+        if name in SIGNATURE_FIELDS:
+            if not merged['contributed'][group]:
+                return _schema_field(None, None)
+            confidence = merged['confidence'][group]
+            return _schema_field(bool(merged['present'][group]),
+                                 None if math.isinf(confidence) else float(confidence))
+        row = merged['winner'][group]
+        if row < 0:
+            return _schema_field(None, None)
+        code = merged['code'][group]
+        confidence = merged['confidence'][group]
+        confidence = None if math.isnan(confidence) else float(confidence)
+        raw = strings[code] if code >= 0 else None
+        if name in DATE_FIELDS:
+            return _schema_field(self._date(code) if code >= 0 else None, confidence, raw)
+        return _schema_field(raw, confidence)
+    
+    def documents(self):
+        """
+        Yield the documents in the same shape as ``map_document``.
+        
+        Yields:
+            dict: ``DocumentOcrEntity``-shaped document
+        """
+        strings = self.columns.strings
+        sources = self.columns.sources
+        previous_source = None
+        number = 0
+        for group, (lo, hi) in enumerate(zip(self.starts.tolist(), self.ends.tolist())):
+            source = sources[self.source[lo]]
+            number = number + 1 if source == previous_source else 1
+            previous_source = source
+            pages = self.page[lo:hi].tolist()
+            identifiers = self.identifier[lo:hi].tolist()
+            provenance = [
+                _provenance(page, strings[code] if code >= 0 else None)
+                for page, code in zip(pages, identifiers)
+            ]
+            group_identifier = next((strings[code] for code in identifiers if code >= 0), '')
+            if _is_blank(group_identifier):
+                group_identifier = f"unknown-{source}-{pages[0]}"
+            yield {
+                'identifier': group_identifier,
+                'originalFileName': source,
+                'documentNumber': number,
+                'pageCount': len(pages),
+                'pageNumbers': pages,
+                'schema': {name: self._field(name, group) for name in FIELD_NAMES},
+                'pageProvenance': provenance,
+            }
+    
+    def summary(self):
+        """Aggregate statistics, computed on the arrays."""
+        groups = len(self.starts)
+        extracted = self.identifier >= 0
+        leading_unknown = ~np.logical_or.reduceat(extracted, self.starts) if groups else np.array([], dtype=bool)
+        sizes = self.ends - self.starts
+        fields = {}
+        for name in FIELD_NAMES:
+            merged = self.merged[name]
+            confidence = merged['confidence']
+            if name in MULTI_VALUE_FIELDS:
+                populated = np.diff(merged['part_bounds']) > 0
+                confidence = np.where(populated & np.isinf(confidence), 0.0, confidence)
+            elif name in SIGNATURE_FIELDS:
+                populated = merged['contributed']
+                confidence = np.where(np.isinf(confidence), np.nan, confidence)
+            else:
+                populated = merged['code'] >= 0
+            stats = {'populated': int(populated.sum())}
+            if name in SIGNATURE_FIELDS:
+                stats['signed'] = int((merged['present'] & populated).sum())
+            if name in DATE_FIELDS:
+                stats['parsed'] = int(sum(
+                    self._date(code) is not None for code in merged['code'][populated].tolist()
+                ))
+            scored = populated & ~np.isnan(confidence)
+            stats['meanConfidence'] = round(float(confidence[scored].mean()), 4) if scored.any() else None
+            fields[name] = stats
+        return {
+            'pages': len(self.order),
+            'sources': int(len(np.unique(self.source))) if len(self.order) else 0,
+            'documents': groups,
+            'unknownIdentifierDocuments': int(leading_unknown.sum()),
+            'extractedPages': int(extracted.sum()),
+            'inferredPages': int((~extracted).sum()),
+            'pagesPerDocument': {
+                'mean': round(float(sizes.mean()), 3) if groups else 0.0,
+                'max': int(sizes.max()) if groups else 0,
+            },
+            'fields': fields,
+        }
+
+
+def replay(columns, min_identifier_confidence=None):
+    """
+    Aggregate and merge all pages with array operations.
+    
+    Pages are sorted by (source, page number). Each page without an identifier
+    takes the last identifier before it in the same source; a document starts
+    at each source boundary and wherever that forward-filled identifier
+    changes. Field merges are reductions over those contiguous segments.
+    
+    Args:
+        columns (PageColumns): Pages to replay
+        min_identifier_confidence (float): Optional identifier confidence floor
+    
+    Returns:
+        ReplayResult: Documents as arrays
+    """
+    order = np.lexsort((columns.page, columns.source))
+    count = len(order)
+    source = columns.source[order]
+    identifier = columns.identifier[order]
+    if min_identifier_confidence is not None:
+        confidence = np.nan_to_num(columns.identifier_confidence[order], nan=0.0)
+        identifier = np.where(confidence >= min_identifier_confidence, identifier, -1)
+    
+    rows = np.arange(count)
+    has_identifier = identifier >= 0
+    source_start = np.ones(count, dtype=bool)
+    source_start[1:] = source[1:] != source[:-1]
+    # Index of the last page with an identifier (or the source's first page)
+    anchor = np.maximum.accumulate(np.where(has_identifier | source_start, rows, 0)) if count else rows
+    filled = np.where(has_identifier[anchor], identifier[anchor], -1)
+    group_start = source_start.copy()
+    group_start[1:] |= filled[1:] != filled[:-1]
+    starts = np.flatnonzero(group_start)
+    group_of_row = np.cumsum(group_start) - 1
+    
+    blank = _string_table(columns.strings, _is_blank)
+    signature_true = _string_table(columns.strings, lambda text: text.lower() in SIGNATURE_TRUE_VALUES)
+    raw = columns.raw[:, order]
+    confidence = columns.confidence[:, order]
+    merged = {}
+    for index, name in enumerate(FIELD_NAMES):
+        codes = raw[index]
+        scores = confidence[index]
+        has_confidence = ~np.isnan(scores)
+        contributed = (codes >= 0) | has_confidence
+        
+        if name in MULTI_VALUE_FIELDS:
+            parts = (codes >= 0) & ~blank[codes]
+            part_rows = np.flatnonzero(parts)
+            merged[name] = {
+                'part_codes': codes[part_rows],
+                'part_bounds': np.searchsorted(part_rows, np.append(starts, count)),
+                'confidence': np.minimum.reduceat(np.where(parts & has_confidence, scores, np.inf), starts)
+                if count else scores,
+            }
+        elif name in SIGNATURE_FIELDS:
+            merged[name] = {
+                'contributed': np.logical_or.reduceat(contributed, starts) if count else contributed,
+                'present': np.logical_or.reduceat(contributed & signature_true[codes], starts)
+                if count else contributed,
+                'confidence': np.minimum.reduceat(np.where(has_confidence, scores, np.inf), starts)
+                if count else scores,
+            }
+        else:
+            key = np.where(contributed, np.where(has_confidence, scores, _MISSING_CONFIDENCE), -np.inf)
+            best = np.maximum.reduceat(key, starts) if count else key
+            candidates = np.flatnonzero(contributed & (key == best[group_of_row]))
+            # The first candidate of each group is the earliest page with the best score
+            first = np.ones(len(candidates), dtype=bool)
+            first[1:] = group_of_row[candidates[1:]] != group_of_row[candidates[:-1]]
+            winners = candidates[first]
+            winner = np.full(len(starts), -1, dtype=np.int64)
+            winner[group_of_row[winners]] = winners
+            merged[name] = {
+                'winner': winner,
+                'code': np.where(winner >= 0, codes[np.maximum(winner, 0)], -1) if count else winner,
+                'confidence': np.where(winner >= 0, scores[np.maximum(winner, 0)], np.nan)
+                if count else scores,
+            }
+    
+    return ReplayResult(columns, order, identifier, starts, merged)
+
+
+# --- Input, checks and command line ------------------------------------------
+
+
+def load_records(path):
+    """
+    Read page results from a JSON list or JSON Lines file.
+    
+    Args:
+        path (str): Input file
+    
+    Yields:
+        tuple: ``(source, page)`` pairs
+    """
+    default_source = os.path.basename(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            entries = json.load(f)
+        else:
+            entries = (json.loads(line) for line in f if line.strip())
+        for entry in entries:
+            if 'pageNumber' not in entry:
+                raise ValueError(f"Page result without pageNumber in {path}")
+            source = entry.get('source') or entry.get('blobName') or default_source
+            yield source, entry
+
+
+def _columnar_documents(records, identifier_field, min_identifier_confidence=None):
+    columns = PageColumns.from_records(records, identifier_field)
+    return list(replay(columns, min_identifier_confidence).documents())
+
+
+def _page(number, **fields):
+    return {'pageNumber': number, 'extractedData': {'Fields': fields}}
+
+
+def _value(value, confidence=None, key='valueString'):
+    field = {key: value}
+    if confidence is not None:
+        field['confidence'] = confidence
+    return field
+
+
+def _random_records(rng, pages, sources):
+    identifiers = [f"TK-{index}" for index in range(12)] + ['', '  ']
+    texts = ['Alice', 'Alyce', ' ', '', 'Charge A', 'Charge B', '1985JAN12', '3rd day of May, 2001',
+             '2026FEB30', 'signed', 'Present', 'unsigned', 'smudge']
+    records = []
+    for index in range(pages):
+        fields = {}
+        if rng.random() < 0.6:
+            key = rng.choice(('valueString', 'content'))
+            fields['fileTkNumber'] = _value(rng.choice(identifiers), rng.choice((None, 0.5, 0.9)), key)
+        for name in FIELD_NAMES[1:]:
+            roll = rng.random()
+            if roll < 0.4:
+                continue
+            if roll < 0.45:
+                fields[name] = {'confidence': rng.choice((0.3, 0.7))}
+            elif roll < 0.5:
+                fields[name] = {'valueString': None}
+            else:
+                key = 'valueSignature' if name in SIGNATURE_FIELDS else rng.choice(_RAW_VALUE_KEYS[:3])
+                fields[name] = _value(rng.choice(texts), rng.choice((None, 0.2, 0.5, 0.5, 0.8, 0.95)), key)
+        # Repeated page numbers and shuffled order exercise the stable sorts
+        records.append((f"src-{rng.randrange(sources)}.pdf", _page(rng.randint(1, pages // sources + 3), **fields)))
+    rng.shuffle(records)
+    return records
+
+
+def self_test():
+    """
+    Check both implementations against the C# unit test expectations and each other.
+    
+    Returns:
+        list: Failure messages (empty when everything passes)
+    """
+    failures = []
+    
+    def check(label, actual, expected):
+        if actual != expected:
+            failures.append(f"{label}: expected {expected!r}, got {actual!r}")
+    
+    # DateFieldParserTests
+    for raw, expected in (('1985JAN12', '1985-01-12'), ('2026MAY03', '2026-05-03'),
+                          ('  2000DEC31  ', '2000-12-31'), ('1999feb05', '1999-02-05'),
+                          ('3rd day of January, 2026', '2026-01-03'), ('1st DAY OF MARCH, 1990', '1990-03-01'),
+                          ('22ND DAY OF DECEMBER 2010', '2010-12-22'), (' 7  TH  DAY  OF  JULY ,  1976 ', '1976-07-07'),
+                          (None, None), ('', None), ('   ', None), ('not a date', None), ('2026FEB30', None),
+                          ('31st DAY OF FEBRUARY, 2026', None), ('2026XYZ12', None), ('2026-05-03', None)):
+        check(f"parse_date({raw!r})", parse_date(raw), expected)
+    
+    for engine, run in (('reference', lambda records, field: list(reference_documents(records, field))),
+                        ('columnar', _columnar_documents)):
+        def documents(pages, field='fileTkNumber'):
+            return run([('input.pdf', page) for page in pages], field)
+        
+        def tk(value):
+            return _value(value)
+        
+        # DocumentAggregatorServiceTests
+        docs = documents([_page(1, fileTkNumber=tk('TK-1')), _page(2, fileTkNumber=tk('TK-1')),
+                          _page(3, fileTkNumber=tk('TK-1'))])
+        check(f"{engine}: same identifier -> one document", len(docs), 1)
+        check(f"{engine}: same identifier provenance",
+              [p['identifierSource'] for p in docs[0]['pageProvenance']], ['Extracted'] * 3)
+        
+        docs = documents([_page(1, fileTkNumber=tk('TK-1')), _page(2), _page(3),
+                          _page(4, fileTkNumber=tk('TK-2')), _page(5)])
+        check(f"{engine}: gaps forward-filled", [(d['identifier'], d['pageNumbers']) for d in docs],
+              [('TK-1', [1, 2, 3]), ('TK-2', [4, 5])])
+        check(f"{engine}: gap provenance", [p['identifierSource'] for p in docs[0]['pageProvenance']],
+              ['Extracted', 'Inferred', 'Inferred'])
+        
+        docs = documents([_page(1), _page(2), _page(3, fileTkNumber=tk('TK-1'))])
+        check(f"{engine}: leading pages form a synthetic document",
+              [(d['identifier'], d['pageNumbers']) for d in docs],
+              [('unknown-input.pdf-1', [1, 2]), ('TK-1', [3])])
+        check(f"{engine}: leading provenance", [p['identifierSource'] for p in docs[0]['pageProvenance']],
+              ['Inferred', 'Inferred'])
+        
+        docs = documents([_page(3, fileTkNumber=tk('TK-1')), _page(1, fileTkNumber=tk('TK-1')),
+                          _page(2, fileTkNumber=tk('TK-1'))])
+        check(f"{engine}: out-of-order input sorted", [d['pageNumbers'] for d in docs], [[1, 2, 3]])
+        
+        # DocumentSchemaMapperServiceTests
+        docs = documents([_page(1, fileTkNumber=_value('TK-1', 0.99))])
+        check(f"{engine}: all 13 schema keys", list(docs[0]['schema']), list(FIELD_NAMES))
+        check(f"{engine}: fields pending", {f['fieldStatus'] for f in docs[0]['schema'].values()}, {'Pending'})
+        check(f"{engine}: initial state", (docs[0]['documentNumber'], docs[0]['pageCount'], docs[0]['pageNumbers']),
+              (1, 1, [1]))
+        
+        docs = documents([_page(1)])
+        absent = docs[0]['schema']['accusedName']
+        check(f"{engine}: absent field null", (absent['ocrValue'], absent['ocrConfidence']), (None, None))
+        signature = docs[0]['schema']['judgeSignature']
+        check(f"{engine}: absent signature null", signature['ocrValue'], None)
+        
+        docs = run([('scan.pdf', _page(7))], 'fileTkNumber')
+        check(f"{engine}: blank identifier fallback", docs[0]['identifier'], 'unknown-scan.pdf-7')
+        
+        docs = documents([_page(1, accusedName=_value('Alice', 0.60)), _page(2, accusedName=_value('Alyce', 0.95)),
+                          _page(3, accusedName=_value('Alise', 0.80))])
+        name = docs[0]['schema']['accusedName']
+        check(f"{engine}: highest confidence wins", (name['ocrValue'], name['ocrConfidence']), ('Alyce', 0.95))
+        
+        docs = documents([_page(2, mainCharge=_value('Charge B', 0.80)), _page(1, mainCharge=_value('Charge A', 0.95))])
+        charge = docs[0]['schema']['mainCharge']
+        check(f"{engine}: multi-value concatenation", (charge['ocrValue'], charge['ocrConfidence']),
+              ('Charge A\nCharge B', 0.80))
+        
+        docs = documents([_page(1, judgeSignature=_value('present', 0.90, 'valueSignature'))])
+        check(f"{engine}: signature present", docs[0]['schema']['judgeSignature']['ocrValue'], True)
+        
+        docs = documents([_page(3), _page(1), _page(2)])
+        check(f"{engine}: page numbers sorted", docs[0]['pageNumbers'], [1, 2, 3])
+        
+        # Date merge (FR-002a): parsed value plus raw text, unparseable dates keep the raw text
+        docs = documents([_page(1, signedOn=_value('1985JAN12', 0.7)), _page(2, signedOn=_value('2026FEB30', 0.9))])
+        signed_on = docs[0]['schema']['signedOn']
+        check(f"{engine}: unparseable best date", (signed_on['ocrValue'], signed_on['ocrRawText']), (None, '2026FEB30'))
+    
+    rng = random.Random(20)
+    for trial in range(20):
+        records = _random_records(rng, pages=300, sources=4)
+        floor = None if trial % 2 else 0.6
+        expected = list(reference_documents(records, 'fileTkNumber', floor))
+        actual = _columnar_documents(records, 'fileTkNumber', floor)
+        if actual != expected:
+            mismatch = next((i for i, (a, b) in enumerate(zip(actual, expected)) if a != b), min(len(actual), len(expected)))
+            failures.append(f"random trial {trial}: engines differ at document {mismatch} "
+                            f"({len(actual)} vs {len(expected)} documents)")
+    return failures
+
+
+def synthetic_columns(pages, seed=0):
+    """
+    Generate columns directly, for benchmarking.
+    
+    Sources have about 60 pages; about half the pages carry an identifier, and
+    documents run 1-8 pages.
+    
+    Args:
+        pages (int): Number of pages
+        seed (int): Random seed
+    
+    Returns:
+        PageColumns: Synthetic pages
+    """
+    rng = np.random.default_rng(seed)
+    strings = [f"TK-{index:07d}" for index in range(50000)]
+    values = ['Alice', 'SMITH, Jordan', 'Charge A', 'Charge B', '1985JAN12', '3rd day of May, 2001',
+              'signed', 'unsigned', ' ']
+    value_base = len(strings)
+    strings += values
+    source = np.sort(rng.integers(0, max(1, pages // 60), pages)).astype(np.int32)
+    page = np.arange(pages, dtype=np.int32)
+    document = np.cumsum(rng.random(pages) < 0.25)
+    identifier = (document % 50000).astype(np.int32)
+    identifier[rng.random(pages) < 0.5] = -1
+    raw = (value_base + rng.integers(0, len(values), (len(FIELD_NAMES), pages))).astype(np.int32)
+    raw[rng.random(raw.shape) < 0.3] = -1
+    confidence = rng.random(raw.shape)
+    confidence[rng.random(raw.shape) < 0.05] = np.nan
+    return PageColumns(
+        [f"batch-{index:06d}.pdf" for index in range(int(source.max()) + 1 if pages else 0)],
+        source, page, identifier, rng.random(pages), raw, confidence, strings,
+    )
+
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Replay stored page OCR results through the aggregation and schema-merge rules.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s pages.jsonl -o documents.jsonl
+  %(prog)s pages.jsonl --save-columns pages.npz
+  %(prog)s pages.npz --min-identifier-confidence 0.8
+  %(prog)s --self-test
+  %(prog)s --benchmark 1000000
+        """
+    )
+    
+    parser.add_argument(
+        'inputs',
+        nargs='*',
+        help='Page result files (.json/.jsonl) or saved columns (.npz)'
+    )
+    
+    parser.add_argument(
+        '--identifier-field',
+        default=DEFAULT_IDENTIFIER_FIELD,
+        help=f'Field holding the identifier (default: {DEFAULT_IDENTIFIER_FIELD})'
+    )
+    
+    parser.add_argument(
+        '--min-identifier-confidence',
+        type=float,
+        help='Treat identifiers below this confidence as missing (default: no floor, as in the Processor)'
+    )
+    
+    parser.add_argument(
+        '--engine',
+        choices=('columnar', 'reference'),
+        default='columnar',
+        help='Implementation to run (default: columnar)'
+    )
+    
+    parser.add_argument(
+        '-o', '--output',
+        help='Write the documents as JSON Lines to this file'
+    )
+    
+    parser.add_argument(
+        '--save-columns',
+        metavar='PATH',
+        help='Save the parsed pages as .npz columns for faster replays'
+    )
+    
+    parser.add_argument(
+        '--self-test',
+        action='store_true',
+        help='Check both implementations against the C# unit test expectations'
+    )
+    
+    parser.add_argument(
+        '--benchmark',
+        type=int,
+        metavar='PAGES',
+        help='Time the columnar engine on this many synthetic pages'
+    )
+    
+    parser.add_argument(
+        '-v', '--version',
+        action='version',
+        version='%(prog)s 1.0.0'
+    )
+    
+    args = parser.parse_args()
+    
+    if args.self_test:
+        started = time.perf_counter()
+        failures = self_test()
+        for failure in failures:
+            print(f"FAIL {failure}", file=sys.stderr)
+        print(f"Self-test {'failed' if failures else 'passed'} in {time.perf_counter() - started:.2f}s",
+              file=sys.stderr)
+        sys.exit(1 if failures else 0)
+    
+    if args.benchmark:
+        columns = synthetic_columns(args.benchmark)
+        started = time.perf_counter()
+        result = replay(columns, args.min_identifier_confidence)
+        replayed = time.perf_counter() - started
+        summary = result.summary()
+        total = time.perf_counter() - started
+        print(
+            f"Replayed {len(columns):,} pages into {len(result):,} documents in {replayed:.2f}s "
+            f"({len(columns) / replayed:,.0f} pages/s; {total:.2f}s with summary)",
+            file=sys.stderr,
+        )
+        return
+    
+    if not args.inputs:
+        parser.error('at least one input file is required (or --self-test/--benchmark)')
+    for path in args.inputs:
+        if not os.path.isfile(path):
+            print(f"Error: Input file '{path}' does not exist.", file=sys.stderr)
+            sys.exit(1)
+    if args.engine == 'reference' and any(path.endswith('.npz') for path in args.inputs):
+        parser.error('the reference engine reads page results, not .npz columns')
+    
+    def records():
+        for path in args.inputs:
+            yield from load_records(path)
+    
+    try:
+        started = time.perf_counter()
+        if args.engine == 'reference':
+            documents = reference_documents(records(), args.identifier_field, args.min_identifier_confidence)
+            summary = None
+        else:
+            if len(args.inputs) == 1 and args.inputs[0].endswith('.npz'):
+                columns = PageColumns.load(args.inputs[0])
+            else:
+                columns = PageColumns.from_records(records(), args.identifier_field)
+            loaded = time.perf_counter()
+            print(f"Loaded {len(columns):,} pages in {loaded - started:.2f}s", file=sys.stderr)
+            if args.save_columns:
+                columns.save(args.save_columns)
+                print(f"Saved columns to {args.save_columns}", file=sys.stderr)
+            result = replay(columns, args.min_identifier_confidence)
+            print(f"Replayed into {len(result):,} documents in {time.perf_counter() - loaded:.2f}s",
+                  file=sys.stderr)
+            documents = result.documents()
+            summary = result.summary()
+        
+        if args.output:
+            count = 0
+            with open(args.output, 'w', encoding='utf-8') as f:
+                for document in documents:
+                    f.write(json.dumps(document, ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+            print(f"Wrote {count:,} documents to {args.output}", file=sys.stderr)
+        if summary is not None:
+            print(json.dumps(summary, indent=2))
+        elif not args.output:
+            for document in documents:
+                print(json.dumps(document, ensure_ascii=False))
+    
+    except (json.JSONDecodeError, ValueError, KeyError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,87 +5,1162 @@ PDF Splitter Utility
 This script splits a multi-page PDF into individual single-page PDF files.
 Each page is saved as a separate PDF file in the specified output directory.
 
+Large documents can be split across several processes with ``--workers``; each
+worker opens its own reader over a contiguous page range and writes exactly the
+same files as the serial path.
+
+``--pages`` (same syntax) limits the split to some of the pages. Pages are
+looked up through the page tree one at a time and the source is read from disk
+on demand, and parsed objects are dropped after every output file, so memory
+stays flat however large the input is. In flat page trees, and the bottom level
+of balanced ones, pages outside the selection are not parsed.
+
+Instead of one file per page, ``--ranges`` (the same "1-3,5,7-9" syntax as the
+queue message ``PageRange``) or ``--groups`` (a JSON manifest) writes one PDF
+per range. Pages in a range share a single writer, so fonts and images used by
+several pages are stored once per output file.
+
+``--archive`` streams the output PDFs into a single ZIP or tar archive (``-``
+writes a tar stream to stdout) instead of a directory. Each PDF is rendered in
+memory and appended as soon as it is produced, followed by a ``manifest.json``
+listing every member's pages, byte size and SHA-256.
+
+``--optimize`` shrinks each output file before it is written: uncompressed
+content streams are Flate-compressed and identical objects are merged. With
+``--image-dpi`` and/or ``--image-quality`` scanned images are also downsampled
+and re-encoded as JPEG (only where that makes them smaller). The run reports the
+output size with and without optimization.
+
+``--linearize`` writes linearized ("fast web view") PDFs, which a viewer
+loading the file with range requests can show page 1 of before the rest has
+downloaded. pypdf cannot linearize, so this needs pikepdf or the ``qpdf``
+command-line tool (see ``linearize_pdf.py``, which also linearizes existing
+files in bulk).
+
+Directory splits are resumable. A ``.<name>.split-manifest.jsonl`` file in the
+output directory records the source's size, mtime and SHA-256 and, as each
+output file is finished, its pages, size and SHA-256. Rerunning the same split
+skips every file that is already on disk with the recorded hash, so a run that
+was killed part way picks up where it stopped; if the source PDF (or the
+``--optimize``/``--linearize`` settings) changed, every file is written again. ``--no-resume``
+always writes every file.
+
 Usage:
-    python split_pdf.py <input_pdf> [output_directory]
+    python split_pdf.py <input_pdf> [output_directory] [--workers N]
+    python split_pdf.py <input_pdf> [output_directory] --pages "900-920"
+    python split_pdf.py <input_pdf> [output_directory] --ranges "1-3,5,7-9"
+    python split_pdf.py <input_pdf> [output_directory] --groups groups.json
+    python split_pdf.py <input_pdf> --archive pages.zip
+    python split_pdf.py <input_pdf> [output_directory] --optimize [--image-dpi 150] [--image-quality 75]
+    python split_pdf.py <input_pdf> [output_directory] --linearize
 
 Example:
     python split_pdf.py document.pdf output_pages/
     python split_pdf.py document.pdf  # Uses default 'output' directory
+    python split_pdf.py document.pdf output_pages/ --workers 8
+    python split_pdf.py filing.pdf output_docs/ --ranges "1-3,4-6,7-9"
+    python split_pdf.py batch.pdf --archive - | tar -tvf -
 """
 
 import argparse
+import bisect
+import collections
+import hashlib
+import io
+import json
+import math
 import os
+import re
 import sys
+import tarfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import NamedTuple
 
 try:
-    from pypdf import PdfReader, PdfWriter
+    from pypdf import PageObject, PdfReader, PdfWriter
     from pypdf.errors import PdfReadError
+    from pypdf.generic import IndirectObject, NameObject, NumberObject
 except ImportError:
     print("Error: pypdf library is not installed.", file=sys.stderr)
     print("Please install it using: pip install pypdf", file=sys.stderr)
     sys.exit(1)
 
+try:
+    from PIL import Image
+except ImportError:  # only needed for --image-dpi/--image-quality
+    Image = None
+
+from page_selection import format_page_range, parse_page_groups, parse_page_range
+
+
+# Number of page ranges handed to each worker process. More shards than
+# workers keeps the pool busy when some pages (large scans) are slower.
+SHARDS_PER_WORKER = 4
+# Archive output is rendered in batches of this many files, and at most
+# ARCHIVE_BATCHES_AHEAD batches beyond one per worker are in flight, so the
+# rendered PDFs held in memory do not grow with the size of the split
+ARCHIVE_BATCH_FILES = 32
+ARCHIVE_BATCHES_AHEAD = 2
+
+# Page attributes a page inherits from its ancestors in the page tree
+INHERITABLE_PAGE_ATTRIBUTES = ('/Resources', '/MediaBox', '/CropBox', '/Rotate')
+# Deeper page trees are treated as malformed (and most likely cyclic)
+MAX_PAGE_TREE_DEPTH = 64
+
+# Archive formats by file suffix; a stream to stdout defaults to tar
+ARCHIVE_FORMATS = {
+    '.zip': 'zip',
+    '.tar': 'tar',
+    '.tar.gz': 'tar.gz',
+    '.tgz': 'tar.gz',
+}
+ARCHIVE_MANIFEST_NAME = 'manifest.json'
+
+# Progress log kept next to a directory split's output files
+SPLIT_MANIFEST_SUFFIX = '.split-manifest.jsonl'
+# Read size when hashing the source and existing output files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# JPEG quality for downsampled images when --image-quality is not given
+DEFAULT_IMAGE_QUALITY = 85
+# Images within this factor of the target DPI are left alone
+IMAGE_DPI_TOLERANCE = 1.05
+# Filters whose images are bilevel or otherwise better left as they are
+KEEP_IMAGE_FILTERS = ('/CCITTFaxDecode', '/JBIG2Decode', '/JPXDecode')
+
+
+class OptimizeOptions(NamedTuple):
+    """Settings for ``--optimize``; image options of None leave images untouched."""
+    image_dpi: float = None
+    image_quality: int = None
+
+
+def load_group_manifest(manifest_path, max_page=None):
+    """
+    Load a JSON manifest describing which pages belong to which output file.
+    
+    The manifest is a list (or an object with a ``groups`` list) of entries
+    with a ``pages`` selection, either a range expression or a list of page
+    numbers, and an optional ``name`` such as the document identifier::
+        
+        [
+          {"name": "12345", "pages": "1-3"},
+          {"name": "67890", "pages": [4, 5, 6]}
+        ]
+    
+    Args:
+        manifest_path (str): Path to the JSON manifest
+        max_page (int): Optional upper bound every page must not exceed
+    
+    Returns:
+        list: ``(name, pages)`` tuples; ``name`` may be None
+    
+    Raises:
+        ValueError: If the manifest is malformed or a selection is invalid
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+        data = json.load(manifest_file)
+    
+    if isinstance(data, dict):
+        data = data.get('groups')
+    if not isinstance(data, list) or not data:
+        raise ValueError("Group manifest must be a non-empty list of groups.")
+    
+    groups = []
+    for index, entry in enumerate(data, start=1):
+        if not isinstance(entry, dict) or 'pages' not in entry:
+            raise ValueError(f"Group {index} must be an object with a 'pages' entry.")
+        pages = entry['pages']
+        if isinstance(pages, list):
+            pages = ','.join(str(page) for page in pages)
+        pages = parse_page_range(str(pages), max_page)
+        name = entry.get('name')
+        groups.append((str(name) if name is not None else None, pages))
+    return groups
+
+
+class PageTree:
+    """
+    Random access to a PDF's pages without flattening its page tree.
+    
+    ``PdfReader(path)`` reads the whole file into memory, ``reader.pages``
+    builds a PageObject for every page on first use, and the reader keeps every
+    object it parses for as long as it lives. Here the file is read on demand,
+    the only thing kept per page tree node is its kids' references and page
+    counts, and a page is found by descending the tree with a binary search.
+    ``release`` drops the reader's parsed objects once an output file has been
+    written.
+    
+    A node whose ``/Count`` equals its number of kids (every node of a flat
+    tree, and the bottom level of a balanced one) is taken to hold only pages,
+    so a page's position is its index and no other kid is read: extracting
+    pages 900-920 parses those 21 pages and the nodes on the way to them. Only
+    empty intermediate nodes can make that wrong; if the kid found turns out
+    not to be a single page, the node is read in full. Other nodes read every kid's ``/Count`` and check the sum
+    against their own. Trees that cannot be walked this way (wrong ``/Count``
+    entries, direct objects in ``/Kids``) fall back to ``reader.pages``.
+    """
+    
+    def __init__(self, reader):
+        self.reader = reader
+        self._nodes = {}
+        self._fallback = False
+        try:
+            self._root = reader.trailer['/Root'].raw_get('/Pages')
+            ends = self._node(self._root)[2]
+            self._length = ends[-1] if ends else 0
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self._fallback = True
+            self._length = len(reader.pages)
+    
+    @classmethod
+    def open(cls, input_path):
+        """Open a PDF file for lazy, page-at-a-time reading."""
+        source = open(input_path, 'rb')
+        try:
+            return cls(PdfReader(source))
+        except BaseException:
+            source.close()
+            raise
+    
+    def close(self):
+        """Close the underlying file."""
+        self.reader.stream.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return self._length
+    
+    def _node(self, reference, read_kids=False):
+        """
+        Return ``(attributes, kids, ends, assumed)`` for a page tree node.
+        
+        ``attributes`` are the node's inheritable attributes, ``kids`` the
+        kids' references and ``ends`` cumulative page counts. ``assumed`` is
+        True when every kid was taken to be one page without being read;
+        ``read_kids`` reads them regardless. The summary is kept, so a node is
+        parsed once however often it is visited.
+        """
+        summary = self._nodes.get(reference.idnum)
+        if summary is None or (read_kids and summary[3]):
+            node = reference.get_object()
+            attributes = {
+                attribute: node.raw_get(attribute)
+                for attribute in INHERITABLE_PAGE_ATTRIBUTES if attribute in node
+            }
+            kids = list(node['/Kids'])
+            for kid in kids:
+                if not isinstance(kid, IndirectObject):
+                    raise TypeError(f"Direct object in /Kids of page tree node {reference.idnum}")
+            count = int(node['/Count'])
+            if count == len(kids) and not read_kids:
+                summary = (attributes, kids, range(1, count + 1), True)
+            else:
+                ends, total = [], 0
+                for kid in kids:
+                    kid_node = kid.get_object()
+                    kid_count = 1 if '/Kids' not in kid_node else int(kid_node['/Count'])
+                    if kid_count < 0:
+                        raise ValueError(f"Negative /Count in page tree node {kid.idnum}")
+                    total += kid_count
+                    ends.append(total)
+                if count != total:
+                    raise ValueError(f"/Count of page tree node {reference.idnum} does not match its kids")
+                summary = (attributes, kids, ends, False)
+            self._nodes[reference.idnum] = summary
+        return summary
+    
+    def _locate(self, index):
+        reference = self._root
+        inherited = {}
+        for _ in range(MAX_PAGE_TREE_DEPTH):
+            attributes, kids, ends, assumed = self._node(reference)
+            position = bisect.bisect_right(ends, index)
+            kid = kids[position]
+            kid_node = kid.get_object()
+            if assumed and '/Kids' in kid_node and int(kid_node['/Count']) != 1:
+                # Not every kid is a single page after all
+                attributes, kids, ends, assumed = self._node(reference, read_kids=True)
+                position = bisect.bisect_right(ends, index)
+                kid = kids[position]
+                kid_node = kid.get_object()
+            inherited.update(attributes)
+            index -= ends[position - 1] if position else 0
+            if '/Kids' not in kid_node:
+                page = PageObject(self.reader, kid)
+                page.update(kid_node)
+                for attribute, value in inherited.items():
+                    if attribute not in page:
+                        page[NameObject(attribute)] = value
+                return page
+            reference = kid
+        raise ValueError("Page tree is too deep")
+    
+    def __getitem__(self, index):
+        """Return the page at a 0-based index."""
+        if not 0 <= index < self._length:
+            raise IndexError(f"Page index {index} out of range")
+        if not self._fallback:
+            try:
+                return self._locate(index)
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+                self._fallback = True
+                self._nodes.clear()
+                if len(self.reader.pages) != self._length:
+                    raise PdfReadError("Page tree /Count entries do not match the number of pages") from None
+        return self.reader.pages[index]
+    
+    def release(self):
+        """Drop every object the reader has parsed so far."""
+        self.reader.resolved_objects.clear()
+
+
+def _file_sha256(path):
+    """Return the hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SplitManifest:
+    """
+    Progress log that makes directory splits resumable.
+    
+    The log is JSON Lines: a header record with the source's name, size,
+    mtime, SHA-256 and the optimize settings, then one record per finished
+    output file with its pages, size and SHA-256 (the same entry format as the
+    archive ``manifest.json``). Records are appended and flushed as files are
+    written, so a killed run leaves a usable log; a torn last line is ignored.
+    
+    The source is only hashed again when its size or mtime changed. If its
+    hash or the settings differ from the header, the log is started over.
+    """
+    
+    def __init__(self, output_dir, input_path, settings):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, f".{Path(input_path).stem}{SPLIT_MANIFEST_SUFFIX}")
+        self.entries = {}
+        # Why an existing log was discarded: None, 'source' or 'settings'
+        self.changed = None
+        
+        previous, entries, torn = self._load()
+        stat = os.stat(input_path)
+        self.header = {
+            'source': os.path.basename(input_path),
+            'size': stat.st_size,
+            'mtimeNs': stat.st_mtime_ns,
+            'sha256': None,
+            'settings': settings,
+        }
+        if (previous is not None and previous.get('size') == stat.st_size
+                and previous.get('mtimeNs') == stat.st_mtime_ns):
+            self.header['sha256'] = previous.get('sha256')
+        else:
+            self.header['sha256'] = _file_sha256(input_path)
+        
+        if previous is not None:
+            if previous.get('sha256') != self.header['sha256']:
+                self.changed = 'source'
+            elif previous.get('settings') != settings:
+                self.changed = 'settings'
+        
+        if previous is not None and self.changed is None:
+            self.entries = entries
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if torn:
+                self._file.write('\n')
+            if previous != self.header:
+                # Same contents under a new mtime
+                self._append(self.header)
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._append(self.header)
+    
+    def _load(self):
+        """Return ``(header, entries, torn)`` from an existing log."""
+        header, entries, torn = None, {}, False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    torn = not line.endswith('\n')
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted run
+                        continue
+                    if not isinstance(record, dict):
+                        continue
+                    if 'source' in record:
+                        header = record
+                    elif 'name' in record:
+                        entries[record['name']] = record
+        except FileNotFoundError:
+            pass
+        return header, entries, torn
+    
+    def _append(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.flush()
+    
+    def is_done(self, name, page_nums):
+        """
+        Check whether an output file was finished by an earlier run.
+        
+        Args:
+            name (str): Output file name
+            page_nums (list): 0-based indexes of the pages it should hold
+        
+        Returns:
+            bool: True if the file is recorded with the same pages and still
+            has the recorded size and SHA-256
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry.get('pageNumbers') != [page_num + 1 for page_num in page_nums]:
+            return False
+        path = os.path.join(self.output_dir, name)
+        try:
+            return os.path.getsize(path) == entry.get('size') and _file_sha256(path) == entry.get('sha256')
+        except OSError:
+            return False
+    
+    def record(self, name, page_nums, size, sha256):
+        """Record a finished output file."""
+        entry = {
+            'name': name,
+            'pageNumbers': [page_num + 1 for page_num in page_nums],
+            'size': size,
+            'sha256': sha256,
+        }
+        self.entries[name] = entry
+        self._append(entry)
+    
+    def close(self):
+        """Flush the log to disk and close it."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+def _page_filename(base_filename, page_num):
+    """Return the output filename for a 0-based page index."""
+    return f"{base_filename}_page_{page_num + 1:04d}.pdf"
+
+
+def _group_filename(base_filename, pages, name=None):
+    """
+    Return the output filename for a group of 1-indexed pages.
+    
+    Named groups use the (sanitized) name; unnamed groups are named after the
+    page span, and single-page groups keep the per-page naming scheme.
+    """
+    if name:
+        safe_name = re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('._') or 'group'
+        return f"{base_filename}_{safe_name}.pdf"
+    if len(pages) == 1:
+        return _page_filename(base_filename, pages[0] - 1)
+    return f"{base_filename}_pages_{pages[0]:04d}-{pages[-1]:04d}.pdf"
+
+
+def _write_pages(source, page_nums, output_path, optimize=None, linearize=False):
+    """
+    Write one or more pages of an open PDF into a single file.
+    
+    All pages go through one PdfWriter, so objects they share in the source
+    (fonts, images, ICC profiles) are written once rather than per page. The
+    source's parsed objects are released afterwards.
+    
+    Args:
+        source (PageTree): Pages of the source PDF
+        page_nums (list): 0-based indexes of the pages to extract, in order
+        output_path (str): Path of the PDF file to write
+        optimize (OptimizeOptions): Optional optimization settings
+        linearize (bool): Write a linearized PDF
+    
+    Returns:
+        tuple: ``(unoptimized_size, written_size, sha256)``; sizes in bytes
+    """
+    if optimize is not None or linearize:
+        data, unoptimized_size = _render_pages(source, page_nums, optimize, linearize)
+        with open(output_path, 'wb') as output_file:
+            output_file.write(data)
+        return unoptimized_size, len(data), hashlib.sha256(data).hexdigest()
+    
+    # Create a new PDF writer for this output
+    writer = PdfWriter()
+    
+    # Add the pages to the writer
+    for page_num in page_nums:
+        writer.add_page(source[page_num])
+    
+    # Write the pages to a new PDF file
+    with open(output_path, 'wb') as output_file:
+        writer.write(output_file)
+        size = output_file.tell()
+    source.release()
+    return size, size, _file_sha256(output_path)
+
+
+def _multiply(m, ctm):
+    """Concatenate a ``cm`` matrix onto the current transformation matrix."""
+    a, b, c, d, e, f = m
+    return [
+        a * ctm[0] + b * ctm[2],
+        a * ctm[1] + b * ctm[3],
+        c * ctm[0] + d * ctm[2],
+        c * ctm[1] + d * ctm[3],
+        e * ctm[0] + f * ctm[2] + ctm[4],
+        e * ctm[1] + f * ctm[3] + ctm[5],
+    ]
+
+
+def _image_display_sizes(page):
+    """
+    Return the largest size, in points, at which each XObject is drawn on a page.
+    
+    Follows ``q``/``Q``/``cm`` in the page's content stream up to each ``Do``.
+    
+    Args:
+        page (PageObject): Page to inspect
+    
+    Returns:
+        dict: XObject name -> ``(width, height)`` in points
+    """
+    sizes = {}
+    contents = page.get_contents()
+    if contents is None:
+        return sizes
+    ctm = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+    stack = []
+    for operands, operator in contents.operations:
+        if operator == b'q':
+            stack.append(ctm)
+        elif operator == b'Q':
+            ctm = stack.pop() if stack else ctm
+        elif operator == b'cm' and len(operands) == 6:
+            ctm = _multiply([float(value) for value in operands], ctm)
+        elif operator == b'Do' and operands:
+            width, height = math.hypot(ctm[0], ctm[1]), math.hypot(ctm[2], ctm[3])
+            previous = sizes.get(operands[0], (0.0, 0.0))
+            sizes[operands[0]] = (max(previous[0], width), max(previous[1], height))
+    return sizes
+
+
+def _recompress_images(page, options, seen):
+    """
+    Downsample and re-encode a page's image XObjects in place.
+    
+    Only 8-bit grey and RGB images without masks are touched; bilevel scans
+    (CCITT/JBIG2) and JPEG 2000 keep their encoding. An image is downsampled
+    when its effective resolution exceeds ``options.image_dpi``, and re-encoded
+    as JPEG when it is downsampled or ``options.image_quality`` is set. The new
+    encoding is kept only when it is smaller than the original.
+    
+    Args:
+        page (PageObject): Page in a PdfWriter
+        options (OptimizeOptions): Image settings
+        seen (set): Object numbers already processed (images shared by pages)
+    """
+    resources = page.get('/Resources')
+    xobjects = resources.get_object().get('/XObject') if resources is not None else None
+    if not xobjects:
+        return
+    sizes = None
+    for name, reference in xobjects.get_object().items():
+        image = reference.get_object()
+        if image.get('/Subtype') != '/Image':
+            continue
+        if isinstance(reference, IndirectObject):
+            if reference.idnum in seen:
+                continue
+            seen.add(reference.idnum)
+        if (image.get('/ImageMask') or '/SMask' in image or '/Mask' in image or '/Decode' in image
+                or image.get('/BitsPerComponent', 8) != 8):
+            continue
+        filters = image.get('/Filter')
+        filters = [] if filters is None else [filters] if isinstance(filters, str) else list(filters)
+        if any(image_filter in KEEP_IMAGE_FILTERS for image_filter in filters):
+            continue
+        
+        width, height = int(image['/Width']), int(image['/Height'])
+        scale = 1.0
+        if options.image_dpi:
+            if sizes is None:
+                sizes = _image_display_sizes(page)
+            # Images drawn from forms or inline fall back to the full page size
+            shown = sizes.get(name) or (float(page.mediabox.width), float(page.mediabox.height))
+            if shown[0] > 0 and shown[1] > 0:
+                dpi = max(width * 72.0 / shown[0], height * 72.0 / shown[1])
+                if dpi > options.image_dpi * IMAGE_DPI_TOLERANCE:
+                    scale = options.image_dpi / dpi
+        if scale == 1.0 and options.image_quality is None:
+            continue
+        
+        try:
+            picture = image.decode_as_image()
+        except Exception:
+            continue
+        if picture is None or picture.mode not in ('L', 'RGB'):
+            continue
+        if scale < 1.0:
+            picture = picture.resize(
+                (max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS
+            )
+        buffer = io.BytesIO()
+        picture.save(buffer, 'JPEG', quality=options.image_quality or DEFAULT_IMAGE_QUALITY, optimize=True)
+        data = buffer.getvalue()
+        if len(data) >= len(image._data):
+            continue
+        
+        # Colour space is left as is: the JPEG has the same number of components
+        image._data = data
+        image[NameObject('/Filter')] = NameObject('/DCTDecode')
+        image[NameObject('/Width')] = NumberObject(picture.width)
+        image[NameObject('/Height')] = NumberObject(picture.height)
+        image.pop('/DecodeParms', None)
+
+
+def _optimize_writer(writer, options):
+    """
+    Shrink a PdfWriter's contents before it is written.
+    
+    Args:
+        writer (PdfWriter): Writer holding the extracted pages
+        options (OptimizeOptions): Optimization settings
+    """
+    seen = set()
+    for page in writer.pages:
+        if options.image_dpi or options.image_quality is not None:
+            _recompress_images(page, options, seen)
+        contents = page.get('/Contents')
+        if contents is None:
+            continue
+        contents = contents.get_object()
+        streams = [item.get_object() for item in contents] if isinstance(contents, list) else [contents]
+        if any('/Filter' not in stream for stream in streams):
+            # Tiny streams (a scan's "q ... cm /Im0 Do Q") grow once the
+            # /Filter entry is counted
+            stored = sum(len(stream._data) for stream in streams)
+            if len(zlib.compress(page.get_contents().get_data())) + len(b'/Filter /FlateDecode\n') < stored:
+                page.compress_content_streams()
+    # Merges fonts, ICC profiles and images repeated within this output file
+    # (pypdf 4.0 and later)
+    if hasattr(writer, 'compress_identical_objects'):
+        writer.compress_identical_objects()
+
 
-def split_pdf(input_path, output_dir):
+def _render_pages(source, page_nums, optimize=None, linearize=False):
     """
-    Split a PDF file into individual pages.
+    Render one or more pages of an open PDF into an in-memory PDF.
+    
+    The source's parsed objects are released afterwards.
+    
+    Args:
+        source (PageTree): Pages of the source PDF
+        page_nums (list): 0-based indexes of the pages to extract, in order
+        optimize (OptimizeOptions): Optional optimization settings
+        linearize (bool): Linearize the rendered PDF
+    
+    Returns:
+        tuple: ``(data, unoptimized_size)``; the size equals ``len(data)``
+        when neither optimizing nor linearizing
+    """
+    writer = PdfWriter()
+    for page_num in page_nums:
+        writer.add_page(source[page_num])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    unoptimized_size = buffer.tell()
+    if optimize is not None:
+        _optimize_writer(writer, optimize)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+    source.release()
+    data = buffer.getvalue()
+    if linearize:
+        from linearize_pdf import linearize_bytes
+        data = linearize_bytes(data)
+    return data, unoptimized_size
+
+
+def archive_format_for(path, archive_format=None):
+    """
+    Work out the archive format for an ``--archive`` target.
+    
+    Args:
+        path (str): Archive path, or ``-`` for stdout
+        archive_format (str): Explicit format (``zip``, ``tar`` or ``tar.gz``)
+    
+    Returns:
+        str: The archive format
+    
+    Raises:
+        ValueError: If the format cannot be told from the file name
+    """
+    if archive_format:
+        return archive_format
+    if path == '-':
+        return 'tar'
+    name = path.lower()
+    for suffix in sorted(ARCHIVE_FORMATS, key=len, reverse=True):
+        if name.endswith(suffix):
+            return ARCHIVE_FORMATS[suffix]
+    raise ValueError(
+        f"Cannot tell the archive format of '{path}'; use a .zip, .tar, .tar.gz or .tgz name "
+        "or pass --archive-format."
+    )
+
+
+class PageArchive:
+    """
+    Single-archive output for split PDFs.
+    
+    Members are written straight to the archive (or stdout) as they are added,
+    so nothing is staged on disk and the archive never needs seeking; tar
+    output to a pipe is written in stream mode. ``close`` appends a
+    ``manifest.json`` describing every member. A file target is written under a
+    ``.partial`` name and renamed on success, so a failed split never leaves a
+    truncated archive behind.
+    """
+    
+    def __init__(self, path, archive_format, source_name):
+        self.path = path
+        self.format = archive_format
+        self.source_name = source_name
+        self.entries = []
+        self._started = time.time()
+        if path == '-':
+            self._file = sys.stdout.buffer
+            self._partial_path = None
+        else:
+            self._partial_path = f"{path}.partial"
+            self._file = open(self._partial_path, 'wb')
+        if archive_format == 'zip':
+            # PDF streams are already compressed; storing them keeps writes cheap
+            self._zip = zipfile.ZipFile(self._file, 'w', compression=zipfile.ZIP_STORED)
+            self._tar = None
+        else:
+            mode = 'w|gz' if archive_format == 'tar.gz' else 'w|'
+            self._tar = tarfile.open(fileobj=self._file, mode=mode, format=tarfile.PAX_FORMAT)
+            self._zip = None
+    
+    def _write_member(self, name, data):
+        if self._zip is not None:
+            info = zipfile.ZipInfo(name, date_time=time.localtime(self._started)[:6])
+            info.external_attr = 0o644 << 16
+            self._zip.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(self._started)
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+    
+    def add(self, name, page_nums, data):
+        """
+        Append one output PDF.
+        
+        Args:
+            name (str): Member name
+            page_nums (list): 0-based indexes of the pages it holds
+            data (bytes): PDF file contents
+        """
+        self._write_member(name, data)
+        self.entries.append({
+            'name': name,
+            'pageNumbers': [page_num + 1 for page_num in page_nums],
+            'size': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+        })
+    
+    def close(self):
+        """Write the manifest, finish the archive and move it into place."""
+        manifest = {
+            'source': self.source_name,
+            'files': len(self.entries),
+            'pages': sum(len(entry['pageNumbers']) for entry in self.entries),
+            'bytes': sum(entry['size'] for entry in self.entries),
+            'entries': self.entries,
+        }
+        self._write_member(ARCHIVE_MANIFEST_NAME, json.dumps(manifest, indent=2).encode('utf-8'))
+        (self._zip or self._tar).close()
+        self._file.flush()
+        if self._partial_path is not None:
+            self._file.close()
+            os.replace(self._partial_path, self.path)
+    
+    def abort(self):
+        """Discard a partially written archive file."""
+        if self._partial_path is None:
+            return
+        try:
+            self._file.close()
+            os.remove(self._partial_path)
+        except OSError:
+            pass
+
+
+# (input_path, PageTree) kept open by an archive worker process between batches
+_worker_source = None
+
+
+def _render_jobs(input_path, jobs, optimize=None, linearize=False):
+    """
+    Worker entry point for archive output: render a batch of output files.
+    
+    Archive batches are small, so each worker process opens the source once
+    and keeps it for the batches that follow.
+    
+    Args:
+        input_path (str): Path to the input PDF file
+        jobs (list): ``(output_filename, page_nums)`` tuples to render
+        optimize (OptimizeOptions): Optional optimization settings
+        linearize (bool): Linearize each PDF
+    
+    Returns:
+        list: ``(output_filename, page_nums, data, unoptimized_size)`` tuples,
+        in job order
+    """
+    global _worker_source
+    if _worker_source is None or _worker_source[0] != input_path:
+        if _worker_source is not None:
+            _worker_source[1].close()
+        _worker_source = (input_path, PageTree.open(input_path))
+    source = _worker_source[1]
+    return [
+        (output_filename, page_nums) + _render_pages(source, page_nums, optimize, linearize)
+        for output_filename, page_nums in jobs
+    ]
+
+
+def _split_jobs(input_path, output_dir, jobs, optimize=None, linearize=False):
+    """
+    Worker entry point: write a batch of output files from one PDF.
+    
+    Each worker opens its own reader so no parsed state is shared between
+    processes.
     
     Args:
         input_path (str): Path to the input PDF file
-        output_dir (str): Directory where individual page PDFs will be saved
+        output_dir (str): Directory where the output PDFs will be saved
+        jobs (list): ``(output_filename, page_nums)`` tuples to write
+        optimize (OptimizeOptions): Optional optimization settings
+        linearize (bool): Write linearized PDFs
+    
+    Returns:
+        list: ``(output_filename, page_nums, unoptimized_size, written_size,
+        sha256)`` tuples, in job order
+    """
+    with PageTree.open(input_path) as source:
+        return [
+            (output_filename, page_nums)
+            + _write_pages(source, page_nums, os.path.join(output_dir, output_filename), optimize, linearize)
+            for output_filename, page_nums in jobs
+        ]
+
+
+def _shard_jobs(jobs, workers):
+    """
+    Divide ``jobs`` into contiguous batches for the worker pool.
+    
+    Args:
+        jobs (list): ``(output_filename, page_nums)`` tuples
+        workers (int): Number of worker processes
     
     Returns:
-        int: Number of pages extracted
+        list: List of job batches covering every job once
+    """
+    shard_count = min(len(jobs), workers * SHARDS_PER_WORKER)
+    if shard_count == 0:
+        return []
+    size, remainder = divmod(len(jobs), shard_count)
+    shards = []
+    start = 0
+    for index in range(shard_count):
+        stop = start + size + (1 if index < remainder else 0)
+        shards.append(jobs[start:stop])
+        start = stop
+    return shards
+
+
+def split_pdf(input_path, output_dir, workers=1, ranges=None, groups_path=None,
+              archive=None, archive_format=None, optimize=None, pages=None, resume=True,
+              linearize=False):
+    """
+    Split a PDF file into individual pages, or into one file per page range.
+    
+    Args:
+        input_path (str): Path to the input PDF file
+        output_dir (str): Directory where the output PDFs will be saved
+        workers (int): Number of worker processes (1 splits serially in-process)
+        ranges (str): Optional range expression; each comma-separated token
+            (e.g. ``"1-3"``) becomes one output file
+        groups_path (str): Optional JSON manifest of named page groups
+        archive (str): Optional archive to write instead of ``output_dir``
+            (``-`` streams to stdout)
+        archive_format (str): ``zip``, ``tar`` or ``tar.gz``; by default taken
+            from the ``archive`` file name
+        optimize (OptimizeOptions): Optional size optimization settings
+        pages (str): Optional page selection (``"900-920"``); only these
+            pages are split, one file each
+        resume (bool): Skip output files an earlier run already wrote and
+            verified, and keep the split manifest (directory output only);
+            False writes every file and no manifest
+        linearize (bool): Write linearized ("fast web view") PDFs
+    
+    Returns:
+        int: Number of pages extracted, including those in files that were
+        already up to date
     """
     # Validate input file
     if not os.path.isfile(input_path):
         print(f"Error: Input file '{input_path}' does not exist.", file=sys.stderr)
         sys.exit(1)
     
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    if workers < 1:
+        print("Error: --workers must be 1 or greater.", file=sys.stderr)
+        sys.exit(1)
+    
+    if optimize is not None and (optimize.image_dpi or optimize.image_quality is not None):
+        if Image is None:
+            print("Error: Pillow library is required for --image-dpi and --image-quality.", file=sys.stderr)
+            print("Please install it using: pip install Pillow", file=sys.stderr)
+            sys.exit(1)
+        if optimize.image_dpi is not None and optimize.image_dpi <= 0:
+            print("Error: --image-dpi must be greater than 0.", file=sys.stderr)
+            sys.exit(1)
+        if optimize.image_quality is not None and not 1 <= optimize.image_quality <= 95:
+            print("Error: --image-quality must be between 1 and 95.", file=sys.stderr)
+            sys.exit(1)
+    
+    linearize_with = None
+    if linearize:
+        # Imported here so that splits without --linearize never load pikepdf
+        from linearize_pdf import linearize_backend
+        linearize_with = linearize_backend()
+        if linearize_with is None:
+            print("Error: --linearize needs pikepdf or the qpdf command-line tool.", file=sys.stderr)
+            print("Please install it using: pip install pikepdf", file=sys.stderr)
+            sys.exit(1)
+    
+    # Progress goes to stderr when the archive itself is written to stdout
+    log = sys.stderr if archive == '-' else sys.stdout
+    
+    if archive:
+        try:
+            archive_format = archive_format_for(archive, archive_format)
+        except ValueError as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        if archive == '-' and sys.stdout.isatty():
+            print("Error: Refusing to write an archive to a terminal; redirect stdout.", file=sys.stderr)
+            sys.exit(1)
+    else:
+        # Create output directory if it doesn't exist
+        os.makedirs(output_dir, exist_ok=True)
     
     # Get base filename without extension
     base_filename = Path(input_path).stem
+    page_archive = None
+    manifest = None
+    source = None
     
     try:
-        # Read the PDF
-        print(f"Reading PDF: {input_path}")
-        reader = PdfReader(input_path)
-        total_pages = len(reader.pages)
-        print(f"Total pages: {total_pages}")
-        
-        # Extract each page
-        for page_num in range(total_pages):
-            # Create a new PDF writer for this page
-            writer = PdfWriter()
-            
-            # Add the page to the writer
-            writer.add_page(reader.pages[page_num])
-            
-            # Generate output filename with zero-padded page number
-            output_filename = f"{base_filename}_page_{page_num + 1:04d}.pdf"
-            output_path = os.path.join(output_dir, output_filename)
-            
-            # Write the page to a new PDF file
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            print(f"  Extracted page {page_num + 1}/{total_pages} -> {output_filename}")
-        
-        print(f"\nSuccessfully split {total_pages} pages into '{output_dir}'")
-        return total_pages
+        # Open the PDF; pages are read from disk as they are written
+        print(f"Reading PDF: {input_path}", file=log)
+        source = PageTree.open(input_path)
+        total_pages = len(source)
+        print(f"Total pages: {total_pages}", file=log)
         
+        # Build the list of output files and the pages that go into each
+        if groups_path:
+            groups = load_group_manifest(groups_path, max_page=total_pages)
+        elif ranges:
+            groups = [(None, pages) for pages in parse_page_groups(ranges, max_page=total_pages)]
+        else:
+            groups = None
+        
+        if groups is None:
+            if pages:
+                page_nums = [page - 1 for page in parse_page_range(pages, max_page=total_pages)]
+                print(f"Selected pages: {format_page_range(page + 1 for page in page_nums)}", file=log)
+            else:
+                page_nums = range(total_pages)
+            jobs = [
+                (_page_filename(base_filename, page_num), [page_num])
+                for page_num in page_nums
+            ]
+        else:
+            jobs = [
+                (_group_filename(base_filename, pages, name), [page - 1 for page in pages])
+                for name, pages in groups
+            ]
+            seen = set()
+            for output_filename, _ in jobs:
+                if output_filename in seen:
+                    raise ValueError(f"More than one group writes '{output_filename}'.")
+                seen.add(output_filename)
+            print(f"Output files: {len(jobs)}", file=log)
+        page_count = sum(len(page_nums) for _, page_nums in jobs)
+        unoptimized_bytes = written_bytes = 0
+        
+        started = time.perf_counter()
+        
+        if archive:
+            page_archive = PageArchive(archive, archive_format, os.path.basename(input_path))
+            pending = jobs
+        elif not resume:
+            pending = jobs
+        else:
+            settings = {
+                'optimize': None if optimize is None else {
+                    'imageDpi': optimize.image_dpi,
+                    'imageQuality': optimize.image_quality,
+                },
+                'linearize': linearize,
+            }
+            manifest = SplitManifest(output_dir, input_path, settings)
+            if manifest.changed == 'source':
+                print("Source PDF changed since the last run; writing every file again", file=log)
+            elif manifest.changed == 'settings':
+                print("Output settings changed since the last run; writing every file again", file=log)
+            pending = [job for job in jobs if not manifest.is_done(*job)]
+            if len(pending) < len(jobs):
+                print(
+                    f"Resuming: {len(jobs) - len(pending)} of {len(jobs)} file(s) already written and verified",
+                    file=log,
+                )
+        pending_pages = sum(len(page_nums) for _, page_nums in pending)
+        
+        if workers == 1:
+            # Extract each page (or page group)
+            for index, (output_filename, page_nums) in enumerate(pending, start=1):
+                if page_archive is not None:
+                    data, unoptimized_size = _render_pages(source, page_nums, optimize, linearize)
+                    page_archive.add(output_filename, page_nums, data)
+                    sizes = unoptimized_size, len(data)
+                else:
+                    sizes = _write_pages(
+                        source, page_nums, os.path.join(output_dir, output_filename), optimize, linearize
+                    )
+                    if manifest is not None:
+                        manifest.record(output_filename, page_nums, sizes[1], sizes[2])
+                unoptimized_bytes += sizes[0]
+                written_bytes += sizes[1]
+                if groups is None:
+                    print(f"  Extracted page {page_nums[0] + 1}/{total_pages} -> {output_filename}", file=log)
+                else:
+                    print(
+                        f"  Extracted {len(page_nums)} page(s) ({index}/{len(pending)}) -> {output_filename}",
+                        file=log,
+                    )
+        elif page_archive is not None:
+            # Workers render in parallel; batches are appended in job order so the
+            # archive is the same as a serial run's
+            source.close()
+            batches = [jobs[start:start + ARCHIVE_BATCH_FILES] for start in range(0, len(jobs), ARCHIVE_BATCH_FILES)]
+            print(f"Splitting with {workers} workers across {len(batches)} batches", file=log)
+            in_flight = collections.deque()
+            submitted = 0
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                while submitted < len(batches) or in_flight:
+                    while submitted < len(batches) and len(in_flight) < workers + ARCHIVE_BATCHES_AHEAD:
+                        in_flight.append(
+                            executor.submit(_render_jobs, input_path, batches[submitted], optimize, linearize)
+                        )
+                        submitted += 1
+                    rendered = in_flight.popleft().result()
+                    for output_filename, page_nums, data, unoptimized_size in rendered:
+                        page_archive.add(output_filename, page_nums, data)
+                        unoptimized_bytes += unoptimized_size
+                        written_bytes += len(data)
+                    print(
+                        f"  Extracted {sum(len(job[1]) for job in rendered)} page(s) -> "
+                        f"{rendered[0][0]} .. {rendered[-1][0]}",
+                        file=log,
+                    )
+        else:
+            # The parent only needed the page count; workers reopen the file.
+            source.close()
+            shards = _shard_jobs(pending, workers)
+            print(f"Splitting with {workers} workers across {len(shards)} batches", file=log)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_split_jobs, input_path, output_dir, shard, optimize, linearize): shard
+                    for shard in shards
+                }
+                for future in as_completed(futures):
+                    shard = futures[future]
+                    written = future.result()
+                    for output_filename, page_nums, unoptimized_size, written_size, sha256 in written:
+                        if manifest is not None:
+                            manifest.record(output_filename, page_nums, written_size, sha256)
+                        unoptimized_bytes += unoptimized_size
+                        written_bytes += written_size
+                    print(
+                        f"  Extracted {sum(len(job[1]) for job in written)} page(s) -> "
+                        f"{shard[0][0]} .. {shard[-1][0]}",
+                        file=log,
+                    )
+        
+        if page_archive is not None:
+            page_archive.close()
+            destination = 'stdout' if archive == '-' else archive
+            page_archive = None
+        else:
+            destination = output_dir
+        
+        elapsed = time.perf_counter() - started
+        rate = pending_pages / elapsed if elapsed > 0 else 0.0
+        print(f"\nSuccessfully split {page_count} pages into {len(jobs)} file(s) in '{destination}'", file=log)
+        if len(pending) < len(jobs):
+            print(f"Skipped: {len(jobs) - len(pending)} file(s) already up to date", file=log)
+        if archive:
+            print(f"Archive: {archive_format}, {written_bytes:,} bytes of PDFs plus {ARCHIVE_MANIFEST_NAME}", file=log)
+        if optimize is not None:
+            change = written_bytes / unoptimized_bytes - 1 if unoptimized_bytes else 0.0
+            print(
+                f"Optimized: {unoptimized_bytes:,} -> {written_bytes:,} bytes ({change:+.1%}; "
+                f"source {os.path.getsize(input_path):,} bytes)",
+                file=log,
+            )
+        if linearize:
+            print(f"Linearized: {len(pending)} file(s) with {linearize_with}", file=log)
+        print(f"Elapsed: {elapsed:.2f}s ({rate:.1f} pages/sec)", file=log)
+        return page_count
+    
     except PdfReadError as e:
         print(f"Error: Invalid or corrupted PDF file: {str(e)}", file=sys.stderr)
         sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid group manifest: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: Invalid page selection: {str(e)}", file=sys.stderr)
+        sys.exit(1)
     except PermissionError as e:
         print(f"Error: Permission denied: {str(e)}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"Error processing PDF: {str(e)}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if page_archive is not None:
+            page_archive.abort()
+        if manifest is not None:
+            manifest.close()
+        if source is not None:
+            source.close()
 
 
 def main():
@@ -98,6 +1173,14 @@ Examples:
   %(prog)s document.pdf
   %(prog)s document.pdf my_output_folder/
   %(prog)s /path/to/multi-page.pdf /path/to/output/
+  %(prog)s large-batch.pdf pages/ --workers 8
+  %(prog)s large-batch.pdf pages/ --no-resume
+  %(prog)s filing.pdf pages/ --pages "900-920"
+  %(prog)s filing.pdf docs/ --ranges "1-3,5,7-9"
+  %(prog)s filing.pdf docs/ --groups groups.json
+  %(prog)s large-batch.pdf --archive pages.zip
+  %(prog)s large-batch.pdf --archive - | tar -xf - -C pages/
+  %(prog)s filing.pdf docs/ --ranges "1-3,4-6" --linearize
         """
     )
     
@@ -110,19 +1193,106 @@ Examples:
         'output_directory',
         nargs='?',
         default='output',
-        help='Directory where individual page PDFs will be saved (default: output)'
+        help='Directory where individual page PDFs will be saved (default: output; ignored with --archive)'
+    )
+    
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes to split with (default: 1, serial)'
+    )
+    
+    grouping = parser.add_mutually_exclusive_group()
+    
+    grouping.add_argument(
+        '-p', '--pages',
+        help='Only split these pages, one PDF each, e.g. "900-920" (same syntax as the queue message PageRange)'
+    )
+    
+    grouping.add_argument(
+        '-r', '--ranges',
+        help='Write one PDF per comma-separated range, e.g. "1-3,5,7-9"'
+    )
+    
+    grouping.add_argument(
+        '-g', '--groups',
+        metavar='MANIFEST',
+        help='JSON manifest of page groups ({"name": ..., "pages": ...}) to write one PDF each'
+    )
+    
+    parser.add_argument(
+        '-a', '--archive',
+        metavar='PATH',
+        help='Stream the PDFs into one .zip/.tar/.tar.gz archive instead of a directory ("-" for stdout)'
+    )
+    
+    parser.add_argument(
+        '--archive-format',
+        choices=('zip', 'tar', 'tar.gz'),
+        help='Archive format (default: from the archive name; tar for stdout)'
+    )
+    
+    parser.add_argument(
+        '-O', '--optimize',
+        action='store_true',
+        help='Compress content streams and merge identical objects in each output file'
+    )
+    
+    parser.add_argument(
+        '--image-dpi',
+        type=float,
+        help='With --optimize, downsample images above this effective resolution (e.g. 150)'
+    )
+    
+    parser.add_argument(
+        '--image-quality',
+        type=int,
+        help=f'With --optimize, re-encode images as JPEG at this quality, 1-95 '
+             f'(default: {DEFAULT_IMAGE_QUALITY} for downsampled images, others untouched)'
+    )
+    
+    parser.add_argument(
+        '-L', '--linearize',
+        action='store_true',
+        help='Write linearized ("fast web view") PDFs so viewers can show page 1 before the whole '
+             'file has downloaded (needs pikepdf or qpdf)'
+    )
+    
+    parser.add_argument(
+        '--no-resume',
+        dest='resume',
+        action='store_false',
+        help='Write every file and keep no split manifest (default: skip files recorded in '
+             'the output directory\'s split manifest with a matching hash)'
     )
     
     parser.add_argument(
         '-v', '--version',
         action='version',
-        version='%(prog)s 1.0.0'
+        version='%(prog)s 1.7.0'
     )
     
     args = parser.parse_args()
     
+    if (args.image_dpi is not None or args.image_quality is not None) and not args.optimize:
+        parser.error('--image-dpi and --image-quality require --optimize')
+    optimize = OptimizeOptions(args.image_dpi, args.image_quality) if args.optimize else None
+    
     # Split the PDF
-    split_pdf(args.input_pdf, args.output_directory)
+    split_pdf(
+        args.input_pdf,
+        args.output_directory,
+        workers=args.workers,
+        ranges=args.ranges,
+        groups_path=args.groups,
+        archive=args.archive,
+        archive_format=args.archive_format,
+        optimize=optimize,
+        pages=args.pages,
+        resume=args.resume,
+        linearize=args.linearize,
+    )
 
 
 if __name__ == '__main__':
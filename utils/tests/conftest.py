@@ -0,0 +1,68 @@
+"""Shared fixtures for the utility script tests."""
+
+import os
+import sys
+
+import pytest
+
+# The scripts import each other by module name, as when run from utils/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_form_pdf(path, labels):
+    """
+    Write a PDF whose pages all show the same printed form plus one label each.
+    
+    Pages differ only in their label (``b"Page 7"``, ``b"File No. 2023-00417"``);
+    a label of None makes a blank page. All pages sit directly under the root
+    ``/Pages`` node, as scanners write them.
+    
+    Args:
+        path (str): Output path
+        labels (list): One ``bytes`` label (or None) per page
+    """
+    objects = {}
+    font = 3 + 2 * len(labels)
+    kids = []
+    for index, label in enumerate(labels):
+        page, content = 3 + 2 * index, 4 + 2 * index
+        if label is None:
+            body = b""
+        else:
+            body = b"\n".join(
+                b"BT /F1 11 Tf 72 %d Td (Section %d of the standard claim form, fill in every field) Tj ET"
+                % (700 - 18 * line, line) for line in range(20)
+            )
+            body += b"\n72 300 m 540 300 l S 72 200 468 60 re S\nBT /F1 12 Tf 72 760 Td (%s) Tj ET" % label
+        objects[content] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(body), body)
+        objects[page] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (content, font)
+        )
+        kids.append(b"%d 0 R" % page)
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = b"<< /Type /Pages /Count %d /Kids [%s] >>" % (len(labels), b" ".join(kids))
+    objects[font] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    
+    data = bytearray(b"%PDF-1.7\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(data)
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (font + 1)
+    for number in range(1, font + 1):
+        data += b"%010d 00000 n \n" % offsets[number]
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (font + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+@pytest.fixture
+def form_pdf(tmp_path):
+    """Return a function that writes a :func:`write_form_pdf` file and returns its path."""
+    def make(labels, name='form.pdf'):
+        path = str(tmp_path / name)
+        write_form_pdf(path, labels)
+        return path
+    return make
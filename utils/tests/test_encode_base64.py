@@ -0,0 +1,31 @@
+"""Tests for encode_base64.py."""
+
+import base64
+import subprocess
+import sys
+
+import encode_base64
+from encode_base64 import expand_inputs
+
+
+def test_bracketed_file_name_is_encoded_as_a_single_file(tmp_path):
+    path = tmp_path / 'scan[1].pdf'
+    path.write_bytes(b'%PDF-1.7 bracketed')
+    
+    result = subprocess.run(
+        [sys.executable, encode_base64.__file__, str(path)], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+    )
+    
+    assert base64.b64decode(result.stdout) == b'%PDF-1.7 bracketed'
+
+
+def test_existing_files_are_not_expanded_as_patterns(tmp_path):
+    bracketed = tmp_path / 'scan[1].pdf'
+    starred = tmp_path / 'scan*.pdf'
+    other = tmp_path / 'scan1.pdf'
+    for path in (bracketed, starred, other):
+        path.write_bytes(b'%PDF')
+    
+    assert expand_inputs([str(bracketed), str(starred)]) == [str(bracketed), str(starred)]
+    # A pattern that is not a file name still globs
+    assert expand_inputs([str(tmp_path / 'scan[0-9].pdf')]) == [str(other)]
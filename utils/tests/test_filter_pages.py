@@ -0,0 +1,70 @@
+"""Tests for filter_pages.py."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pypdfium2')
+
+from filter_pages import analyze_pages, ink_difference
+
+
+def _statuses(results):
+    return {result['page']: (result['status'], result['duplicateOf']) for result in results}
+
+
+def test_duplicates_are_off_by_default(form_pdf):
+    path = form_pdf([b"Page 1", b"Page 1", None])
+    
+    statuses = _statuses(analyze_pages(path))
+    
+    assert statuses == {1: ('kept', None), 2: ('kept', None), 3: ('blank', None)}
+
+
+def test_pages_differing_only_in_page_number_are_kept(form_pdf):
+    # Every page hashes alike and differs by a few pixels at 50 DPI
+    path = form_pdf([b"Page %d" % page for page in range(1, 201)])
+    
+    results = analyze_pages(path, detect_duplicates=True)
+    
+    assert [result['status'] for result in results] == ['kept'] * 200
+
+
+@pytest.mark.parametrize('dpi', [50, 150])
+def test_filings_differing_in_one_character_are_kept(form_pdf, dpi):
+    path = form_pdf([
+        b"File No. 2023-00417",
+        b"File No. 2023-00418",
+        b"File No. 2023-00411",
+        b"File No. 2023-00417",
+        b"File No. 2023-0041l",
+    ])
+    
+    statuses = _statuses(analyze_pages(path, dpi=dpi, detect_duplicates=True))
+    
+    assert statuses == {
+        1: ('kept', None),
+        2: ('kept', None),
+        3: ('kept', None),
+        4: ('duplicate', 1),
+        5: ('kept', None),
+    }
+
+
+def test_workers_match_serial(form_pdf):
+    path = form_pdf([b"Page 1", b"Page 2", b"Page 1", None, b"Page 3", b"Page 2"] * 3)
+    
+    serial = analyze_pages(path, detect_duplicates=True)
+    parallel = analyze_pages(path, detect_duplicates=True, workers=2)
+    
+    assert parallel == serial
+    assert sum(result['status'] == 'duplicate' for result in serial) == 12
+
+
+def test_ink_difference_counts_pixels_without_tolerance():
+    mask = np.zeros((10, 10), dtype=bool)
+    mask[4, 4] = True
+    shifted = np.zeros_like(mask)
+    shifted[4, 5] = True
+    
+    assert ink_difference(mask, mask) == 0
+    assert ink_difference(mask, shifted) == 2
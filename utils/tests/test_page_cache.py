@@ -0,0 +1,101 @@
+"""Tests for page_cache.py."""
+
+import pytest
+
+pytest.importorskip('pypdf')
+
+from page_cache import hash_pages
+
+
+def _write_font_pdf(path, font, extra=None):
+    """
+    Write a one-page PDF that shows "A" in the given font.
+    
+    ``font`` is the font dictionary (object 5); ``extra`` maps further object
+    numbers, from 6, to their bodies.
+    """
+    body = b"BT /F1 24 Tf 72 700 Td (A) Tj ET"
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Count 1 /Kids [3 0 R] >>",
+        3: b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+           b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        4: b"<< /Length %d >>\nstream\n%s\nendstream" % (len(body), body),
+        5: font,
+    }
+    objects.update(extra or {})
+    data = bytearray(b"%PDF-1.7\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(data)
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref = len(data)
+    size = len(objects) + 1
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for number in range(1, size):
+        data += b"%010d 00000 n \n" % offsets[number]
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _stream(data):
+    return b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data)
+
+
+def _type3_font(glyph):
+    return (
+        b"<< /Type /Font /Subtype /Type3 /FontBBox [0 0 1000 1000] /FontMatrix [0.001 0 0 0.001 0 0] "
+        b"/CharProcs << /A 6 0 R >> /Encoding << /Type /Encoding /Differences [65 /A] >> "
+        b"/FirstChar 65 /LastChar 65 /Widths [1000] >>",
+        {6: _stream(glyph)},
+    )
+
+
+def _subset_font(font_program, widths):
+    return (
+        b"<< /Type /Font /Subtype /TrueType /BaseFont /ABCDEF+Arial /FirstChar 65 /LastChar 65 "
+        b"/Widths [%d] /FontDescriptor 6 0 R >>" % widths,
+        {
+            6: b"<< /Type /FontDescriptor /FontName /ABCDEF+Arial /Flags 4 /FontBBox [0 0 1000 1000] "
+               b"/ItalicAngle 0 /Ascent 900 /Descent -200 /CapHeight 700 /StemV 80 /FontFile2 7 0 R >>",
+            7: _stream(font_program),
+        },
+    )
+
+
+def _page_hash(tmp_path, name, font):
+    path = str(tmp_path / name)
+    _write_font_pdf(path, *font)
+    return hash_pages(path)[0][1]
+
+
+def test_type3_fonts_are_hashed_by_their_glyphs(tmp_path):
+    square = _type3_font(b"1000 0 d0 0 0 1000 1000 re f")
+    triangle = _type3_font(b"1000 0 d0 0 0 m 1000 0 l 500 1000 l f")
+    
+    assert _page_hash(tmp_path, 'square.pdf', square) != _page_hash(tmp_path, 'triangle.pdf', triangle)
+    assert _page_hash(tmp_path, 'square.pdf', square) == _page_hash(tmp_path, 'again.pdf', square)
+
+
+def test_subset_fonts_with_the_same_name_are_told_apart(tmp_path):
+    first = _subset_font(b"\x00\x01\x00\x00 glyphs of the first subset", 722)
+    second = _subset_font(b"\x00\x01\x00\x00 glyphs of the second subset", 722)
+    wider = _subset_font(b"\x00\x01\x00\x00 glyphs of the first subset", 667)
+    
+    hashes = {
+        _page_hash(tmp_path, 'first.pdf', first),
+        _page_hash(tmp_path, 'second.pdf', second),
+        _page_hash(tmp_path, 'wider.pdf', wider),
+    }
+    
+    assert len(hashes) == 3
+
+
+@pytest.mark.parametrize('page', [0, 2, -1])
+def test_page_numbers_outside_the_document_are_rejected(tmp_path, page):
+    path = str(tmp_path / 'one.pdf')
+    _write_font_pdf(path, *_type3_font(b"1000 0 d0 0 0 1000 1000 re f"))
+    
+    with pytest.raises(ValueError, match=rf"Page {page} is out of range: .* has 1 page\(s\)\."):
+        hash_pages(path, [1, page])
@@ -0,0 +1,118 @@
+"""Tests for page_selection.py."""
+
+import pytest
+
+from page_selection import format_page_range, is_all_pages, normalize_page_expression, parse_page_range
+
+
+_INVALID = "Invalid token '{}': use page numbers or N-M ranges."
+
+# What PageSelection.TryParse (DocumentOcr.Common) returns for each input: the
+# selected pages, or the error message. The first block repeats
+# PageSelectionTests.cs; the rest were recorded from the C# implementation.
+PAGE_SELECTION_CASES = [
+    ('1', None, [1]),
+    ('3 - 12 ,  15', None, list(range(3, 13)) + [15]),
+    ('3-7, 5-10', None, list(range(3, 11))),
+    ('5-3', None, "Range '5-3' has start greater than end."),
+    ('0', None, "Page numbers must be 1 or greater."),
+    ('0-5', None, "Page numbers must be 1 or greater."),
+    ('abc', None, _INVALID.format('abc')),
+    ('1-', None, _INVALID.format('1-')),
+    ('-5', None, _INVALID.format('-5')),
+    (',,,', None, _INVALID.format('')),
+    ('1,,2', None, _INVALID.format('')),
+    ('1-2-3', None, _INVALID.format('1-2-3')),
+    ('25', 20, "Page 25 exceeds document length (20)."),
+    ('3-25', 20, "Page 25 exceeds document length (20)."),
+    ('3-12, 15', 20, list(range(3, 13)) + [15]),
+    ('20', 20, [20]),
+    ('21', 20, "Page 21 exceeds document length (20)."),
+    # int.TryParse: a sign is allowed, anything else beyond ASCII digits is not
+    ('+5', None, [5]),
+    ('3-+5', None, [3, 4, 5]),
+    ('3--5', None, "Page numbers must be 1 or greater."),
+    ('+-5', None, _INVALID.format('+-5')),
+    ('007', None, [7]),
+    ('1_000', None, _INVALID.format('1_000')),
+    ('1_0-2_0', None, _INVALID.format('1_0-2_0')),
+    ('\u0663', None, _INVALID.format('\u0663')),
+    ('\uff15', None, _INVALID.format('\uff15')),
+    ('\u22125', None, _INVALID.format('\u22125')),
+    ('1.5', None, _INVALID.format('1.5')),
+    ('1e3', None, _INVALID.format('1e3')),
+    ('0x10', None, _INVALID.format('0x10')),
+    ('2147483647', None, [2147483647]),
+    ('2147483648', None, _INVALID.format('2147483648')),
+    ('99999999999', None, _INVALID.format('99999999999')),
+    ('5-5', None, [5]),
+    ('-', None, _INVALID.format('-')),
+    ('--', None, _INVALID.format('--')),
+    ('1, 2,', None, _INVALID.format('')),
+    ('1 2', None, _INVALID.format('1 2')),
+    # String.Trim: Unicode white space, but not the \x1c-\x1f separators
+    (' 7 ', None, [7]),
+    ('1 -3', None, [1, 2, 3]),
+    ('5\t,\t6', None, [5, 6]),
+    ('\xa05\xa0', None, [5]),
+    ('\x855\x85', None, [5]),
+    ('\u20005\u2000', None, [5]),
+    ('\u30005\u3000', None, [5]),
+    ('5\u202f', None, [5]),
+    ('1 -\u30003', None, [1, 2, 3]),
+    ('\x1c5\x1c', None, _INVALID.format('\x1c5\x1c')),
+    ('\x1f5', None, _INVALID.format('\x1f5')),
+    ('\u200b5', None, _INVALID.format('\u200b5')),
+    ('\ufeff5', None, _INVALID.format('\ufeff5')),
+]
+
+
+@pytest.mark.parametrize('expression, max_page, expected', PAGE_SELECTION_CASES)
+def test_page_selection_matches_try_parse(expression, max_page, expected):
+    if isinstance(expected, str):
+        with pytest.raises(ValueError) as error:
+            parse_page_range(expression, max_page)
+        assert str(error.value) == expected
+    else:
+        assert parse_page_range(expression, max_page) == expected
+
+
+@pytest.mark.parametrize('expression', ['', '   ', None])
+def test_empty_page_selection_is_an_error(expression):
+    # TryParse reads an empty expression as "all pages"; --pages requires one
+    with pytest.raises(ValueError, match="Page selection is empty."):
+        parse_page_range(expression)
+
+
+@pytest.mark.parametrize('expression, normalized', [
+    ('1', '1'),
+    ('3 - 12 ,  15', '3-12, 15'),
+    (' 3 - 12 ,15 ', '3-12, 15'),
+    ('1 -\u30003, 7', '1-3, 7'),
+    ('5\t,\t6', '5, 6'),
+    ('\xa05\xa0', '5'),
+    ('+5,007', '+5, 007'),
+    ('3-+5', '3-+5'),
+])
+def test_expression_is_normalized_like_page_selection(expression, normalized):
+    # PageSelection.Expression as recorded from the C# implementation
+    assert normalize_page_expression(expression) == normalized
+
+
+@pytest.mark.parametrize('expression, expected', [
+    (None, True),
+    ('', True),
+    ('  ', True),
+    (' \u3000 ', True),
+    ('\x1c', False),
+    ('1', False),
+])
+def test_all_pages_matches_try_parse(expression, expected):
+    assert is_all_pages(expression) is expected
+
+
+def test_format_page_range_inverts_parse_page_range():
+    pages = [1, 2, 3, 5, 7, 8]
+    
+    assert format_page_range(pages) == '1-3, 5, 7-8'
+    assert parse_page_range(format_page_range(pages)) == pages
@@ -0,0 +1,36 @@
+"""Tests for profile_documents.py."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import profile_documents
+
+
+def test_cardinality_estimate_is_the_same_in_every_process(tmp_path):
+    # More distinct values than the sketch keeps, so the count is estimated
+    path = tmp_path / 'export.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for index in range(12000):
+            f.write(json.dumps({'schema': {'agency': {'ocrValue': f"Agency {index % 10000}"}}}) + '\n')
+    
+    estimates = set()
+    for hash_seed in ('1', '2', '3'):
+        result = subprocess.run(
+            [sys.executable, profile_documents.__file__, str(path)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=dict(os.environ, PYTHONHASHSEED=hash_seed),
+            check=True,
+        )
+        report = json.loads(result.stdout)['fields']['agency']
+        assert not report['cardinalityExact']
+        estimates.add(report['cardinality'])
+    
+    assert len(estimates) == 1
+    assert abs(estimates.pop() - 10000) < 500
@@ -0,0 +1,213 @@
+"""Tests for split_pdf.py."""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip('pypdf')
+
+from pypdf import PdfReader
+
+from benchmark_split import write_synthetic_pdf
+from split_pdf import SPLIT_MANIFEST_SUFFIX, OptimizeOptions, PageTree, split_pdf
+
+
+def _write_tree_pdf(path, tree):
+    """
+    Write a PDF whose page tree has the given shape.
+    
+    ``tree`` is a list of kids, each None for a page or a nested list for an
+    intermediate node. Every node's ``/Count`` is correct, and the root holds
+    the ``/MediaBox`` the pages inherit.
+    """
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>"}
+    
+    def add(kids, number, parent):
+        references, count = [], 0
+        for kid in kids:
+            kid_number = max(objects) + 1
+            objects[kid_number] = None
+            if kid is None:
+                objects[kid_number] = b"<< /Type /Page /Parent %d 0 R >>" % number
+                count += 1
+            else:
+                count += add(kid, kid_number, number)
+            references.append(b"%d 0 R" % kid_number)
+        extra = b"/MediaBox [0 0 612 792]" if parent is None else b"/Parent %d 0 R" % parent
+        objects[number] = b"<< /Type /Pages %s /Count %d /Kids [%s] >>" % (extra, count, b" ".join(references))
+        return count
+    
+    objects[2] = None
+    add(tree, 2, None)
+    data = bytearray(b"%PDF-1.7\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(data)
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref = len(data)
+    size = len(objects) + 1
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for number in range(1, size):
+        data += b"%010d 00000 n \n" % offsets[number]
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _assert_pages_match_reader(path):
+    expected = PdfReader(path).pages
+    with PageTree.open(path) as source:
+        assert len(source) == len(expected)
+        for index in range(len(source)):
+            page = source[index]
+            assert page.indirect_reference.idnum == expected[index].indirect_reference.idnum
+            assert list(page.mediabox) == list(expected[index].mediabox)
+        assert not source._fallback
+
+
+def test_page_tree_reads_only_the_pages_it_is_asked_for(form_pdf):
+    path = form_pdf([b"Page %d" % page for page in range(1, 201)])
+    
+    with PageTree.open(path) as source:
+        page = source[150]
+        
+        assert page.indirect_reference.idnum == PdfReader(path).pages[150].indirect_reference.idnum
+        # The catalog, the root node and page 151, not the other 199 pages
+        assert len(source.reader.resolved_objects) < 10
+
+
+@pytest.mark.parametrize('page_count', [1, 31, 32, 33, 1100])
+def test_page_tree_finds_pages_of_balanced_trees(tmp_path, page_count):
+    path = str(tmp_path / 'balanced.pdf')
+    write_synthetic_pdf(path, page_count, 1)
+    
+    _assert_pages_match_reader(path)
+
+
+@pytest.mark.parametrize('tree', [
+    [None, [None, None, None], None],
+    # /Count equals the number of kids, but the first kid holds both pages
+    [[None, None], []],
+    [None, [[None], [None, None]], [None]],
+])
+def test_page_tree_finds_pages_of_mixed_trees(tmp_path, tree):
+    path = str(tmp_path / 'mixed.pdf')
+    _write_tree_pdf(path, tree)
+    
+    _assert_pages_match_reader(path)
+
+
+def _read_outputs(output_dir):
+    return {
+        name: (output_dir / name).read_bytes()
+        for name in sorted(os.listdir(output_dir)) if name.endswith('.pdf')
+    }
+
+
+@pytest.fixture
+def split_source(form_pdf, tmp_path):
+    """Return ``(input_path, output_dir)`` for a five-page source."""
+    return form_pdf([b"Page %d" % page for page in range(1, 6)]), tmp_path / 'pages'
+
+
+def test_rerun_skips_files_already_written(split_source, capsys):
+    input_path, output_dir = split_source
+    assert split_pdf(input_path, str(output_dir)) == 5
+    first = _read_outputs(output_dir)
+    modified = {name: os.stat(output_dir / name).st_mtime_ns for name in first}
+    capsys.readouterr()
+    
+    assert split_pdf(input_path, str(output_dir)) == 5
+    
+    assert "Resuming: 5 of 5 file(s) already written and verified" in capsys.readouterr().out
+    assert {name: os.stat(output_dir / name).st_mtime_ns for name in first} == modified
+
+
+def test_damaged_and_missing_files_are_written_again(split_source, capsys):
+    input_path, output_dir = split_source
+    split_pdf(input_path, str(output_dir))
+    first = _read_outputs(output_dir)
+    (output_dir / 'form_page_0002.pdf').write_bytes(first['form_page_0002.pdf'][:-10])
+    (output_dir / 'form_page_0004.pdf').unlink()
+    capsys.readouterr()
+    
+    split_pdf(input_path, str(output_dir))
+    
+    assert "Resuming: 3 of 5" in capsys.readouterr().out
+    assert _read_outputs(output_dir) == first
+
+
+def test_torn_manifest_line_is_ignored(split_source, capsys):
+    input_path, output_dir = split_source
+    split_pdf(input_path, str(output_dir))
+    manifest_path = output_dir / f".form{SPLIT_MANIFEST_SUFFIX}"
+    with open(manifest_path, 'a', encoding='utf-8') as f:
+        f.write('{"name":"form_page_0006.pdf","pageNum')
+    (output_dir / 'form_page_0003.pdf').unlink()
+    capsys.readouterr()
+    
+    split_pdf(input_path, str(output_dir))
+    
+    assert "Resuming: 4 of 5" in capsys.readouterr().out
+    lines = manifest_path.read_text(encoding='utf-8').splitlines()
+    assert json.loads(lines[-1])['name'] == 'form_page_0003.pdf'
+    split_pdf(input_path, str(output_dir))
+    assert "Resuming: 5 of 5" in capsys.readouterr().out
+
+
+def test_changed_source_writes_every_file_again(split_source, form_pdf, capsys):
+    input_path, output_dir = split_source
+    split_pdf(input_path, str(output_dir))
+    form_pdf([b"Filing %d" % page for page in range(1, 6)])
+    capsys.readouterr()
+    
+    split_pdf(input_path, str(output_dir))
+    
+    output = capsys.readouterr().out
+    assert "Source PDF changed since the last run; writing every file again" in output
+    assert "Resuming" not in output
+
+
+def test_changed_settings_write_every_file_again(split_source, capsys):
+    input_path, output_dir = split_source
+    split_pdf(input_path, str(output_dir))
+    capsys.readouterr()
+    
+    split_pdf(input_path, str(output_dir), optimize=OptimizeOptions())
+    
+    output = capsys.readouterr().out
+    assert "Output settings changed since the last run; writing every file again" in output
+    assert "Resuming" not in output
+
+
+def test_parallel_split_records_every_file(split_source, capsys):
+    input_path, output_dir = split_source
+    split_pdf(input_path, str(output_dir), workers=2)
+    capsys.readouterr()
+    
+    split_pdf(input_path, str(output_dir))
+    
+    assert "Resuming: 5 of 5" in capsys.readouterr().out
+
+
+def test_no_resume_writes_no_manifest(split_source):
+    input_path, output_dir = split_source
+    
+    split_pdf(input_path, str(output_dir), resume=False)
+    
+    assert len(_read_outputs(output_dir)) == 5
+    assert not (output_dir / f".form{SPLIT_MANIFEST_SUFFIX}").exists()
+
+
+def test_no_resume_leaves_an_existing_manifest_alone(split_source, capsys):
+    input_path, output_dir = split_source
+    split_pdf(input_path, str(output_dir))
+    manifest_path = output_dir / f".form{SPLIT_MANIFEST_SUFFIX}"
+    logged = manifest_path.read_bytes()
+    capsys.readouterr()
+    
+    split_pdf(input_path, str(output_dir), resume=False)
+    
+    assert "Resuming" not in capsys.readouterr().out
+    assert manifest_path.read_bytes() == logged